@@ -0,0 +1,80 @@
+"""Entries/sec comparison of columnar (NumPy) analytics against duration_stats.
+
+Run from the repository root (requires numpy)::
+
+    python benchmarks/bench_columnar.py [--lines N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from org_logging.analytics import duration_stats, iter_detail_entries  # noqa: E402
+from org_logging.columnar import columnar_duration_stats, load_event_columns  # noqa: E402
+from org_logging.formatters import JsonlFormatter  # noqa: E402
+
+
+def _write_log(path: Path, lines: int) -> None:
+    formatter = JsonlFormatter()
+    base = time.time() - 3600
+    with path.open("w", encoding="utf-8") as handle:
+        for index in range(lines):
+            record = logging.LogRecord(
+                "org_logging.overview", logging.INFO, __file__, 1, "step", None, None, "run"
+            )
+            record.created = base + index * 3600 / lines
+            if index % 10 < 8:
+                record.__dict__.update(
+                    event="duration",
+                    duration_name=f"step.{index % 20}",
+                    elapsed=random.lognormvariate(2, 1),
+                    unit="ms",
+                    run_id="bench",
+                )
+            else:
+                record.__dict__.update(event="progress", run_id="bench")
+            handle.write(formatter.format(record) + "\n")
+
+
+def _timed(label: str, lines: int, func) -> float:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:>28}: {elapsed:7.2f}s  {lines / elapsed:12,.0f} lines/sec")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "detail.jsonl"
+        _write_log(path, args.lines)
+        baseline = _timed(
+            "duration_stats",
+            args.lines,
+            lambda: duration_stats(iter_detail_entries(path), unit="ms"),
+        )
+        columnar = _timed(
+            "columnar_duration_stats",
+            args.lines,
+            lambda: columnar_duration_stats(path, unit="ms"),
+        )
+        columns = load_event_columns(path)
+        _timed("grouped_stats (columns only)", args.lines, columns.grouped_stats)
+        _timed("per-minute p95", args.lines, lambda: columns.bucketed_quantile(0.95))
+        print(f"speedup: {baseline / columnar:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Records/sec comparison of JsonlFormatter backends against the baseline formatter.
+
+Run from the repository root::
+
+    python benchmarks/bench_formatters.py [--records N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from org_logging.formatters import JsonlFormatter, resolve_json_backend  # noqa: E402
+
+
+class LegacyJsonlFormatter(logging.Formatter):
+    """Baseline formatter: the pre-optimization JsonlFormatter, kept for comparison."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        # logging allows arbitrary keys via `extra={...}`. We want to persist these
+        # structured fields (e.g. `event`, `duration_name`, etc.) into JSONL so
+        # downstream consumers can analyze them.
+        standard_attrs = {
+            # Core LogRecord attributes
+            "name",
+            "msg",
+            "args",
+            "levelname",
+            "levelno",
+            "pathname",
+            "filename",
+            "module",
+            "exc_info",
+            "exc_text",
+            "stack_info",
+            "lineno",
+            "funcName",
+            "created",
+            "msecs",
+            "relativeCreated",
+            "thread",
+            "threadName",
+            "processName",
+            "process",
+            # Added/derived by logging during formatting
+            "message",
+            "asctime",
+            # Python 3.12+ may include this when using asyncio tasks
+            "taskName",
+        }
+
+        log_entry = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "app": getattr(record, "app", None),
+            "run_id": getattr(record, "run_id", None),
+            "module": record.module,
+            "function": record.funcName,
+            "line": record.lineno,
+        }
+        # Merge any `extra` fields at the top-level (without clobbering core keys).
+        for key, value in record.__dict__.items():
+            if key in standard_attrs or key in log_entry:
+                continue
+            log_entry[key] = value
+
+        if record.exc_info:
+            log_entry["exception"] = self.formatException(record.exc_info)
+        # Avoid formatter crashes if an extra field isn't JSON-serializable.
+        return json.dumps(log_entry, ensure_ascii=False, default=str)
+
+
+def _make_records(count: int) -> list[logging.LogRecord]:
+    records = []
+    base = time.time()
+    for index in range(count):
+        record = logging.LogRecord(
+            name="org_logging.overview",
+            level=logging.DEBUG,
+            pathname=__file__,
+            lineno=42,
+            msg="%s took %.2f%s",
+            args=("analytics.compute", index / 7, "ms"),
+            exc_info=None,
+            func="compute",
+        )
+        # Spread records over a few seconds like a busy service would.
+        record.created = base + index / 20000
+        record.__dict__.update(
+            {
+                "app": "billing-service",
+                "run_id": "4f1c2b0e9a8d4c7b",
+                "event": "duration",
+                "duration_name": "analytics.compute",
+                "elapsed": index / 7,
+                "unit": "ms",
+            }
+        )
+        records.append(record)
+    return records
+
+
+def _records_per_second(formatter: logging.Formatter, records: list[logging.LogRecord]) -> float:
+    fmt = formatter.format
+    best = 0.0
+    for _ in range(3):
+        start = time.perf_counter()
+        for record in records:
+            fmt(record)
+        elapsed = time.perf_counter() - start
+        best = max(best, len(records) / elapsed)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=100_000)
+    args = parser.parse_args()
+
+    records = _make_records(args.records)
+    candidates: list[tuple[str, logging.Formatter]] = [("baseline", LegacyJsonlFormatter())]
+    for backend in ("json", "msgspec", "orjson"):
+        try:
+            resolve_json_backend(backend)
+        except ImportError:
+            print(f"{backend:>10}: not installed")
+            continue
+        candidates.append((backend, JsonlFormatter(backend=backend)))
+
+    reference = [json.loads(LegacyJsonlFormatter().format(record)) for record in records[:1000]]
+    baseline_rate = None
+    for label, formatter in candidates:
+        sample = [json.loads(formatter.format(record)) for record in records[:1000]]
+        if sample != reference:
+            raise SystemExit(f"{label}: output differs from baseline formatter")
+        rate = _records_per_second(formatter, records)
+        baseline_rate = baseline_rate or rate
+        print(f"{label:>10}: {rate:12,.0f} records/sec  ({rate / baseline_rate:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
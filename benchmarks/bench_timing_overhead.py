@@ -0,0 +1,116 @@
+"""Per-call overhead of the timing decorators, in nanoseconds.
+
+Each decorated no-op function is compared against the same function called
+directly. "disabled" means the overview logger has INFO turned off; "enabled"
+means every call builds and handles a record (the handler discards it, so
+formatting and I/O are excluded). Run from the repository root::
+
+    python benchmarks/bench_timing_overhead.py [--calls N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import time
+import timeit
+import uuid
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from org_logging.sampling import EveryNSampler  # noqa: E402
+from org_logging.timing import log_duration, log_return_count  # noqa: E402
+
+
+def legacy_log_duration(*, name: str, logger: logging.Logger, unit: str = "ms") -> Callable:
+    """Baseline: the pre-optimization wrapper, which resolved everything per call."""
+
+    def convert(elapsed_ms: float, unit: str) -> tuple[float, str]:
+        normalized = unit.lower()
+        if normalized in {"ms", "millisecond", "milliseconds"}:
+            return elapsed_ms, "ms"
+        if normalized in {"s", "sec", "second", "seconds"}:
+            return elapsed_ms / 1000, "s"
+        raise ValueError(f"Unsupported duration unit: {unit}")
+
+    def decorator(target: Callable) -> Callable:
+        def wrapper(*args: object, **kwargs: object) -> object:
+            resolved_logger = logger or logging.getLogger("org_logging.overview")
+            extra = getattr(resolved_logger, "extra", None)
+            run_id = extra["run_id"] if isinstance(extra, dict) and extra.get("run_id") else str(uuid.uuid4())
+            start = time.perf_counter()
+            try:
+                return target(*args, **kwargs)
+            finally:
+                elapsed, resolved_unit = convert((time.perf_counter() - start) * 1000, unit)
+                resolved_logger.info(
+                    "%s took %.2f%s",
+                    name,
+                    elapsed,
+                    resolved_unit,
+                    extra={
+                        "event": "duration",
+                        "duration_name": name,
+                        "elapsed": elapsed,
+                        "unit": resolved_unit,
+                        "run_id": run_id,
+                    },
+                )
+
+        return wrapper
+
+    return decorator
+
+
+def _noop() -> None:
+    return None
+
+
+def _items() -> list[int]:
+    return [1, 2, 3]
+
+
+def _ns_per_call(func: Callable[[], object], calls: int) -> float:
+    return min(timeit.repeat(func, number=calls, repeat=5)) / calls * 1e9
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200_000)
+    args = parser.parse_args()
+
+    logger = logging.getLogger("bench.timing_overhead")
+    logger.propagate = False
+    logger.addHandler(logging.NullHandler())
+
+    cases: list[tuple[str, Callable[[], object], Callable[[], object]]] = [
+        ("legacy log_duration", legacy_log_duration(name="noop", logger=logger)(_noop), _noop),
+        ("log_duration", log_duration(name="noop", logger=logger)(_noop), _noop),
+        (
+            "log_duration + sampler(1/100)",
+            log_duration(name="noop", logger=logger, sampler=EveryNSampler(100))(_noop),
+            _noop,
+        ),
+        (
+            "log_duration + cpu_time",
+            log_duration(name="noop", logger=logger, cpu_time=True)(_noop),
+            _noop,
+        ),
+        ("log_return_count", log_return_count(name="items", logger=logger)(_items), _items),
+    ]
+
+    print(f"{'':32} {'disabled':>12} {'enabled':>12}")
+    for label, decorated, plain in cases:
+        base = _ns_per_call(plain, args.calls)
+        overhead = []
+        for level in (logging.WARNING, logging.INFO):
+            logger.setLevel(level)
+            overhead.append(_ns_per_call(decorated, args.calls) - base)
+        print(f"{label:32} {overhead[0]:9,.0f} ns {overhead[1]:9,.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
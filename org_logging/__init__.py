@@ -1,37 +1,94 @@
 """Logging helpers."""
 
-from .artifacts import ArtifactMeta, ArtifactStore
+from .artifact_readers import describe_artifact, load_array, load_arrow
+from .artifacts import ArtifactIndex, ArtifactMeta, ArtifactRecord, ArtifactStore
 from .analytics import (
+    AnalysisResult,
     DurationStats,
+    OnlineStats,
     count_events,
     duration_stats,
+    iter_detail_entries,
+    iter_overview_entries,
     load_detail_entries,
     load_overview_entries,
+    memory_stats,
+    merge_duration_stats,
     return_count_stats,
 )
-from .config import configure_logging, get_logger
-from .objects import log_object
+from .call_tree import SpanNode, SpanTimeStats, call_trees, collapsed_stacks, span_time_stats
+from .config import configure_logging, get_logger, queue_stats
+from .detail_index import DetailIndex
+from .handlers import BatchingQueueHandler, QueueStats
+from .incremental import IncrementalAnalyzer
+from .memory import log_memory
+from .metrics import MetricsRegistry, default_registry
+from .multiprocess import LogCollector, ShippingHandler
+from .objects import log_object, register_object_handler, wait_for_objects
+from .parallel import analyze_files
+from .profiling import SlowCallProfiler, default_profiler, load_profile, profile_summary
+from .query_index import QueryIndex
+from .rotation import CompressingRotatingFileHandler
+from .sampling import EveryNSampler, ProbabilitySampler, RateLimitSampler, Sampler
+from .sketch import DDSketch
+from .spans import Span, current_span
 from .timing import log_duration, log_return_count, log_timing
-from .config import configure_logging, get_logger
-from .objects import log_object
-from .timing import log_duration, log_return_count, log_timing
-from .timing import log_duration, log_timing
 
 __all__ = [
+    "AnalysisResult",
+    "ArtifactIndex",
     "ArtifactMeta",
+    "ArtifactRecord",
     "ArtifactStore",
+    "BatchingQueueHandler",
+    "CompressingRotatingFileHandler",
+    "DDSketch",
+    "DetailIndex",
+    "EveryNSampler",
     "DurationStats",
+    "IncrementalAnalyzer",
+    "LogCollector",
+    "MetricsRegistry",
+    "OnlineStats",
+    "ProbabilitySampler",
+    "QueryIndex",
+    "QueueStats",
+    "RateLimitSampler",
+    "Sampler",
+    "SlowCallProfiler",
+    "ShippingHandler",
+    "Span",
+    "SpanNode",
+    "SpanTimeStats",
+    "analyze_files",
+    "call_trees",
+    "collapsed_stacks",
     "configure_logging",
     "count_events",
+    "current_span",
+    "describe_artifact",
+    "default_profiler",
+    "default_registry",
     "duration_stats",
     "get_logger",
+    "iter_detail_entries",
+    "iter_overview_entries",
+    "load_array",
+    "load_arrow",
     "load_detail_entries",
     "load_overview_entries",
-    "configure_logging",
-    "get_logger",
+    "load_profile",
     "log_duration",
+    "log_memory",
     "log_object",
     "log_return_count",
     "log_timing",
+    "memory_stats",
+    "merge_duration_stats",
+    "profile_summary",
+    "queue_stats",
+    "register_object_handler",
     "return_count_stats",
+    "span_time_stats",
+    "wait_for_objects",
 ]
@@ -3,11 +3,15 @@
 from __future__ import annotations
 
 import json
-from collections import Counter, defaultdict
-from dataclasses import dataclass
+import math
+from collections import Counter
+from dataclasses import dataclass, field
+from fractions import Fraction
 from pathlib import Path
-from statistics import mean
-from typing import Any, Iterable
+from typing import Any, Iterable, Iterator, Optional
+
+from .rotation import iter_segment_lines
+from .sketch import DDSketch
 
 
 @dataclass(frozen=True)
@@ -16,26 +20,235 @@ class DurationStats:
     min: float
     max: float
     avg: float
+    stddev: float = 0.0
+    p50: float = math.nan
+    p95: float = math.nan
+    p99: float = math.nan
+    p999: float = math.nan
+    estimated_count: float = math.nan
+    aggregate: Optional["OnlineStats"] = field(default=None, compare=False, repr=False)
+
+    def quantile(self, q: float) -> float:
+        """Estimate an arbitrary quantile from the underlying sketch."""
+        if self.aggregate is None:
+            raise ValueError("DurationStats has no sketch attached")
+        return self.aggregate.sketch.quantile(q)
+
+    def histogram(self) -> list[tuple[float, float, float]]:
+        """Return ``(lower, upper, count)`` sketch buckets in ascending order."""
+        if self.aggregate is None:
+            raise ValueError("DurationStats has no sketch attached")
+        return self.aggregate.sketch.histogram()
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize to a JSON-compatible dict that can be merged later."""
+        if self.aggregate is None:
+            raise ValueError("DurationStats has no aggregate attached")
+        return self.aggregate.to_dict()
+
+    @classmethod
+    def from_dict(cls, payload: dict[str, Any]) -> "DurationStats":
+        return OnlineStats.from_dict(payload).to_stats()
+
+
+def _add_partial(partials: list[float], value: float) -> None:
+    # Shewchuk's exact summation (the algorithm behind math.fsum): `partials`
+    # holds non-overlapping floats whose sum is exactly the running total.
+    index = 0
+    for partial in partials:
+        if abs(value) < abs(partial):
+            value, partial = partial, value
+        high = value + partial
+        low = partial - (high - value)
+        if low:
+            partials[index] = low
+            index += 1
+        value = high
+    partials[index:] = [value]
+
+
+def _exact_sum(partials: list[float]) -> Fraction:
+    return sum((Fraction(partial) for partial in partials), Fraction(0))
+
+
+@dataclass
+class OnlineStats:
+    """Single-pass count/min/max/sum/sum-of-squares accumulator plus a DDSketch
+    for quantiles, so memory per name is bounded.
+
+    Sums are kept exactly, so the final mean and variance do not depend on the
+    order values were added or accumulators were merged: splitting a file into
+    chunks and merging gives bit-identical results to a serial pass.
+
+    Sampled events carry a weight (the number of calls they represent); sums,
+    quantiles and ``estimated_count`` are weighted accordingly while ``count``
+    is the number of events seen.
+    """
+
+    count: int = 0
+    min: float = math.inf
+    max: float = -math.inf
+    sum_partials: list[float] = field(default_factory=list)
+    square_partials: list[float] = field(default_factory=list)
+    extra_weight_partials: list[float] = field(default_factory=list)
+    nonfinite_sum: float = 0.0
+    sketch: DDSketch = field(default_factory=DDSketch)
+
+    def add(self, value: float, weight: float = 1.0) -> None:
+        self.count += 1
+        if weight != 1.0:
+            _add_partial(self.extra_weight_partials, weight - 1.0)
+        if math.isfinite(value):
+            _add_partial(self.sum_partials, weight * value)
+            _add_partial(self.square_partials, weight * value * value)
+        else:
+            self.nonfinite_sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.sketch.add(value, weight)
+
+    def merge(self, other: "OnlineStats") -> None:
+        """Fold another accumulator into this one."""
+        if other.count == 0:
+            return
+        self.sketch.merge(other.sketch)
+        self.count += other.count
+        for partial in other.sum_partials:
+            _add_partial(self.sum_partials, partial)
+        for partial in other.square_partials:
+            _add_partial(self.square_partials, partial)
+        for partial in other.extra_weight_partials:
+            _add_partial(self.extra_weight_partials, partial)
+        self.nonfinite_sum += other.nonfinite_sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def _total_weight(self) -> Fraction:
+        return self.count + _exact_sum(self.extra_weight_partials)
+
+    @property
+    def estimated_count(self) -> float:
+        """Estimated number of calls, accounting for sample weights."""
+        return float(self._total_weight())
+
+    @property
+    def mean(self) -> float:
+        if self.count == 0:
+            return 0.0
+        if self.nonfinite_sum:
+            return self.nonfinite_sum
+        return float(_exact_sum(self.sum_partials) / self._total_weight())
+
+    @property
+    def variance(self) -> float:
+        weight = self._total_weight()
+        if weight <= 1:
+            return 0.0
+        if self.nonfinite_sum:
+            return math.nan
+        total = _exact_sum(self.sum_partials)
+        squares = _exact_sum(self.square_partials)
+        return max(float((squares - total * total / weight) / (weight - 1)), 0.0)
+
+    def to_stats(self) -> DurationStats:
+        # NaN values never compare below min or above max; if nothing else
+        # was seen, report NaN rather than the untouched +/-inf.
+        seen = self.min <= self.max
+        return DurationStats(
+            count=self.count,
+            min=self.min if seen else math.nan,
+            max=self.max if seen else math.nan,
+            avg=self.mean,
+            stddev=math.sqrt(self.variance) if not math.isnan(self.variance) else math.nan,
+            p50=self.sketch.quantile(0.5),
+            p95=self.sketch.quantile(0.95),
+            p99=self.sketch.quantile(0.99),
+            p999=self.sketch.quantile(0.999),
+            estimated_count=self.estimated_count,
+            aggregate=self,
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "sum_partials": list(self.sum_partials),
+            "square_partials": list(self.square_partials),
+            "extra_weight_partials": list(self.extra_weight_partials),
+            "nonfinite_sum": str(self.nonfinite_sum),
+            "sketch": self.sketch.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, payload: dict[str, Any]) -> "OnlineStats":
+        count = int(payload["count"])
+        return cls(
+            count=count,
+            min=float(payload["min"]) if count else math.inf,
+            max=float(payload["max"]) if count else -math.inf,
+            sum_partials=[float(value) for value in payload["sum_partials"]],
+            square_partials=[float(value) for value in payload["square_partials"]],
+            extra_weight_partials=[
+                float(value) for value in payload.get("extra_weight_partials", [])
+            ],
+            nonfinite_sum=float(payload.get("nonfinite_sum", 0.0)),
+            sketch=DDSketch.from_dict(payload["sketch"]),
+        )
+
+
+def merge_duration_stats(*results: dict[str, DurationStats]) -> dict[str, DurationStats]:
+    """Merge per-name stats computed separately (e.g. per file or per host)."""
+    merged: dict[str, OnlineStats] = {}
+    for result in results:
+        for name, stats in result.items():
+            if stats.aggregate is None:
+                raise ValueError(f"DurationStats for {name!r} has no aggregate attached")
+            target = merged.get(name)
+            if target is None:
+                target = merged[name] = OnlineStats()
+            target.merge(stats.aggregate)
+    return {name: aggregate.to_stats() for name, aggregate in merged.items()}
+
+
+def _parse_lines(lines: Iterable[str]) -> Iterator[dict[str, Any]]:
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            yield {"raw": line}
+
+
+def _iter_json_lines(path: Path) -> Iterator[dict[str, Any]]:
+    # Rotated (and possibly compressed) segments first, then the live file.
+    yield from _parse_lines(iter_segment_lines(path))
 
 
 def _read_json_lines(path: Path) -> list[dict[str, Any]]:
-    if not path.exists():
-        return []
-    entries: list[dict[str, Any]] = []
-    with path.open("r", encoding="utf-8", errors="replace") as handle:
-        for line in handle:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                entries.append(json.loads(line))
-            except json.JSONDecodeError:
-                entries.append({"raw": line})
-    return entries
+    return list(_iter_json_lines(path))
+
+
+def iter_detail_entries(path: str | Path) -> Iterator[dict[str, Any]]:
+    """Lazily yield JSONL detail log entries one line at a time.
+
+    Rotated segments of ``path`` (plain, ``.gz`` or ``.zst``) are read first,
+    oldest to newest, followed by the live file.
+    """
+    return _iter_json_lines(Path(path))
+
+
+def iter_overview_entries(path: str | Path) -> Iterator[dict[str, Any]]:
+    """Lazily yield JSONL overview entries (if the overview log is JSONL)."""
+    return _iter_json_lines(Path(path))
 
 
 def load_detail_entries(path: str | Path) -> list[dict[str, Any]]:
-    """Load JSONL detail log entries."""
+    """Load JSONL detail log entries, including rotated segments."""
     return _read_json_lines(Path(path))
 
 
@@ -55,63 +268,250 @@ def count_events(entries: Iterable[dict[str, Any]]) -> Counter[str]:
     return counter
 
 
-def duration_stats(
+def _extract_value(
+    entry: Any,
+    *,
+    event: str,
+    name_key: str,
+    value_key: str,
+    unit: str | None = None,
+) -> Optional[tuple[str, float, float]]:
+    if not isinstance(entry, dict):
+        return None
+    if entry.get("event") != event:
+        return None
+    if unit and entry.get("unit") != unit:
+        return None
+    name = entry.get(name_key)
+    value = entry.get(value_key)
+    if name is None or value is None:
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return str(name), number, _sample_weight(entry)
+
+
+def _sample_weight(entry: dict[str, Any]) -> float:
+    weight = entry.get("sample_weight")
+    if weight is None:
+        return 1.0
+    try:
+        weight = float(weight)
+    except (TypeError, ValueError):
+        return 1.0
+    return weight if weight > 0 else 1.0
+
+
+def _add_value(
+    aggregates: dict[str, OnlineStats], extracted: Optional[tuple[str, float, float]]
+) -> None:
+    if extracted is None:
+        return
+    name, number, weight = extracted
+    aggregate = aggregates.get(name)
+    if aggregate is None:
+        aggregate = aggregates[name] = OnlineStats()
+    aggregate.add(number, weight)
+
+
+def _add_summary(
+    aggregates: dict[str, OnlineStats],
+    entry: Any,
+    *,
+    event: str,
+    name_key: str,
+    unit: str | None = None,
+) -> None:
+    # Summary events (see metrics.MetricsRegistry) carry a serialized
+    # OnlineStats for a whole window, merged as if every call had been logged.
+    if not isinstance(entry, dict) or entry.get("event") != f"{event}_summary":
+        return
+    if unit and entry.get("unit") != unit:
+        return
+    name = entry.get(name_key)
+    payload = entry.get("aggregate")
+    if name is None or not isinstance(payload, dict):
+        return
+    try:
+        summary = OnlineStats.from_dict(payload)
+    except (KeyError, TypeError, ValueError):
+        return
+    aggregate = aggregates.get(str(name))
+    if aggregate is None:
+        aggregate = aggregates[str(name)] = OnlineStats()
+    aggregate.merge(summary)
+
+
+def _aggregate(
     entries: Iterable[dict[str, Any]],
     *,
+    event: str,
+    name_key: str,
+    value_key: str,
     unit: str | None = None,
-) -> dict[str, DurationStats]:
-    """Aggregate duration events by duration_name."""
-    values: dict[str, list[float]] = defaultdict(list)
+    summaries: bool = True,
+) -> dict[str, OnlineStats]:
+    aggregates: dict[str, OnlineStats] = {}
+    summary_event = f"{event}_summary"
     for entry in entries:
-        if not isinstance(entry, dict):
+        if isinstance(entry, dict) and entry.get("event") == summary_event:
+            if summaries:
+                _add_summary(aggregates, entry, event=event, name_key=name_key, unit=unit)
             continue
-        if entry.get("event") != "duration":
-            continue
-        if unit and entry.get("unit") != unit:
-            continue
-        name = entry.get("duration_name")
-        elapsed = entry.get("elapsed")
-        if name is None or elapsed is None:
-            continue
-        try:
-            values[str(name)].append(float(elapsed))
-        except (TypeError, ValueError):
-            continue
-
-    stats: dict[str, DurationStats] = {}
-    for name, items in values.items():
-        stats[name] = DurationStats(
-            count=len(items),
-            min=min(items),
-            max=max(items),
-            avg=mean(items),
+        _add_value(
+            aggregates,
+            _extract_value(entry, event=event, name_key=name_key, value_key=value_key, unit=unit),
         )
-    return stats
+    return aggregates
+
+
+def duration_stats(
+    entries: Iterable[dict[str, Any]],
+    *,
+    unit: str | None = None,
+    metric: str = "elapsed",
+) -> dict[str, DurationStats]:
+    """Aggregate duration (and duration_summary) events by duration_name in a single pass.
+
+    ``metric`` selects the value: wall time (``elapsed``, default), or for
+    events logged with ``cpu_time=True`` ``thread_time``, ``process_time`` or
+    ``cpu_ratio``. Summaries hold wall time only, so they count only for
+    ``elapsed``.
+    """
+    aggregates = _aggregate(
+        entries,
+        event="duration",
+        name_key="duration_name",
+        value_key=metric,
+        unit=unit,
+        summaries=metric == "elapsed",
+    )
+    return {name: aggregate.to_stats() for name, aggregate in aggregates.items()}
 
 
 def return_count_stats(entries: Iterable[dict[str, Any]]) -> dict[str, DurationStats]:
-    """Aggregate return_count events by return_count_name."""
-    values: dict[str, list[float]] = defaultdict(list)
-    for entry in entries:
-        if not isinstance(entry, dict):
-            continue
-        if entry.get("event") != "return_count":
-            continue
-        name = entry.get("return_count_name")
-        count = entry.get("count")
-        if name is None or count is None:
-            continue
-        try:
-            values[str(name)].append(float(count))
-        except (TypeError, ValueError):
-            continue
+    """Aggregate return_count (and return_count_summary) events by return_count_name."""
+    aggregates = _aggregate(
+        entries, event="return_count", name_key="return_count_name", value_key="count"
+    )
+    return {name: aggregate.to_stats() for name, aggregate in aggregates.items()}
+
+
+def memory_stats(
+    entries: Iterable[dict[str, Any]],
+    *,
+    metric: str = "rss_delta",
+) -> dict[str, DurationStats]:
+    """Aggregate memory events by memory_name, over one byte-valued ``metric``.
+
+    ``metric`` is any numeric field of the events: ``rss_delta`` (default),
+    ``rss_after``, ``peak_rss``, ``traced_peak``, ``traced_delta`` or
+    ``gc_collected``. Events without it (e.g. untraced calls for
+    ``traced_peak``) are skipped.
+    """
+    aggregates = _aggregate(entries, event="memory", name_key="memory_name", value_key=metric)
+    return {name: aggregate.to_stats() for name, aggregate in aggregates.items()}
+
+
+@dataclass(frozen=True)
+class AnalysisResult:
+    events: Counter[str]
+    durations: dict[str, DurationStats]
+    return_counts: dict[str, DurationStats]
+
+
+@dataclass
+class LogAggregates:
+    """Mergeable partial results of count_events, duration_stats and
+    return_count_stats, computed together in one pass over the entries."""
+
+    unit: str | None = None
+    events: Counter[str] = field(default_factory=Counter)
+    durations: dict[str, OnlineStats] = field(default_factory=dict)
+    return_counts: dict[str, OnlineStats] = field(default_factory=dict)
+
+    def add_entries(self, entries: Iterable[dict[str, Any]]) -> None:
+        events = self.events
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            event = entry.get("event")
+            if event:
+                events[str(event)] += 1
+            if event == "duration":
+                _add_value(
+                    self.durations,
+                    _extract_value(
+                        entry,
+                        event="duration",
+                        name_key="duration_name",
+                        value_key="elapsed",
+                        unit=self.unit,
+                    ),
+                )
+            elif event == "return_count":
+                _add_value(
+                    self.return_counts,
+                    _extract_value(
+                        entry,
+                        event="return_count",
+                        name_key="return_count_name",
+                        value_key="count",
+                    ),
+                )
+            elif event == "duration_summary":
+                _add_summary(
+                    self.durations,
+                    entry,
+                    event="duration",
+                    name_key="duration_name",
+                    unit=self.unit,
+                )
+            elif event == "return_count_summary":
+                _add_summary(
+                    self.return_counts, entry, event="return_count", name_key="return_count_name"
+                )
+
+    def merge(self, other: "LogAggregates") -> None:
+        self.events.update(other.events)
+        for target, source in (
+            (self.durations, other.durations),
+            (self.return_counts, other.return_counts),
+        ):
+            for name, aggregate in source.items():
+                existing = target.get(name)
+                if existing is None:
+                    existing = target[name] = OnlineStats()
+                existing.merge(aggregate)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "unit": self.unit,
+            "events": dict(self.events),
+            "durations": {name: item.to_dict() for name, item in self.durations.items()},
+            "return_counts": {name: item.to_dict() for name, item in self.return_counts.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, payload: dict[str, Any]) -> "LogAggregates":
+        return cls(
+            unit=payload.get("unit"),
+            events=Counter(payload.get("events", {})),
+            durations={
+                name: OnlineStats.from_dict(item)
+                for name, item in payload.get("durations", {}).items()
+            },
+            return_counts={
+                name: OnlineStats.from_dict(item)
+                for name, item in payload.get("return_counts", {}).items()
+            },
+        )
 
-    stats: dict[str, DurationStats] = {}
-    for name, items in values.items():
-        stats[name] = DurationStats(
-            count=len(items),
-            min=min(items),
-            max=max(items),
-            avg=mean(items),
+    def result(self) -> AnalysisResult:
+        return AnalysisResult(
+            events=Counter(self.events),
+            durations={name: item.to_stats() for name, item in self.durations.items()},
+            return_counts={name: item.to_stats() for name, item in self.return_counts.items()},
         )
-    return stats
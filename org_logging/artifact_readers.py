@@ -0,0 +1,84 @@
+"""Memory-mapped readers for array artifacts written by ``log_object``.
+
+``.npy`` artifacts open as read-only ``numpy.memmap`` arrays and ``.arrow``
+artifacts as zero-copy Arrow tables over a memory map, so shape, dtype and
+slices can be inspected without reading whole payloads. NumPy and pyarrow are
+only imported when an artifact of that kind is opened.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Mapping
+
+from .artifacts import ArtifactMeta
+
+
+def artifact_path(artifact: str | Path | ArtifactMeta | Mapping[str, Any]) -> Path:
+    """Resolve a path, an ``ArtifactMeta`` or a ``log_object`` payload to a file path."""
+    if isinstance(artifact, ArtifactMeta):
+        return Path(artifact.path)
+    if isinstance(artifact, Mapping):
+        value = artifact.get("artifact_path")
+        if not value:
+            raise ValueError("payload has no artifact_path (inline or still pending?)")
+        return Path(value)
+    return Path(artifact)
+
+
+def load_array(artifact: str | Path | ArtifactMeta | Mapping[str, Any], *, mmap: bool = True) -> Any:
+    """Open an ``.npy`` artifact; memory-mapped read-only unless ``mmap=False``."""
+    import numpy as np  # type: ignore
+
+    return np.load(artifact_path(artifact), mmap_mode="r" if mmap else None, allow_pickle=False)
+
+
+def load_arrow(artifact: str | Path | ArtifactMeta | Mapping[str, Any], *, mmap: bool = True) -> Any:
+    """Open an ``.arrow`` (IPC file) artifact as a ``pyarrow.Table``."""
+    try:
+        import pyarrow as pa  # type: ignore
+    except ImportError as exc:
+        raise ImportError("Reading Arrow artifacts requires pyarrow") from exc
+
+    path = artifact_path(artifact)
+    source = pa.memory_map(str(path)) if mmap else pa.OSFile(str(path))
+    return pa.ipc.open_file(source).read_all()
+
+
+def _describe_npy(path: Path) -> dict[str, Any]:
+    from numpy.lib import format as npy_format  # type: ignore
+
+    with path.open("rb") as handle:
+        version = npy_format.read_magic(handle)
+        if version == (1, 0):
+            shape, fortran_order, dtype = npy_format.read_array_header_1_0(handle)
+        else:
+            shape, fortran_order, dtype = npy_format.read_array_header_2_0(handle)
+    return {"shape": list(shape), "dtype": dtype.str, "fortran_order": fortran_order}
+
+
+def _describe_arrow(path: Path) -> dict[str, Any]:
+    import pyarrow as pa  # type: ignore
+
+    reader = pa.ipc.open_file(pa.memory_map(str(path)))
+    rows = sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+    schema = reader.schema
+    return {
+        "rows": rows,
+        "columns": [{"name": field.name, "type": str(field.type)} for field in schema],
+    }
+
+
+def describe_artifact(artifact: str | Path | ArtifactMeta | Mapping[str, Any]) -> dict[str, Any]:
+    """Return format, size and (for arrays/tables) shape/schema, reading headers only."""
+    path = artifact_path(artifact)
+    info: dict[str, Any] = {"path": str(path), "bytes": path.stat().st_size}
+    if path.suffix == ".npy":
+        info["format"] = "npy"
+        info.update(_describe_npy(path))
+    elif path.suffix == ".arrow":
+        info["format"] = "arrow"
+        info.update(_describe_arrow(path))
+    else:
+        info["format"] = path.suffix.lstrip(".") or "bytes"
+    return info
@@ -2,9 +2,20 @@ from __future__ import annotations
 
 import hashlib
 import json
-from dataclasses import dataclass
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import IO, Any, Dict, Iterable, Optional
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+INDEX_FILENAME = "index.sqlite"
+_BLOB_NAME = re.compile(r"([0-9a-f]{64})(.*)")
+_EVICTION_ORDER = {"lru": "last_access", "fifo": "created"}
 
 
 @dataclass(frozen=True)
@@ -14,17 +25,298 @@ class ArtifactMeta:
     hash: str
 
 
+@dataclass(frozen=True)
+class ArtifactRecord:
+    hash: str
+    suffix: str
+    path: str
+    bytes: int
+    created: float
+    last_access: float
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class ArtifactIndex:
+    """SQLite metadata index of an artifact store (``<root>/index.sqlite``).
+
+    One row per blob with its size, creation time and last access time. The
+    database runs in WAL mode so other processes (e.g. the UI) can read it
+    while the store writes. ``readonly=True`` never creates or modifies it.
+    """
+
+    def __init__(self, path: str | Path, *, readonly: bool = False) -> None:
+        self.path = Path(path)
+        self.readonly = readonly
+        self._lock = threading.Lock()
+        if readonly:
+            self._conn = sqlite3.connect(
+                f"file:{self.path}?mode=ro", uri=True, check_same_thread=False
+            )
+            return
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS artifacts (
+                hash TEXT NOT NULL,
+                suffix TEXT NOT NULL,
+                path TEXT NOT NULL,
+                bytes INTEGER NOT NULL,
+                created REAL NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (hash, suffix)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS artifacts_last_access ON artifacts (last_access)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS artifacts_created ON artifacts (created)")
+
+    def upsert(self, meta: ArtifactMeta, suffix: str, *, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO artifacts (hash, suffix, path, bytes, created, last_access)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (hash, suffix) DO UPDATE SET
+                    path = excluded.path, last_access = excluded.last_access
+                """,
+                (meta.hash, suffix, meta.path, meta.bytes, now, now),
+            )
+
+    def touch(self, digest: str, suffix: str = "") -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE artifacts SET last_access = ? WHERE hash = ? AND suffix = ?",
+                (time.time(), digest, suffix),
+            )
+
+    def delete(self, records: Iterable[ArtifactRecord]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM artifacts WHERE hash = ? AND suffix = ?",
+                [(record.hash, record.suffix) for record in records],
+            )
+
+    def _select(self, where: str = "", params: tuple = (), tail: str = "") -> list[ArtifactRecord]:
+        query = "SELECT hash, suffix, path, bytes, created, last_access FROM artifacts"
+        if where:
+            query += f" WHERE {where}"
+        with self._lock:
+            rows = self._conn.execute(f"{query} {tail}", params).fetchall()
+        return [ArtifactRecord(*row) for row in rows]
+
+    def lookup(self, digest: str) -> list[ArtifactRecord]:
+        """Records whose hash starts with ``digest`` (a full or abbreviated sha256)."""
+        prefix = digest.lower()
+        if not prefix:
+            return self._select(tail="LIMIT 100")
+        # A range over the primary key, which SQLite can seek; LIKE scans.
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        return self._select("hash >= ? AND hash < ?", (prefix, upper, 100), "LIMIT ?")
+
+    def last_access(self, digest: str, suffix: str = "") -> Optional[float]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_access FROM artifacts WHERE hash = ? AND suffix = ?",
+                (digest, suffix),
+            ).fetchone()
+        return None if row is None else float(row[0])
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM artifacts").fetchone()[0])
+
+    def oldest(
+        self,
+        order: str,
+        limit: int,
+        *,
+        before: Optional[float] = None,
+        accessed_before: Optional[float] = None,
+    ) -> list[ArtifactRecord]:
+        column = _EVICTION_ORDER[order]
+        conditions: list[str] = []
+        params: list[Any] = []
+        if before is not None:
+            conditions.append(f"{column} < ?")
+            params.append(before)
+        if accessed_before is not None:
+            conditions.append("last_access < ?")
+            params.append(accessed_before)
+        params.append(limit)
+        return self._select(" AND ".join(conditions), tuple(params), f"ORDER BY {column} LIMIT ?")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM artifacts").fetchone()[0])
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
 class ArtifactStore:
-    def __init__(self, root: str | Path = "artifacts") -> None:
+    """Content-addressed blob store.
+
+    Blobs are named by their sha256 and fanned out as ``ab/cd/<hash><suffix>``
+    so no directory grows too large. Writes go to a temp file in the store and
+    are renamed into place, so readers never see partial blobs, and content
+    that is already stored is not written again.
+
+    Every blob is recorded in an ``ArtifactIndex`` (``index=False`` disables
+    it). With ``max_bytes`` and/or ``max_age`` (seconds) a background thread
+    evicts blobs, least recently used first (``eviction="lru"``) or oldest
+    first (``"fifo"``), in batches of ``gc_batch`` so writers are never held
+    up for long. ``collect()`` runs the same eviction synchronously.
+    """
+
+    def __init__(
+        self,
+        root: str | Path = "artifacts",
+        *,
+        max_bytes: Optional[int] = None,
+        max_age: Optional[float] = None,
+        eviction: str = "lru",
+        index: bool = True,
+        gc_batch: int = 256,
+    ) -> None:
+        if eviction not in _EVICTION_ORDER:
+            raise ValueError(f"Unsupported eviction policy: {eviction}")
+        if (max_bytes is not None or max_age is not None) and not index:
+            raise ValueError("max_bytes/max_age require the metadata index")
         self.root = Path(root)
         self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.eviction = eviction
+        self.gc_batch = gc_batch
+        self.index: Optional[ArtifactIndex] = None
+        self._stored_bytes = 0
+        # Held across a dedup hit and its last_access update, and across
+        # eviction's re-check and unlink, so GC never removes a blob whose
+        # path was just handed out.
+        self._lock = threading.Lock()
+        self._gc_wakeup = threading.Event()
+        self._gc_thread: Optional[threading.Thread] = None
+        self._closed = False
+        if index:
+            self.index = ArtifactIndex(self.root / INDEX_FILENAME)
+            if len(self.index) == 0:
+                self.reindex()
+            self._stored_bytes = self.index.total_bytes()
+            if max_bytes is not None or max_age is not None:
+                self._gc_thread = threading.Thread(
+                    target=self._gc_loop, name="org_logging-artifact-gc", daemon=True
+                )
+                self._gc_thread.start()
+                self._gc_wakeup.set()
+
+    def path_for(self, digest: str, suffix: str = "") -> Path:
+        return self.root / digest[:2] / digest[2:4] / f"{digest}{suffix}"
+
+    def _existing(self, digest: str, suffix: str) -> Optional[Path]:
+        path = self.path_for(digest, suffix)
+        if path.exists():
+            return path
+        legacy = self.root / f"{digest}{suffix}"  # flat layout used by older versions
+        if legacy.exists():
+            return legacy
+        return None
+
+    def _temp_file(self) -> tuple[IO[bytes], Path]:
+        # Same directory tree as the target so the final rename is atomic;
+        # os.open (unlike mkstemp) keeps the usual umask-based permissions.
+        path = self.root / f".tmp-{uuid.uuid4().hex}"
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        return os.fdopen(fd, "wb"), path
+
+    def _record(self, meta: ArtifactMeta, suffix: str, *, created: bool) -> ArtifactMeta:
+        if self.index is None:
+            return meta
+        self.index.upsert(meta, suffix)
+        if created:
+            self._stored_bytes += meta.bytes
+            if self.max_bytes is not None and self._stored_bytes > self.max_bytes:
+                self._gc_wakeup.set()
+        return meta
+
+    def _commit(self, tmp_path: Path, digest: str, suffix: str, size: int) -> ArtifactMeta:
+        with self._lock:
+            existing = self._existing(digest, suffix)
+            if existing is not None:
+                tmp_path.unlink(missing_ok=True)
+                return self._record(ArtifactMeta(path=str(existing), bytes=size, hash=digest), suffix, created=False)
+            path = self.path_for(digest, suffix)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp_path, path)
+            return self._record(ArtifactMeta(path=str(path), bytes=size, hash=digest), suffix, created=True)
 
     def put_bytes(self, data: bytes, *, suffix: str = "") -> ArtifactMeta:
         digest = hashlib.sha256(data).hexdigest()
-        filename = f"{digest}{suffix}"
-        path = self.root / filename
-        path.write_bytes(data)
-        return ArtifactMeta(path=str(path), bytes=len(data), hash=digest)
+        with self._lock:
+            existing = self._existing(digest, suffix)
+            if existing is not None:
+                meta = ArtifactMeta(path=str(existing), bytes=len(data), hash=digest)
+                return self._record(meta, suffix, created=False)
+        handle, tmp_path = self._temp_file()
+        try:
+            with handle:
+                handle.write(data)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        return self._commit(tmp_path, digest, suffix, len(data))
+
+    def put_stream(
+        self,
+        stream: IO[bytes] | Iterable[bytes],
+        *,
+        suffix: str = "",
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> ArtifactMeta:
+        """Store a binary file object or an iterable of byte chunks.
+
+        The content is hashed while it is copied to a temp file, so only one
+        chunk is held in memory at a time.
+        """
+        if hasattr(stream, "read"):
+            read = stream.read  # type: ignore[union-attr]
+            chunks: Iterable[bytes] = iter(lambda: read(chunk_size), b"")
+        else:
+            chunks = stream  # type: ignore[assignment]
+        hasher = hashlib.sha256()
+        size = 0
+        handle, tmp_path = self._temp_file()
+        try:
+            with handle:
+                for chunk in chunks:
+                    hasher.update(chunk)
+                    handle.write(chunk)
+                    size += len(chunk)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        return self._commit(tmp_path, hasher.hexdigest(), suffix, size)
+
+    def put_file(
+        self,
+        path: str | Path,
+        *,
+        suffix: Optional[str] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> ArtifactMeta:
+        """Store a copy of ``path``; ``suffix`` defaults to the file's own suffix."""
+        source = Path(path)
+        with source.open("rb") as handle:
+            return self.put_stream(
+                handle,
+                suffix=source.suffix if suffix is None else suffix,
+                chunk_size=chunk_size,
+            )
 
     def put_json(
         self,
@@ -36,3 +328,99 @@ class ArtifactStore:
     ) -> ArtifactMeta:
         data = json.dumps(payload, indent=indent, sort_keys=sort_keys).encode("utf-8")
         return self.put_bytes(data, suffix=suffix)
+
+    def get_path(self, digest: str, suffix: str = "") -> Optional[Path]:
+        """Return the path of a stored blob (marking it used), or None if absent."""
+        with self._lock:
+            path = self._existing(digest, suffix)
+            if path is not None and self.index is not None:
+                self.index.touch(digest, suffix)
+        return path
+
+    def reindex(self) -> int:
+        """Record blobs already on disk (e.g. written before the index existed)."""
+        if self.index is None:
+            return 0
+        count = 0
+        for directory, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                match = _BLOB_NAME.fullmatch(filename)
+                if match is None:
+                    continue
+                path = Path(directory) / filename
+                stat = path.stat()
+                meta = ArtifactMeta(path=str(path), bytes=stat.st_size, hash=match.group(1))
+                self.index.upsert(meta, match.group(2), now=stat.st_mtime)
+                count += 1
+        return count
+
+    def collect(self) -> int:
+        """Evict blobs beyond ``max_age``/``max_bytes``; returns how many were removed."""
+        if self.index is None:
+            return 0
+        removed = 0
+        # Blobs used after this point are kept, and not selected again.
+        started = time.time()
+        if self.max_age is not None:
+            cutoff = started - self.max_age
+            while not self._closed:
+                batch = self.index.oldest(
+                    self.eviction, self.gc_batch, before=cutoff, accessed_before=started
+                )
+                if not batch:
+                    break
+                removed += self._evict(batch, started)
+        if self.max_bytes is not None:
+            excess = self.index.total_bytes() - self.max_bytes
+            while excess > 0 and not self._closed:
+                batch = []
+                for record in self.index.oldest(
+                    self.eviction, self.gc_batch, accessed_before=started
+                ):
+                    batch.append(record)
+                    excess -= record.bytes
+                    if excess <= 0:
+                        break
+                if not batch:
+                    break
+                removed += self._evict(batch, started)
+        self._stored_bytes = self.index.total_bytes()
+        return removed
+
+    def _evict(self, records: list[ArtifactRecord], started: float) -> int:
+        index = self.index
+        assert index is not None
+        removed = 0
+        for record in records:
+            # One blob per lock hold keeps writers waiting at most one unlink.
+            with self._lock:
+                last_access = index.last_access(record.hash, record.suffix)
+                if last_access is None or last_access >= started:
+                    continue  # already gone, or handed out since collect() began
+                Path(record.path).unlink(missing_ok=True)
+                index.delete([record])
+                removed += 1
+        return removed
+
+    def _gc_loop(self) -> None:
+        # Age limits need periodic sweeps even when nothing is written.
+        sweep = min(self.max_age / 10, 60.0) if self.max_age is not None else None
+        while not self._closed:
+            self._gc_wakeup.wait(sweep)
+            self._gc_wakeup.clear()
+            if self._closed:
+                return
+            try:
+                self.collect()
+            except sqlite3.Error:
+                continue  # e.g. database locked by another process; retry next round
+
+    def close(self) -> None:
+        """Stop background eviction and close the index."""
+        self._closed = True
+        self._gc_wakeup.set()
+        if self._gc_thread is not None:
+            self._gc_thread.join()
+            self._gc_thread = None
+        if self.index is not None:
+            self.index.close()
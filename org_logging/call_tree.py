@@ -0,0 +1,152 @@
+"""Call trees rebuilt from span-carrying duration events.
+
+``log_timing`` and ``log_duration`` events carry ``span_id``,
+``parent_span_id`` and ``depth`` (see ``spans``). ``call_trees`` links them back
+into one forest per ``run_id``; ``span_time_stats`` reports inclusive and self
+time per name, and ``collapsed_stacks`` renders the forest in the collapsed
+stack format read by flame graph tools (``flamegraph.pl``, speedscope, ...).
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Iterator, Mapping, Optional
+
+from .timing import _normalize_unit
+
+
+@dataclass
+class SpanNode:
+    name: str
+    span_id: str
+    parent_span_id: Optional[str]
+    depth: int
+    elapsed_ms: float
+    children: list["SpanNode"] = field(default_factory=list)
+
+    @property
+    def self_ms(self) -> float:
+        """Time not covered by child spans.
+
+        Children that ran concurrently (e.g. tasks under ``asyncio.gather``) can
+        add up to more than their parent; self time is then 0, not negative.
+        """
+        return max(0.0, self.elapsed_ms - sum(child.elapsed_ms for child in self.children))
+
+    def walk(self) -> Iterator[tuple[tuple[str, ...], "SpanNode"]]:
+        """Yield ``(stack of names from the root, node)`` depth first."""
+        pending: list[tuple[tuple[str, ...], SpanNode]] = [((self.name,), self)]
+        while pending:
+            stack, node = pending.pop()
+            yield stack, node
+            for child in reversed(node.children):
+                pending.append((stack + (child.name,), child))
+
+
+@dataclass(frozen=True)
+class SpanTimeStats:
+    calls: int
+    inclusive_ms: float
+    self_ms: float
+
+
+def _span_node(entry: Any) -> Optional[tuple[Any, SpanNode]]:
+    if not isinstance(entry, dict) or entry.get("event") != "duration":
+        return None
+    span_id = entry.get("span_id")
+    name = entry.get("duration_name")
+    if span_id is None or name is None:
+        return None
+    try:
+        elapsed = float(entry.get("elapsed"))
+        elapsed *= _normalize_unit(str(entry.get("unit") or "ms"))[1]
+        depth = int(entry.get("depth") or 0)
+    except (TypeError, ValueError):
+        return None
+    parent = entry.get("parent_span_id")
+    node = SpanNode(
+        name=str(name),
+        span_id=str(span_id),
+        parent_span_id=None if parent is None else str(parent),
+        depth=depth,
+        elapsed_ms=elapsed,
+    )
+    return entry.get("run_id"), node
+
+
+def call_trees(entries: Iterable[dict[str, Any]]) -> dict[str, list[SpanNode]]:
+    """Rebuild the span forest of each run_id from duration events.
+
+    Spans whose parent was not logged (sampled out, aggregated by a registry,
+    or still running) become roots. Children keep the order they finished in.
+    Sample weights are ignored: a tree shows the calls that were logged.
+    """
+    runs: dict[str, dict[str, SpanNode]] = {}
+    for entry in entries:
+        parsed = _span_node(entry)
+        if parsed is None:
+            continue
+        run_id, node = parsed
+        runs.setdefault(run_id, {})[node.span_id] = node
+
+    forests: dict[str, list[SpanNode]] = {}
+    for run_id, nodes in runs.items():
+        roots = forests[run_id] = []
+        for node in nodes.values():
+            parent = nodes.get(node.parent_span_id) if node.parent_span_id else None
+            if parent is None:
+                roots.append(node)
+            else:
+                parent.children.append(node)
+    return forests
+
+
+def _iter_walks(
+    trees: Mapping[str, list[SpanNode]],
+) -> Iterator[tuple[tuple[str, ...], SpanNode]]:
+    for roots in trees.values():
+        for root in roots:
+            yield from root.walk()
+
+
+def span_time_stats(trees: Mapping[str, list[SpanNode]]) -> dict[str, SpanTimeStats]:
+    """Total inclusive and self time per span name across ``call_trees`` output.
+
+    Inclusive time of a name counts only its outermost call on each stack, so
+    recursive spans are not double counted; self time counts every call.
+    """
+    calls: dict[str, int] = {}
+    inclusive: dict[str, float] = {}
+    self_time: dict[str, float] = {}
+    for stack, node in _iter_walks(trees):
+        name = node.name
+        calls[name] = calls.get(name, 0) + 1
+        self_time[name] = self_time.get(name, 0.0) + node.self_ms
+        if name not in stack[:-1]:
+            inclusive[name] = inclusive.get(name, 0.0) + node.elapsed_ms
+    return {
+        name: SpanTimeStats(calls=calls[name], inclusive_ms=inclusive[name], self_ms=self_time[name])
+        for name in calls
+    }
+
+
+def _frame(name: str) -> str:
+    return name.replace(";", ":").replace("\n", " ")
+
+
+def collapsed_stacks(trees: Mapping[str, list[SpanNode]]) -> list[str]:
+    """Render ``call_trees`` output as collapsed stacks, one ``a;b;c <us>`` line each.
+
+    The value is the self time of that stack in whole microseconds, summed over
+    all runs in ``trees``; write the lines to a file for ``flamegraph.pl``.
+    """
+    totals: dict[str, float] = {}
+    for stack, node in _iter_walks(trees):
+        key = ";".join(_frame(name) for name in stack)
+        totals[key] = totals.get(key, 0.0) + node.self_ms
+    lines = []
+    for key in sorted(totals):
+        micros = round(totals[key] * 1000)
+        if micros > 0:
+            lines.append(f"{key} {micros}")
+    return lines
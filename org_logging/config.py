@@ -4,6 +4,9 @@ from pathlib import Path
 from typing import Optional
 
 from .formatters import JsonlFormatter, OverviewFormatter
+from .handlers import BatchingQueueHandler, QueueStats
+from .multiprocess import LogCollector, collector_info, install_worker_handler
+from .rotation import CompressingRotatingFileHandler
 
 _DEFAULT_CONTEXT = {"app": None, "run_id": None}
 
@@ -28,11 +31,45 @@ def configure_logging(
     overview_level: int = logging.INFO,
     detail_level: int = logging.DEBUG,
     console_level: int = logging.INFO,
+    async_mode: bool = False,
+    queue_size: int = 10000,
+    batch_size: int = 256,
+    flush_interval: float = 0.5,
+    max_bytes: int = 0,
+    rotate_interval: Optional[float] = None,
+    compression: Optional[str] = "gzip",
+    backup_count: int = 0,
+    multiprocess: bool = False,
 ) -> str:
     """Configure logging with overview, detail JSONL, and console handlers.
 
+    With ``async_mode=True`` the handlers sit behind a bounded queue and a single
+    background writer formats and writes records in batches of up to
+    ``batch_size``, waiting at most ``flush_interval`` seconds for a batch to fill.
+
+    Setting ``max_bytes`` and/or ``rotate_interval`` (seconds) rotates the
+    overview and detail files; rotated segments are compressed with
+    ``compression`` (``"gzip"``, ``"zstd"`` or ``None``) in the background and
+    only the newest ``backup_count`` are kept (``0`` keeps all).
+
+    With ``multiprocess=True`` the first process to call this becomes the
+    collector: it owns the files and writes records batched as in
+    ``async_mode``. Processes started from it (fork or spawn) that call this
+    again become workers and ship their records to the collector; they use the
+    collector's ``app`` and ``run_id`` (unless ``run_id`` is given) and ignore
+    the file options. Forked children are switched over automatically.
+
     Returns the run_id used for this configuration.
     """
+    collector = collector_info() if multiprocess else None
+    if collector is not None:
+        resolved_run_id = run_id or collector["run_id"]
+        _DEFAULT_CONTEXT.update({"app": collector["app"] or app_name, "run_id": resolved_run_id})
+        install_worker_handler(
+            collector, queue_size=queue_size, batch_size=batch_size, flush_interval=flush_interval
+        )
+        return resolved_run_id
+
     resolved_run_id = run_id or uuid.uuid4().hex
     _DEFAULT_CONTEXT.update({"app": app_name, "run_id": resolved_run_id})
 
@@ -44,12 +81,25 @@ def configure_logging(
 
     for handler in list(root_logger.handlers):
         root_logger.removeHandler(handler)
-
-    overview_handler = logging.FileHandler(log_path / overview_filename)
+        if isinstance(handler, BatchingQueueHandler):
+            handler.close()
+
+    def file_handler(path: Path) -> logging.FileHandler:
+        if not max_bytes and not rotate_interval:
+            return logging.FileHandler(path)
+        return CompressingRotatingFileHandler(
+            path,
+            max_bytes=max_bytes,
+            interval=rotate_interval,
+            compression=compression,
+            backup_count=backup_count,
+        )
+
+    overview_handler = file_handler(log_path / overview_filename)
     overview_handler.setLevel(overview_level)
     overview_handler.setFormatter(OverviewFormatter())
 
-    detail_handler = logging.FileHandler(log_path / detail_filename)
+    detail_handler = file_handler(log_path / detail_filename)
     detail_handler.setLevel(detail_level)
     detail_handler.setFormatter(JsonlFormatter())
 
@@ -57,13 +107,33 @@ def configure_logging(
     console_handler.setLevel(console_level)
     console_handler.setFormatter(OverviewFormatter())
 
-    root_logger.addHandler(overview_handler)
-    root_logger.addHandler(detail_handler)
-    root_logger.addHandler(console_handler)
+    handlers = [overview_handler, detail_handler, console_handler]
+    if async_mode or multiprocess:
+        queue_class = LogCollector if multiprocess else BatchingQueueHandler
+        queue_handler = queue_class(
+            handlers,
+            queue_size=queue_size,
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+        )
+        root_logger.addHandler(queue_handler)
+        if isinstance(queue_handler, LogCollector):
+            queue_handler.publish(app_name, resolved_run_id)
+    else:
+        for handler in handlers:
+            root_logger.addHandler(handler)
 
     return resolved_run_id
 
 
+def queue_stats() -> Optional[QueueStats]:
+    """Return writer counters when logging was configured with async_mode."""
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, BatchingQueueHandler):
+            return handler.stats()
+    return None
+
+
 def get_logger(name: str, app: Optional[str] = None, run_id: Optional[str] = None) -> ContextAdapter:
     """Return a LoggerAdapter with app/run_id injected into log records."""
     context = {
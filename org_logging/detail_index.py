@@ -0,0 +1,271 @@
+"""Persistent indexes for looking up JSONL detail log entries by id."""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from .rotation import open_segment, rotated_segments, segment_key
+
+_INDEX_VERSION = 1
+_CHECKPOINT = "#"
+
+
+class DetailIndex:
+    """Sidecar index mapping field values (``id``, ``run_id``) to line offsets.
+
+    The index lives next to the log (``<log>.index`` by default) as an
+    append-only JSONL file: a header line with the log's identity, then
+    ``[key, value, offset]`` records, each batch followed by a
+    ``["#", indexed_upto]`` checkpoint. ``refresh()`` indexes only lines
+    appended since the last checkpoint; truncation or rotation of the log
+    triggers a rebuild. Lookups seek straight to the matching lines.
+    """
+
+    def __init__(
+        self,
+        log_path: str | Path,
+        *,
+        index_path: Optional[str | Path] = None,
+        keys: Iterable[str] = ("id", "run_id"),
+    ) -> None:
+        self.log_path = Path(log_path)
+        self.index_path = (
+            Path(index_path) if index_path else self.log_path.with_name(self.log_path.name + ".index")
+        )
+        self.keys = tuple(keys)
+        self._offsets: dict[tuple[str, str], list[int]] = {}
+        self._identity: Optional[tuple[int, int]] = None
+        self._indexed_upto = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _reset(self, identity: tuple[int, int]) -> None:
+        self._offsets = {}
+        self._identity = identity
+        self._indexed_upto = 0
+        header = {"version": _INDEX_VERSION, "device": identity[0], "inode": identity[1], "keys": list(self.keys)}
+        with self.index_path.open("w", encoding="utf-8") as handle:
+            handle.write(json.dumps(header) + "\n")
+
+    def _load(self) -> None:
+        self._loaded = True
+        if not self.index_path.exists():
+            return
+        with self.index_path.open("r", encoding="utf-8") as handle:
+            try:
+                header = json.loads(handle.readline())
+            except json.JSONDecodeError:
+                return
+            if header.get("version") != _INDEX_VERSION or header.get("keys") != list(self.keys):
+                return
+            offsets: dict[tuple[str, str], list[int]] = {}
+            pending: list[tuple[str, str, int]] = []
+            upto = 0
+            for line in handle:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # torn write; everything after the last checkpoint is redone
+                if record[0] == _CHECKPOINT:
+                    for key, value, offset in pending:
+                        offsets.setdefault((key, value), []).append(offset)
+                    pending = []
+                    upto = int(record[1])
+                else:
+                    pending.append((record[0], record[1], int(record[2])))
+        self._offsets = offsets
+        self._identity = (int(header["device"]), int(header["inode"]))
+        self._indexed_upto = upto
+
+    def refresh(self) -> None:
+        """Index lines appended to the log since the last refresh."""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            if not self.log_path.exists():
+                return
+            stat = self.log_path.stat()
+            identity = (stat.st_dev, stat.st_ino)
+            if identity != self._identity or stat.st_size < self._indexed_upto:
+                self._reset(identity)
+            if stat.st_size == self._indexed_upto:
+                return
+            self._index_range(self._indexed_upto, stat.st_size)
+
+    def _index_range(self, start: int, size: int) -> None:
+        records: list[str] = []
+        offset = start
+        with self.log_path.open("rb") as handle:
+            handle.seek(start)
+            while offset < size:
+                line = handle.readline()
+                if not line.endswith(b"\n"):
+                    break  # partial line still being written
+                markers = [key for key in self.keys if f'"{key}"'.encode() in line]
+                if markers:
+                    try:
+                        item = json.loads(line)
+                    except json.JSONDecodeError:
+                        item = None
+                    if isinstance(item, dict):
+                        for key in markers:
+                            value = item.get(key)
+                            if value is None:
+                                continue
+                            value = str(value)
+                            self._offsets.setdefault((key, value), []).append(offset)
+                            records.append(json.dumps([key, value, offset]))
+                offset += len(line)
+        records.append(json.dumps([_CHECKPOINT, offset]))
+        with self.index_path.open("a", encoding="utf-8") as handle:
+            handle.write("\n".join(records) + "\n")
+            handle.flush()
+            os.fsync(handle.fileno())
+        self._indexed_upto = offset
+
+    def offsets(self, key: str, value: str) -> list[int]:
+        if key not in self.keys:
+            raise KeyError(f"{key!r} is not indexed")
+        self.refresh()
+        return list(self._offsets.get((key, str(value)), ()))
+
+    def lookup(self, key: str, value: str, *, limit: Optional[int] = None) -> list[dict[str, Any]]:
+        """Return entries whose ``key`` equals ``value`` (the newest ``limit`` if set)."""
+        offsets = self.offsets(key, value)
+        if limit:
+            offsets = offsets[-limit:]
+        entries: list[dict[str, Any]] = []
+        with self.log_path.open("rb") as handle:
+            for offset in offsets:
+                handle.seek(offset)
+                line = handle.readline().decode("utf-8", errors="replace").strip()
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    entries.append({"raw": line})
+        return entries
+
+
+class SegmentIndex:
+    """Which rotated segments of a log contain each value of ``keys``.
+
+    Rotated segments never change, so each one is scanned once, the first time
+    it is seen, and its values are appended to ``<log>.segments.index`` as one
+    ``[segment, {key: [values]}]`` line. A lookup then opens only the segments
+    that hold a match. Compressing a segment keeps its entry (see
+    ``segment_key``); pruned segments are skipped.
+    """
+
+    def __init__(
+        self,
+        log_path: str | Path,
+        *,
+        index_path: Optional[str | Path] = None,
+        keys: Iterable[str] = ("id",),
+    ) -> None:
+        self.log_path = Path(log_path)
+        self.index_path = (
+            Path(index_path)
+            if index_path
+            else self.log_path.with_name(self.log_path.name + ".segments.index")
+        )
+        self.keys = tuple(keys)
+        self._values: dict[str, dict[str, set[str]]] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _load(self) -> None:
+        self._loaded = True
+        header = {"version": _INDEX_VERSION, "keys": list(self.keys)}
+        if self.index_path.exists():
+            with self.index_path.open("r", encoding="utf-8") as handle:
+                try:
+                    valid = json.loads(handle.readline()) == header
+                except json.JSONDecodeError:
+                    valid = False
+                if valid:
+                    for line in handle:
+                        try:
+                            segment, values = json.loads(line)
+                        except (json.JSONDecodeError, ValueError):
+                            break  # torn write; the segment is scanned again
+                        self._values[segment] = {key: set(found) for key, found in values.items()}
+                    return
+        with self.index_path.open("w", encoding="utf-8") as handle:
+            handle.write(json.dumps(header) + "\n")
+
+    def _scan(self, segment: Path) -> Optional[dict[str, set[str]]]:
+        values: dict[str, set[str]] = {key: set() for key in self.keys}
+        try:
+            with open_segment(segment, "rb") as handle:
+                for line in handle:
+                    markers = [key for key in self.keys if f'"{key}"'.encode() in line]
+                    if not markers:
+                        continue
+                    try:
+                        item = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if isinstance(item, dict):
+                        for key in markers:
+                            if item.get(key) is not None:
+                                values[key].add(str(item[key]))
+        except FileNotFoundError:
+            return None  # pruned, or compressed since listing (picked up next time)
+        return values
+
+    def refresh(self) -> list[Path]:
+        """Index segments not seen before; return the current segments, oldest first."""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            segments = rotated_segments(self.log_path)
+            records: list[str] = []
+            for segment in segments:
+                key = segment_key(segment)
+                if key in self._values:
+                    continue
+                values = self._scan(segment)
+                if values is None:
+                    continue
+                self._values[key] = values
+                listed = {name: sorted(found) for name, found in values.items()}
+                records.append(json.dumps([key, listed]))
+            if records:
+                with self.index_path.open("a", encoding="utf-8") as handle:
+                    handle.write("\n".join(records) + "\n")
+            return segments
+
+    def lookup(self, key: str, value: str, *, limit: Optional[int] = None) -> list[dict[str, Any]]:
+        """Entries of rotated segments whose ``key`` equals ``value``, oldest first
+        (the newest ``limit`` if set)."""
+        if key not in self.keys:
+            raise KeyError(f"{key!r} is not indexed")
+        value = str(value)
+        needle = value.encode("utf-8")
+        found: list[dict[str, Any]] = []
+        for segment in reversed(self.refresh()):
+            if value not in self._values.get(segment_key(segment), {}).get(key, ()):
+                continue
+            matches: list[dict[str, Any]] = []
+            try:
+                with open_segment(segment, "rb") as handle:
+                    for line in handle:
+                        if needle not in line:
+                            continue
+                        try:
+                            item = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue
+                        if isinstance(item, dict) and str(item.get(key)) == value:
+                            matches.append(item)
+            except FileNotFoundError:
+                continue
+            found = matches + found
+            if limit and len(found) >= limit:
+                return found[-limit:]
+        return found
@@ -1,46 +1,178 @@
 import json
 import logging
-from datetime import datetime, timezone
+import math
+import time
+from typing import Any, Callable, Optional
+
+# logging allows arbitrary keys via `extra={...}`. We want to persist these
+# structured fields (e.g. `event`, `duration_name`, etc.) into JSONL so
+# downstream consumers can analyze them; everything listed here is skipped.
+STANDARD_ATTRS = frozenset(
+    {
+        # Core LogRecord attributes
+        "name",
+        "msg",
+        "args",
+        "levelname",
+        "levelno",
+        "pathname",
+        "filename",
+        "module",
+        "exc_info",
+        "exc_text",
+        "stack_info",
+        "lineno",
+        "funcName",
+        "created",
+        "msecs",
+        "relativeCreated",
+        "thread",
+        "threadName",
+        "processName",
+        "process",
+        # Added/derived by logging during formatting
+        "message",
+        "asctime",
+        # Python 3.12+ may include this when using asyncio tasks
+        "taskName",
+    }
+)
+
+_CORE_KEYS = frozenset(
+    {"timestamp", "level", "logger", "message", "app", "run_id", "module", "function", "line"}
+)
+_SKIP_KEYS = STANDARD_ATTRS | _CORE_KEYS
+
+
+# Avoid formatter crashes if an extra field isn't JSON-serializable. Reusing one
+# encoder skips the per-call construction that json.dumps(**kwargs) performs.
+_stdlib_dumps: Callable[[dict], str] = json.JSONEncoder(ensure_ascii=False, default=str).encode
+
+
+_PLAIN_SCALARS = frozenset({str, int, bool, type(None)})
+
+
+def _needs_stdlib(value: Any) -> bool:
+    """Return True if a fast backend would not encode ``value`` like stdlib json.
+
+    orjson and msgspec encode datetimes, enums, sets, bytes, dataclasses, etc.
+    natively and write non-finite floats as null, where json passes anything
+    non-native through ``str`` and writes NaN/Infinity. Subclasses of native
+    types and non-str keys are left to json as well.
+    """
+    kind = type(value)
+    if kind is dict:
+        for key, item in value.items():
+            if type(key) is not str:
+                return True
+            if type(item) in _PLAIN_SCALARS:
+                continue
+            if _needs_stdlib(item):
+                return True
+        return False
+    if kind is float:
+        return not math.isfinite(value)
+    if kind is list or kind is tuple:
+        for item in value:
+            if type(item) not in _PLAIN_SCALARS and _needs_stdlib(item):
+                return True
+        return False
+    return kind not in _PLAIN_SCALARS
+
+
+def _orjson_dumps_factory() -> Optional[Callable[[dict], str]]:
+    try:
+        import orjson  # type: ignore
+    except ImportError:
+        return None
+
+    dumps = orjson.dumps
+
+    def _dumps(payload: dict) -> str:
+        if _needs_stdlib(payload):
+            return _stdlib_dumps(payload)
+        try:
+            return dumps(payload).decode("utf-8")
+        except TypeError:
+            # Integers beyond 64 bits.
+            return _stdlib_dumps(payload)
+
+    return _dumps
+
+
+def _msgspec_dumps_factory() -> Optional[Callable[[dict], str]]:
+    try:
+        import msgspec  # type: ignore
+    except ImportError:
+        return None
+
+    encode = msgspec.json.Encoder().encode
+
+    def _dumps(payload: dict) -> str:
+        if _needs_stdlib(payload):
+            return _stdlib_dumps(payload)
+        try:
+            return encode(payload).decode("utf-8")
+        except (TypeError, ValueError, OverflowError):
+            return _stdlib_dumps(payload)
+
+    return _dumps
+
+
+_BACKENDS: dict[str, Callable[[], Optional[Callable[[dict], str]]]] = {
+    "orjson": _orjson_dumps_factory,
+    "msgspec": _msgspec_dumps_factory,
+    "json": lambda: _stdlib_dumps,
+}
+
+
+def resolve_json_backend(backend: str = "auto") -> tuple[str, Callable[[dict], str]]:
+    """Return ``(name, dumps)`` for a JSON backend, falling back to stdlib json."""
+    if backend == "auto":
+        for name in ("orjson", "msgspec"):
+            dumps = _BACKENDS[name]()
+            if dumps is not None:
+                return name, dumps
+        return "json", _stdlib_dumps
+    if backend not in _BACKENDS:
+        raise ValueError(f"Unsupported JSON backend: {backend}")
+    dumps = _BACKENDS[backend]()
+    if dumps is None:
+        raise ImportError(f"JSON backend {backend!r} is not installed")
+    return backend, dumps
 
 
 class JsonlFormatter(logging.Formatter):
-    """Format log records as JSON lines suitable for detail logs."""
+    """Format log records as JSON lines suitable for detail logs.
 
-    def format(self, record: logging.LogRecord) -> str:
-        # logging allows arbitrary keys via `extra={...}`. We want to persist these
-        # structured fields (e.g. `event`, `duration_name`, etc.) into JSONL so
-        # downstream consumers can analyze them.
-        standard_attrs = {
-            # Core LogRecord attributes
-            "name",
-            "msg",
-            "args",
-            "levelname",
-            "levelno",
-            "pathname",
-            "filename",
-            "module",
-            "exc_info",
-            "exc_text",
-            "stack_info",
-            "lineno",
-            "funcName",
-            "created",
-            "msecs",
-            "relativeCreated",
-            "thread",
-            "threadName",
-            "processName",
-            "process",
-            # Added/derived by logging during formatting
-            "message",
-            "asctime",
-            # Python 3.12+ may include this when using asyncio tasks
-            "taskName",
-        }
+    ``backend`` selects the JSON encoder: ``"auto"`` uses orjson or msgspec when
+    installed and stdlib json otherwise.
+    """
+
+    def __init__(self, backend: str = "auto") -> None:
+        super().__init__()
+        self.backend, self._dumps = resolve_json_backend(backend)
+        self._timestamp_cache: tuple[int, str] = (-1, "")
 
-        log_entry = {
-            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+    def _timestamp(self, created: float) -> str:
+        # Equivalent to datetime.fromtimestamp(created, tz=timezone.utc).isoformat()
+        # with the "YYYY-MM-DDTHH:MM:SS" prefix cached per second.
+        second = int(created)
+        micros = round((created - second) * 1_000_000)
+        if micros >= 1_000_000:
+            second += 1
+            micros -= 1_000_000
+        cached_second, prefix = self._timestamp_cache
+        if cached_second != second:
+            prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+            self._timestamp_cache = (second, prefix)
+        if micros:
+            return f"{prefix}.{micros:06d}+00:00"
+        return f"{prefix}+00:00"
+
+    def format(self, record: logging.LogRecord) -> str:
+        log_entry: dict[str, Any] = {
+            "timestamp": self._timestamp(record.created),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -52,14 +184,15 @@ class JsonlFormatter(logging.Formatter):
         }
         # Merge any `extra` fields at the top-level (without clobbering core keys).
         for key, value in record.__dict__.items():
-            if key in standard_attrs or key in log_entry:
-                continue
-            log_entry[key] = value
+            if key not in _SKIP_KEYS:
+                log_entry[key] = value
 
         if record.exc_info:
             log_entry["exception"] = self.formatException(record.exc_info)
-        # Avoid formatter crashes if an extra field isn't JSON-serializable.
-        return json.dumps(log_entry, ensure_ascii=False, default=str)
+        elif record.exc_text:
+            # Records shipped from another process carry the formatted traceback.
+            log_entry["exception"] = record.exc_text
+        return self._dumps(log_entry)
 
 
 class OverviewFormatter(logging.Formatter):
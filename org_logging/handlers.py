@@ -0,0 +1,188 @@
+"""Logging handlers used by configure_logging."""
+
+from __future__ import annotations
+
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterable
+
+_STOP = object()
+
+
+@dataclass(frozen=True)
+class QueueStats:
+    enqueued: int
+    written: int
+    dropped: int
+    pending: int
+
+
+class BatchingQueueHandler(logging.Handler):
+    """Handler that enqueues records for a background writer thread.
+
+    Producers only pay for a non-blocking ``put`` on a bounded queue. A single
+    writer thread drains the queue in batches, formats each record with the
+    target handlers' formatters, and writes each batch with one write/flush per
+    target. Records are dropped (and counted) when the queue is full.
+    """
+
+    def __init__(
+        self,
+        handlers: Iterable[logging.Handler],
+        *,
+        queue_size: int = 10000,
+        batch_size: int = 256,
+        flush_interval: float = 0.5,
+    ) -> None:
+        super().__init__()
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if flush_interval <= 0:
+            raise ValueError("flush_interval must be positive")
+        self.handlers = list(handlers)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._enqueued = 0
+        self._written = 0
+        self._dropped = 0
+        self._closed = False
+        if self.handlers:
+            self.setLevel(min(handler.level for handler in self.handlers))
+        self._thread = threading.Thread(
+            target=self._run, name="org_logging-writer", daemon=True
+        )
+        self._thread.start()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Freeze the message on the producer thread so mutable args cannot
+        # change before the writer formats the record.
+        message = record.getMessage()
+        record.msg = message
+        record.args = None
+        return record
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self._closed:
+            self._dropped += 1
+            return
+        try:
+            self._queue.put_nowait(self.prepare(record))
+        except queue.Full:
+            self._dropped += 1
+        except Exception:
+            self.handleError(record)
+        else:
+            self._enqueued += 1
+
+    def stats(self) -> QueueStats:
+        """Return counters for enqueued, written, and dropped records."""
+        return QueueStats(
+            enqueued=self._enqueued,
+            written=self._written,
+            dropped=self._dropped,
+            pending=self._queue.qsize(),
+        )
+
+    def flush(self) -> None:
+        """Block until every record enqueued so far has been written."""
+        if self._thread.is_alive():
+            self._queue.join()
+
+    def close(self) -> None:
+        """Drain the queue, stop the writer, and close the target handlers."""
+        if not self._closed:
+            self._closed = True
+            if self._thread.is_alive():
+                self._queue.put(_STOP)
+                self._thread.join()
+            for handler in self.handlers:
+                handler.close()
+        super().close()
+
+    def _next_batch(self) -> tuple[list[logging.LogRecord], bool]:
+        try:
+            item = self._queue.get(timeout=self.flush_interval)
+        except queue.Empty:
+            return [], False
+        if item is _STOP:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    item = self._queue.get(timeout=remaining)
+                else:
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _write(self, batch: list[logging.LogRecord]) -> int:
+        """Write ``batch`` to the targets; return how many records were written."""
+        for handler in self.handlers:
+            _write_batch(handler, batch)
+        return len(batch)
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            batch, stop = self._next_batch()
+            if batch:
+                written = self._write(batch)
+                self._written += written
+                self._dropped += len(batch) - written
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                self._queue.task_done()
+
+
+def _write_batch(handler: logging.Handler, records: list[logging.LogRecord]) -> None:
+    stream = getattr(handler, "stream", None)
+    if not isinstance(handler, logging.StreamHandler) or stream is None:
+        for record in records:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        return
+
+    formatted: list[tuple[logging.LogRecord, str]] = []
+    for record in records:
+        if record.levelno < handler.level or not handler.filter(record):
+            continue
+        try:
+            formatted.append((record, handler.format(record)))
+        except Exception:
+            handler.handleError(record)
+    if not formatted:
+        return
+
+    terminator = handler.terminator
+    handler.acquire()
+    try:
+        if isinstance(handler, logging.handlers.BaseRotatingHandler):
+            # Rotating handlers only rotate inside emit(), which this path
+            # bypasses: check before every record, as emit() would.
+            for record, message in formatted:
+                if handler.shouldRollover(record):
+                    handler.doRollover()
+                if handler.stream is None:
+                    handler.stream = handler._open()
+                handler.stream.write(message + terminator)
+        else:
+            stream.write(terminator.join(message for _, message in formatted) + terminator)
+        handler.flush()
+    except Exception:
+        handler.handleError(records[-1])
+    finally:
+        handler.release()
+
@@ -0,0 +1,162 @@
+"""Incremental analysis of a growing JSONL detail log with a persisted checkpoint."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Optional
+
+from .analytics import AnalysisResult, LogAggregates
+from .parallel import _analyze_range
+from .rotation import open_segment, rotated_segments, segment_key
+
+# Bytes at the start of the file fingerprinted to detect in-place rewrites that
+# keep the inode (e.g. copytruncate followed by new writes).
+_FINGERPRINT_BYTES = 4096
+_STATE_VERSION = 2
+
+
+def _fingerprint(path: Path, length: int) -> str:
+    with open_segment(path, "rb") as handle:
+        return hashlib.sha256(handle.read(min(length, _FINGERPRINT_BYTES))).hexdigest()
+
+
+def _last_line_end(path: Path, start: int, size: int, block_bytes: int = 65536) -> int:
+    """Return the offset just past the last newline in ``[start, size)``, or ``start``."""
+    position = size
+    with path.open("rb") as handle:
+        while position > start:
+            read_from = max(start, position - block_bytes)
+            handle.seek(read_from)
+            block = handle.read(position - read_from)
+            index = block.rfind(b"\n")
+            if index != -1:
+                return read_from + index + 1
+            position = read_from
+    return start
+
+
+class IncrementalAnalyzer:
+    """Stateful count_events/duration_stats/return_count_stats over one log file.
+
+    The byte offset of the last complete line, the file identity (device,
+    inode, and a fingerprint of its first bytes) and the partial aggregates
+    are stored in a sidecar JSON state file (``<log>.analytics-state.json`` by
+    default). Each ``update()`` parses only bytes appended since the previous
+    run. Segments rotated out by ``CompressingRotatingFileHandler`` are picked
+    up once: the file that was being followed is finished from the checkpoint
+    (compressed or not), later segments are read whole. If the file was
+    truncated or replaced in place, the whole segment set is analyzed again.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        state_path: Optional[str | Path] = None,
+        unit: Optional[str] = None,
+    ) -> None:
+        self.path = Path(path)
+        self.state_path = (
+            Path(state_path)
+            if state_path
+            else self.path.with_name(self.path.name + ".analytics-state.json")
+        )
+        self.unit = unit
+
+    def _load_state(self) -> Optional[dict[str, Any]]:
+        if not self.state_path.exists():
+            return None
+        try:
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+        if state.get("version") != _STATE_VERSION or state.get("unit") != self.unit:
+            return None
+        return state
+
+    def _save_state(self, state: dict[str, Any]) -> None:
+        tmp_path = self.state_path.with_name(self.state_path.name + ".tmp")
+        tmp_path.write_text(json.dumps(state), encoding="utf-8")
+        os.replace(tmp_path, self.state_path)
+
+    def _resume_offset(self, state: Optional[dict[str, Any]], stat: os.stat_result) -> int:
+        if state is None:
+            return 0
+        offset = int(state.get("offset", 0))
+        if (state.get("device"), state.get("inode")) != (stat.st_dev, stat.st_ino):
+            return 0  # rotated or replaced
+        if stat.st_size < offset:
+            return 0  # truncated
+        if offset and _fingerprint(self.path, offset) != state.get("fingerprint"):
+            return 0  # rewritten in place
+        return offset
+
+    def update(self) -> AnalysisResult:
+        """Process newly appended lines, persist the checkpoint, and return totals."""
+        segments = rotated_segments(self.path)
+        stat = self.path.stat() if self.path.exists() else None
+        if stat is None and not segments:
+            return LogAggregates(unit=self.unit).result()
+        state = self._load_state()
+
+        pending = list(segments)
+        offset = 0
+        restart = state is None
+        if state is not None:
+            aggregates = LogAggregates.from_dict(state["aggregates"])
+            known = set(state.get("segments", ()))
+            pending = [segment for segment in segments if segment_key(segment) not in known]
+            previous_offset = int(state.get("offset", 0))
+            same_file = stat is not None and (state.get("device"), state.get("inode")) == (
+                stat.st_dev,
+                stat.st_ino,
+            )
+            if pending and not same_file:
+                # The live file was rotated: the oldest new segment is the file
+                # we were following, so finish it from the checkpoint.
+                followed = pending[0]
+                if previous_offset == 0:
+                    pass
+                elif _fingerprint(followed, previous_offset) == state.get("fingerprint"):
+                    aggregates.merge(_analyze_range(str(followed), previous_offset, None, self.unit))
+                    pending = pending[1:]
+                else:
+                    restart = True
+            elif stat is not None:
+                offset = self._resume_offset(state, stat)
+                restart = previous_offset > 0 and offset == 0
+        if restart:
+            aggregates = LogAggregates(unit=self.unit)
+            pending = list(segments)
+            offset = 0
+
+        for segment in pending:
+            aggregates.merge(_analyze_range(str(segment), 0, None, self.unit))
+
+        end = 0
+        if stat is not None:
+            end = _last_line_end(self.path, offset, stat.st_size)
+            if end > offset:
+                aggregates.merge(_analyze_range(str(self.path), offset, end, self.unit))
+
+        self._save_state(
+            {
+                "version": _STATE_VERSION,
+                "path": str(self.path),
+                "device": stat.st_dev if stat else None,
+                "inode": stat.st_ino if stat else None,
+                "offset": end,
+                "fingerprint": _fingerprint(self.path, end) if end else None,
+                "segments": [segment_key(segment) for segment in segments],
+                "unit": self.unit,
+                "aggregates": aggregates.to_dict(),
+            }
+        )
+        return aggregates.result()
+
+    def reset(self) -> None:
+        """Forget the checkpoint so the next update re-reads the whole file."""
+        self.state_path.unlink(missing_ok=True)
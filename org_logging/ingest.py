@@ -0,0 +1,44 @@
+"""Load detail logs into their SQLite query index from the command line::
+
+    python -m org_logging.ingest logs/detail.jsonl [more logs...] [--follow 5]
+
+Each run ingests only what was appended since the previous one, so it is
+cheap to run from cron or to leave following a live log.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Optional
+
+from .query_index import QueryIndex
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0].rstrip(":"))
+    parser.add_argument(
+        "log_paths", nargs="+", metavar="log_path", help="detail log, e.g. logs/detail.jsonl"
+    )
+    parser.add_argument("--db", help="database path, with a single log (default: <log>.sqlite)")
+    parser.add_argument(
+        "--follow", type=float, metavar="SECONDS", help="keep ingesting every SECONDS seconds"
+    )
+    args = parser.parse_args(argv)
+    if args.db and len(args.log_paths) > 1:
+        parser.error("--db needs a single log_path")
+
+    indexes = [QueryIndex(path, db_path=args.db) for path in args.log_paths]
+    while True:
+        for index in indexes:
+            started = time.perf_counter()
+            added = index.update()
+            elapsed = time.perf_counter() - started
+            print(f"{index.db_path}: {added} entries added in {elapsed:.2f}s", flush=True)
+        if args.follow is None:
+            return
+        time.sleep(args.follow)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""Memory helpers for overview logging, companions to the timing helpers."""
+
+from __future__ import annotations
+
+import functools
+import gc
+import inspect
+import logging
+import os
+import threading
+import tracemalloc
+import uuid
+from contextvars import ContextVar
+from typing import Any, Callable, Optional, TypeVar, Union, cast
+
+from .sampling import Sampler
+from .spans import current_span
+from .timing import _resolve_logger, _static_run_id
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None  # type: ignore[assignment]
+
+try:
+    import psutil  # type: ignore
+except ImportError:
+    psutil = None
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss() -> Optional[int]:
+    """Resident set size of this process in bytes, or None if unavailable."""
+    try:
+        with open("/proc/self/statm", "rb") as handle:
+            return int(handle.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        pass
+    if psutil is not None:
+        return int(psutil.Process().memory_info().rss)
+    return None
+
+
+def peak_rss() -> Optional[int]:
+    """Highest resident set size this process has reached, in bytes."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    return int(peak) if os.uname().sysname == "Darwin" else int(peak) * 1024
+
+
+def _gc_counts() -> tuple[list[int], int]:
+    stats = gc.get_stats()
+    return [generation["collections"] for generation in stats], sum(
+        generation["collected"] for generation in stats
+    )
+
+
+class _Tracer:
+    """Shares tracemalloc between overlapping traced blocks (in any thread).
+
+    tracemalloc has one process-wide peak. Each block resets it on entry, so
+    every open block folds the peak so far into its own before the reset.
+    Tracing is started for the first block and stopped after the last one,
+    unless something else had already started it.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._active: list["_MemoryBlock"] = []
+        self._started = False
+
+    def enter(self, block: "_MemoryBlock") -> None:
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started = True
+            current, peak = tracemalloc.get_traced_memory()
+            for other in self._active:
+                other._traced_peak = max(other._traced_peak, peak)
+            tracemalloc.reset_peak()
+            block._traced_start = block._traced_peak = current
+            self._active.append(block)
+
+    def exit(self, block: "_MemoryBlock") -> tuple[int, int]:
+        """Return ``(peak above start, delta)`` in bytes for ``block``."""
+        with self._lock:
+            current, peak = tracemalloc.get_traced_memory()
+            for other in self._active:
+                other._traced_peak = max(other._traced_peak, peak)
+            self._active.remove(block)
+            if not self._active and self._started:
+                tracemalloc.stop()
+                self._started = False
+        return block._traced_peak - block._traced_start, current - block._traced_start
+
+
+_TRACER = _Tracer()
+
+
+class _MemoryBlock:
+    """Context manager behind ``log_memory``; usable with ``with`` and ``async with``."""
+
+    def __init__(
+        self,
+        name: str,
+        logger: logging.Logger,
+        run_id: Optional[str],
+        trace: Union[bool, Sampler],
+    ) -> None:
+        self.name = name
+        self.logger = logger
+        self.run_id = run_id
+        self.trace = trace
+        self._enabled = False
+        self._traced = False
+        self._traced_start = 0
+        self._traced_peak = 0
+
+    def __enter__(self) -> "_MemoryBlock":
+        self._enabled = self.logger.isEnabledFor(logging.INFO)
+        if not self._enabled:
+            return self
+        trace = self.trace
+        self._traced = trace is True or (
+            isinstance(trace, Sampler) and trace.sample() is not None
+        )
+        self._gc_start = _gc_counts()
+        self._rss_start = current_rss()
+        if self._traced:
+            _TRACER.enter(self)
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        if not self._enabled:
+            return
+        extra: dict[str, Any] = {"event": "memory", "memory_name": self.name}
+        if self._traced:
+            extra["traced_peak"], extra["traced_delta"] = _TRACER.exit(self)
+        rss = current_rss()
+        if rss is not None and self._rss_start is not None:
+            extra["rss_before"] = self._rss_start
+            extra["rss_after"] = rss
+            extra["rss_delta"] = rss - self._rss_start
+        peak = peak_rss()
+        if peak is not None:
+            extra["peak_rss"] = peak
+        collections, collected = _gc_counts()
+        start_collections, start_collected = self._gc_start
+        extra["gc_collections"] = [
+            after - before for after, before in zip(collections, start_collections)
+        ]
+        extra["gc_collected"] = collected - start_collected
+        span = current_span()
+        if span is not None:
+            extra["span_id"] = span.span_id
+        extra["run_id"] = self.run_id or (span.run_id if span is not None else str(uuid.uuid4()))
+        self.logger.info(
+            "%s rss %+.1fMB",
+            self.name,
+            extra.get("rss_delta", 0) / (1024 * 1024),
+            extra=extra,
+        )
+
+    async def __aenter__(self) -> "_MemoryBlock":
+        return self.__enter__()
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        self.__exit__(*exc_info)
+
+
+F = TypeVar("F", bound=Callable[..., object])
+
+# Blocks opened by ``with log_memory(...)`` that are still running, as
+# ``(memory logger, block)`` pairs, innermost last. Kept per context rather
+# than on the logger so one logger can be entered from several threads or
+# tasks, or nested, at once.
+_OPEN_BLOCKS: ContextVar[tuple[tuple["_MemoryLogger", _MemoryBlock], ...]] = ContextVar(
+    "org_logging_memory_blocks", default=()
+)
+
+
+class _MemoryLogger:
+    """Return value of ``log_memory``: a context manager and a decorator."""
+
+    def __init__(
+        self,
+        name: Optional[str],
+        logger: Optional[logging.Logger],
+        run_id: Optional[str],
+        trace: Union[bool, Sampler],
+    ) -> None:
+        self.name = name
+        self.logger = _resolve_logger(logger)
+        self.run_id = _static_run_id(self.logger, run_id)
+        self.trace = trace
+
+    def _block(self, name: str) -> _MemoryBlock:
+        return _MemoryBlock(name, self.logger, self.run_id, self.trace)
+
+    def __enter__(self) -> _MemoryBlock:
+        block = self._block(self.name or "block")
+        _OPEN_BLOCKS.set(_OPEN_BLOCKS.get() + ((self, block),))
+        return block.__enter__()
+
+    def __exit__(self, *exc_info: object) -> None:
+        opened = _OPEN_BLOCKS.get()
+        for position in range(len(opened) - 1, -1, -1):
+            owner, block = opened[position]
+            if owner is self:
+                _OPEN_BLOCKS.set(opened[:position] + opened[position + 1 :])
+                block.__exit__(*exc_info)
+                return
+
+    async def __aenter__(self) -> _MemoryBlock:
+        return self.__enter__()
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        self.__exit__(*exc_info)
+
+    def __call__(self, target: F) -> F:
+        name = self.name or target.__qualname__
+        block = self._block
+
+        if inspect.iscoroutinefunction(target):
+
+            async def wrapper(*args: object, **kwargs: object) -> object:
+                with block(name):
+                    return await target(*args, **kwargs)
+
+        else:
+
+            def wrapper(*args: object, **kwargs: object) -> object:
+                with block(name):
+                    return target(*args, **kwargs)
+
+        return cast(F, functools.wraps(target)(wrapper))
+
+
+def log_memory(
+    func: Optional[F] = None,
+    *,
+    name: Optional[str] = None,
+    run_id: Optional[str] = None,
+    logger: Optional[logging.Logger] = None,
+    trace: Union[bool, Sampler] = False,
+) -> Any:
+    """Log memory use over a block or function call as an ``event="memory"`` record.
+
+    Use as ``with log_memory(name="load"):``, ``@log_memory`` or
+    ``@log_memory(name=...)``. Each event carries ``memory_name``,
+    ``rss_before``/``rss_after``/``rss_delta`` and the process ``peak_rss`` (in
+    bytes, where the platform reports them), and ``gc_collections`` (per
+    generation) and ``gc_collected`` during the block. Inside a ``log_timing``
+    block or ``log_duration`` call the event also carries that span's
+    ``span_id`` and, unless ``run_id`` is given, its run_id.
+
+    ``trace=True``, or a ``Sampler`` choosing which calls to trace, also runs
+    tracemalloc for the block and adds ``traced_peak`` (the highest traced
+    allocation above the starting point) and ``traced_delta``. Tracing slows
+    allocation-heavy code severalfold, so sample it on hot paths. For a
+    coroutine, RSS and allocations include other tasks on the loop.
+    """
+    memory_logger = _MemoryLogger(name, logger, run_id, trace)
+    if func is not None:
+        return memory_logger(func)
+    return memory_logger
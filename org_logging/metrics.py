@@ -0,0 +1,158 @@
+"""In-process aggregation of timing events with periodic summary flushes."""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+import time
+from typing import Any, Optional
+
+from .analytics import OnlineStats
+from .timing import _resolve_logger, _resolve_run_id
+
+DEFAULT_FLUSH_INTERVAL = 60.0
+
+
+class MetricsRegistry:
+    """Collect durations and return counts in memory, keyed by name.
+
+    Instead of one log line per call, every ``interval`` seconds the registry
+    emits one ``duration_summary`` event per (name, unit) and one
+    ``return_count_summary`` event per name to the overview logger. Each
+    summary carries count/min/max/avg/percentiles for the window plus the
+    serialized aggregate, which ``duration_stats``/``return_count_stats`` merge
+    exactly. A final flush runs at interpreter exit.
+    """
+
+    def __init__(
+        self,
+        *,
+        logger: Optional[logging.Logger] = None,
+        interval: float = DEFAULT_FLUSH_INTERVAL,
+        run_id: Optional[str] = None,
+        start: bool = True,
+    ) -> None:
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        self.logger = logger
+        self.interval = interval
+        self.run_id = run_id
+        self._durations: dict[tuple[str, str], OnlineStats] = {}
+        self._return_counts: dict[str, OnlineStats] = {}
+        self._window_start = time.time()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if start:
+            self.start()
+
+    def record_duration(self, name: str, elapsed: float, unit: str, weight: float = 1.0) -> None:
+        key = (name, unit)
+        with self._lock:
+            aggregate = self._durations.get(key)
+            if aggregate is None:
+                aggregate = self._durations[key] = OnlineStats()
+            aggregate.add(elapsed, weight)
+
+    def record_return_count(self, name: str, count: int) -> None:
+        with self._lock:
+            aggregate = self._return_counts.get(name)
+            if aggregate is None:
+                aggregate = self._return_counts[name] = OnlineStats()
+            aggregate.add(float(count))
+
+    def flush(self) -> int:
+        """Emit one summary event per name for the current window; returns the number emitted."""
+        with self._lock:
+            durations, self._durations = self._durations, {}
+            return_counts, self._return_counts = self._return_counts, {}
+            window_start, self._window_start = self._window_start, time.time()
+        window_end = self._window_start
+
+        logger = _resolve_logger(self.logger)
+        run_id = _resolve_run_id(logger, self.run_id)
+        for (name, unit), aggregate in durations.items():
+            stats = aggregate.to_stats()
+            logger.info(
+                "%s: %d calls, avg %.2f%s, p99 %.2f%s",
+                name,
+                stats.estimated_count,
+                stats.avg,
+                unit,
+                stats.p99,
+                unit,
+                extra={
+                    "event": "duration_summary",
+                    "duration_name": name,
+                    "unit": unit,
+                    **_summary_fields(aggregate, window_start, window_end),
+                    "run_id": run_id,
+                },
+            )
+        for name, aggregate in return_counts.items():
+            logger.info(
+                "%s: %d calls returned avg %.2f items",
+                name,
+                aggregate.estimated_count,
+                aggregate.mean,
+                extra={
+                    "event": "return_count_summary",
+                    "return_count_name": name,
+                    **_summary_fields(aggregate, window_start, window_end),
+                    "run_id": run_id,
+                },
+            )
+        return len(durations) + len(return_counts)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def start(self) -> None:
+        """Start the background flush thread and register the exit-time flush."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="org_logging-metrics", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def close(self) -> None:
+        """Stop the flush thread and emit the final window."""
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+            atexit.unregister(self.close)
+        self.flush()
+
+
+def _summary_fields(aggregate: OnlineStats, window_start: float, window_end: float) -> dict[str, Any]:
+    stats = aggregate.to_stats()
+    return {
+        "calls": stats.estimated_count,
+        "events": stats.count,
+        "min": stats.min,
+        "max": stats.max,
+        "avg": stats.avg,
+        "p50": stats.p50,
+        "p95": stats.p95,
+        "p99": stats.p99,
+        "window_start": window_start,
+        "window_end": window_end,
+        "aggregate": aggregate.to_dict(),
+    }
+
+
+_DEFAULT_REGISTRY: Optional[MetricsRegistry] = None
+_DEFAULT_REGISTRY_LOCK = threading.Lock()
+
+
+def default_registry() -> MetricsRegistry:
+    """Return the process-wide registry, creating it on first use."""
+    global _DEFAULT_REGISTRY
+    with _DEFAULT_REGISTRY_LOCK:
+        if _DEFAULT_REGISTRY is None:
+            _DEFAULT_REGISTRY = MetricsRegistry()
+        return _DEFAULT_REGISTRY
@@ -0,0 +1,335 @@
+"""Multi-process logging: workers ship records to one collector that owns the files.
+
+The process that calls ``configure_logging(..., multiprocess=True)`` first
+becomes the collector. It keeps the usual file/console handlers behind a
+``BatchingQueueHandler`` and listens on a local ``multiprocessing.connection``
+socket (AF_UNIX where available, authenticated with a random key). The
+address, key, ``app`` and ``run_id`` are published in the
+``ORG_LOGGING_COLLECTOR`` environment variable, so they reach children under
+both fork and spawn:
+
+* forked children switch their inherited root handlers to a ``ShippingHandler``
+  automatically, before they can write to the shared files;
+* spawned children (and forked ones, again) that call
+  ``configure_logging(..., multiprocess=True)`` find the collector in the
+  environment and become workers.
+
+A worker pays the same per-record cost as ``async_mode``: the message is
+frozen and the record is put on a bounded queue. A background thread pickles
+whatever has queued up (at most ``batch_size`` records) and sends it as one
+message; it does not wait for a batch to fill, so little is in flight when a
+worker exits.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import multiprocessing
+import multiprocessing.util
+import os
+import pickle
+import queue
+import socket
+import threading
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Iterable, Optional, TypeVar
+
+from .handlers import _STOP, BatchingQueueHandler
+
+COLLECTOR_ENV = "ORG_LOGGING_COLLECTOR"
+
+_H = TypeVar("_H", bound=logging.Handler)
+
+_exception_formatter = logging.Formatter()
+
+
+def _record_to_dict(record: logging.LogRecord) -> dict[str, Any]:
+    if record.exc_info:
+        if not record.exc_text:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+    data = dict(record.__dict__)
+    data["exc_info"] = None
+    data["args"] = None
+    return data
+
+
+def _dumps_batch(batch: list[logging.LogRecord]) -> bytes:
+    records = [_record_to_dict(record) for record in batch]
+    try:
+        return pickle.dumps(records, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        # Some `extra` value cannot be pickled; send those values as strings.
+        safe: list[dict[str, Any]] = []
+        for data in records:
+            clean = {}
+            for key, value in data.items():
+                try:
+                    pickle.dumps(value)
+                except Exception:
+                    value = str(value)
+                clean[key] = value
+            safe.append(clean)
+        return pickle.dumps(safe, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+class ShippingHandler(BatchingQueueHandler):
+    """Worker-side handler that sends record batches to a ``LogCollector``."""
+
+    def __init__(
+        self,
+        address: Any,
+        authkey: bytes,
+        *,
+        queue_size: int = 10000,
+        batch_size: int = 256,
+        flush_interval: float = 0.5,
+    ) -> None:
+        self.address = address
+        self._authkey = authkey
+        self._conn: Optional[Connection] = None
+        super().__init__(
+            [], queue_size=queue_size, batch_size=batch_size, flush_interval=flush_interval
+        )
+
+    def _next_batch(self) -> tuple[list[logging.LogRecord], bool]:
+        try:
+            item = self._queue.get(timeout=self.flush_interval)
+        except queue.Empty:
+            return [], False
+        if item is _STOP:
+            return [], True
+        batch = [item]
+        while len(batch) < self.batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _write(self, batch: list[logging.LogRecord]) -> int:
+        payload = _dumps_batch(batch)
+        # One reconnect attempt covers a collector that restarted its listener.
+        for _ in range(2):
+            try:
+                if self._conn is None:
+                    self._conn = Client(self.address, authkey=self._authkey)
+                self._conn.send_bytes(payload)
+                return len(batch)
+            except (OSError, EOFError, multiprocessing.AuthenticationError):
+                self._disconnect()
+        return 0
+
+    def _disconnect(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except OSError:
+                pass
+            self._conn = None
+
+    def close(self) -> None:
+        super().close()
+        self._disconnect()
+
+
+class LogCollector(BatchingQueueHandler):
+    """Collector-side queue handler that also accepts records from workers.
+
+    Records logged in this process and records received from workers share one
+    queue and one writer thread. ``close`` stops accepting connections and
+    drains what workers have already sent before closing the targets.
+    """
+
+    def __init__(
+        self,
+        handlers: Iterable[logging.Handler],
+        *,
+        queue_size: int = 10000,
+        batch_size: int = 256,
+        flush_interval: float = 0.5,
+    ) -> None:
+        super().__init__(
+            handlers, queue_size=queue_size, batch_size=batch_size, flush_interval=flush_interval
+        )
+        family = "AF_UNIX" if hasattr(socket, "AF_UNIX") else "AF_INET"
+        self._authkey = os.urandom(32)
+        self._listener = Listener(family=family, backlog=128, authkey=self._authkey)
+        self.address = self._listener.address
+        self.pid = os.getpid()
+        self._accepting = True
+        self._receivers: list[threading.Thread] = []
+        self._acceptor = threading.Thread(
+            target=self._accept_loop, name="org_logging-collector", daemon=True
+        )
+        self._acceptor.start()
+
+    def publish(self, app: Optional[str], run_id: str) -> None:
+        """Advertise this collector to child processes via the environment."""
+        os.environ[COLLECTOR_ENV] = json.dumps(
+            {
+                "address": self.address,
+                "authkey": self._authkey.hex(),
+                "pid": self.pid,
+                "app": app,
+                "run_id": run_id,
+            }
+        )
+
+    def _accept_loop(self) -> None:
+        while self._accepting:
+            try:
+                conn = self._listener.accept()
+            except (OSError, EOFError, multiprocessing.AuthenticationError):
+                if not self._accepting:
+                    return
+                continue
+            receiver = threading.Thread(
+                target=self._receive, args=(conn,), name="org_logging-collector-conn", daemon=True
+            )
+            receiver.start()
+            self._receivers = [t for t in self._receivers if t.is_alive()] + [receiver]
+
+    def _receive(self, conn: Connection) -> None:
+        with conn:
+            while True:
+                try:
+                    if not conn.poll(0.1):
+                        if not self._accepting:
+                            return  # drained everything sent before close()
+                        continue
+                    payload = conn.recv_bytes()
+                except (OSError, EOFError):
+                    return
+                for data in pickle.loads(payload):
+                    record = logging.makeLogRecord(data)
+                    # Not handle(): it takes the handler lock, which
+                    # logging.shutdown() holds while close() waits for these
+                    # receivers to drain. emit() only enqueues.
+                    if self.filter(record):
+                        self.emit(record)
+
+    def _stop_listening(self) -> None:
+        if not self._accepting:
+            return
+        self._accepting = False
+        if _advertised(os.environ.get(COLLECTOR_ENV)).get("pid") == self.pid:
+            os.environ.pop(COLLECTOR_ENV, None)
+        # Unblock accept() by connecting once, then close the listener.
+        try:
+            Client(self.address, authkey=self._authkey).close()
+        except (OSError, EOFError, multiprocessing.AuthenticationError):
+            pass
+        self._acceptor.join(timeout=1)
+        self._listener.close()
+        for receiver in self._receivers:
+            receiver.join(timeout=5)
+
+    def close(self) -> None:
+        if os.getpid() == self.pid:
+            self._stop_listening()
+        super().close()
+
+
+def _advertised(raw: Optional[str]) -> dict[str, Any]:
+    if not raw:
+        return {}
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        return {}
+
+
+def collector_info() -> Optional[dict[str, Any]]:
+    """Collector advertised by an ancestor process, if any (never our own)."""
+    info = _advertised(os.environ.get(COLLECTOR_ENV))
+    if not info or info.get("pid") == os.getpid():
+        return None
+    address = info["address"]
+    info["address"] = tuple(address) if isinstance(address, list) else address
+    info["authkey"] = bytes.fromhex(info["authkey"])
+    return info
+
+
+def install_worker_handler(info: dict[str, Any], **options: Any) -> ShippingHandler:
+    """Point the root logger at the collector described by ``info``."""
+    root = logging.getLogger()
+    # Inherited handlers (after fork) share buffers and files with the parent:
+    # drop them without closing or flushing. A live shipper of our own is
+    # drained first.
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        if isinstance(handler, ShippingHandler) and handler._thread.is_alive():
+            handler.close()
+    handler = ShippingHandler(info["address"], info["authkey"], **options)
+    root.addHandler(handler)
+    root.setLevel(logging.DEBUG)
+    _register_drain(handler)
+    return handler
+
+
+def _register_drain(handler: ShippingHandler) -> None:
+    # multiprocessing children leave via os._exit, skipping logging.shutdown;
+    # its finalizers still run, so use one to drain the queue.
+    multiprocessing.util.Finalize(handler, handler.close, exitpriority=100)
+
+
+def _root_handler(kind: type[_H]) -> Optional[_H]:
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, kind):
+            return handler
+    return None
+
+
+_FORK_LOCKED: list[logging.Handler] = []
+
+
+def _before_fork() -> None:
+    # Hold the file handlers' locks across fork so no half-written, buffered
+    # batch is copied into the child (which drops, never flushes, them).
+    collector = _root_handler(LogCollector)
+    if collector is None:
+        return
+    for handler in [collector, *collector.handlers]:
+        handler.acquire()
+        _FORK_LOCKED.append(handler)
+
+
+def _after_fork_in_parent() -> None:
+    while _FORK_LOCKED:
+        _FORK_LOCKED.pop().release()
+
+
+def _after_fork_in_child() -> None:
+    _FORK_LOCKED.clear()  # logging re-creates handler locks in the child
+    # The collector's listener, threads and files belong to the parent (its
+    # socket cleanup is a multiprocessing finalizer, skipped in other pids).
+    source = _root_handler(LogCollector) or _root_handler(ShippingHandler)
+    if source is not None:
+        install_worker_handler({"address": source.address, "authkey": source._authkey})
+
+
+class _AfterForkAnchor:
+    """Weak-referenceable key for ``multiprocessing.util.register_after_fork``."""
+
+
+def _after_process_fork(_: object) -> None:
+    # A forked multiprocessing.Process clears the finalizer registry after the
+    # os-level hooks ran, dropping the drain _after_fork_in_child registered.
+    handler = _root_handler(ShippingHandler)
+    if handler is not None:
+        _register_drain(handler)
+
+
+_AFTER_FORK_ANCHOR = _AfterForkAnchor()
+multiprocessing.util.register_after_fork(_AFTER_FORK_ANCHOR, _after_process_fork)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(
+        before=_before_fork,
+        after_in_parent=_after_fork_in_parent,
+        after_in_child=_after_fork_in_child,
+    )
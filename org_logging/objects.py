@@ -1,11 +1,48 @@
 from __future__ import annotations
 
+import atexit
 import json
+import logging
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from io import BytesIO
-from typing import Any, Callable, Dict, Optional
+from pathlib import Path
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, Optional
 
 from .artifacts import ArtifactMeta, ArtifactStore
 
+# An object handler turns a value into an artifact: it returns the payload
+# type label, the stored artifact and extra meta fields, or None to fall back
+# to JSON. Handlers are keyed by the qualified name of the type they accept, so
+# detecting e.g. a DataFrame never imports pandas.
+ObjectHandler = Callable[[Any, ArtifactStore], Optional[tuple[str, ArtifactMeta, Dict[str, Any]]]]
+
+_HANDLERS: Dict[str, ObjectHandler] = {}
+_HANDLER_CACHE: Dict[type, Optional[ObjectHandler]] = {}
+
+
+def register_object_handler(type_name: str, handler: ObjectHandler) -> None:
+    """Handle objects whose type (or a base class) is ``module.QualName``."""
+    _HANDLERS[type_name] = handler
+    _HANDLER_CACHE.clear()
+
+
+def _handler_for(obj: Any) -> Optional[ObjectHandler]:
+    cls = type(obj)
+    try:
+        return _HANDLER_CACHE[cls]
+    except KeyError:
+        pass
+    handler = None
+    for base in cls.__mro__:
+        handler = _HANDLERS.get(f"{base.__module__}.{base.__qualname__}")
+        if handler is not None:
+            break
+    _HANDLER_CACHE[cls] = handler
+    return handler
+
 
 def _emit(logger: Any, payload: Dict[str, Any]) -> None:
     if hasattr(logger, "info"):
@@ -20,15 +57,240 @@ def _json_bytes(obj: Any) -> bytes:
     return json.dumps(obj).encode("utf-8")
 
 
-def _dataframe_to_parquet_bytes(df: Any) -> Optional[bytes]:
+_JSON_SLICE_ITEMS = 1024
+
+
+def _json_chunks(obj: Any) -> Iterator[bytes]:
+    """Yield the bytes of ``_json_bytes(obj)`` a slice of items at a time.
+
+    Top-level lists and dicts are encoded ``_JSON_SLICE_ITEMS`` entries per
+    ``json.dumps`` call (the C encoder; ``iterencode`` is several times slower),
+    so an oversized object never exists as one JSON string.
+    """
+    if isinstance(obj, (list, tuple)):
+        items: Iterator[Any] = iter(obj)
+        wrap, start, end = list, b"[", b"]"
+    elif isinstance(obj, dict):
+        items = iter(obj.items())
+        wrap, start, end = dict, b"{", b"}"
+    else:
+        yield _json_bytes(obj)
+        return
+    yield start
+    separator = b""
+    while True:
+        batch = wrap(islice(items, _JSON_SLICE_ITEMS))
+        if not batch:
+            break
+        yield separator + _json_bytes(batch)[1:-1]
+        separator = b", "
+    yield end
+
+
+def _exceeds(obj: Any, limit: int) -> bool:
+    """True if ``obj`` certainly serializes to more than ``limit`` JSON bytes.
+
+    Walks the object counting a lower bound of its encoded size and stops as
+    soon as the bound passes ``limit``, so the cost is O(limit), not O(size).
+    """
+    budget = limit
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            budget -= len(item) + 2
+        elif isinstance(item, dict):
+            budget -= 2 + 4 * len(item)
+            if budget >= 0:
+                stack.extend(item.keys())
+                stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            budget -= 1 + len(item)
+            if budget >= 0:
+                stack.extend(item)
+        else:
+            budget -= 1
+        if budget < 0:
+            return True
+    return False
+
+
+def _dataframe_to_parquet_bytes(df: Any) -> Optional[memoryview]:
     try:
         buffer = BytesIO()
         df.to_parquet(buffer, index=False)
-        return buffer.getvalue()
+        return buffer.getbuffer()
     except Exception:
         return None
 
 
+def _store_dataframe(df: Any, store: ArtifactStore) -> Optional[tuple[str, ArtifactMeta, Dict[str, Any]]]:
+    parquet_bytes = _dataframe_to_parquet_bytes(df)
+    if parquet_bytes is None:
+        return None
+    artifact = store.put_bytes(parquet_bytes, suffix=".parquet")
+    return "parquet", artifact, {"rows": int(df.shape[0]), "columns": int(df.shape[1])}
+
+
+register_object_handler("pandas.core.frame.DataFrame", _store_dataframe)
+
+
+_BUFFER_CHUNK_BYTES = 16 * 1024 * 1024
+
+
+def _store_ndarray(array: Any, store: ArtifactStore) -> Optional[tuple[str, ArtifactMeta, Dict[str, Any]]]:
+    """Write ``.npy`` (header + raw buffer) straight from the array's memory."""
+    import numpy as np  # type: ignore
+    from numpy.lib import format as npy_format  # type: ignore
+
+    if array.dtype.hasobject:
+        return None  # needs pickling; not a zero-copy candidate
+    if not (array.flags.c_contiguous or array.flags.f_contiguous):
+        array = np.ascontiguousarray(array)
+    header = BytesIO()
+    header_data = npy_format.header_data_from_array_1_0(array)
+    try:
+        npy_format.write_array_header_1_0(header, header_data)
+    except ValueError:
+        npy_format.write_array_header_2_0(header, header_data)
+    # Fortran-ordered arrays are stored as such; their transpose is C-contiguous.
+    contiguous = array if array.flags.c_contiguous else array.T
+    data = memoryview(contiguous.reshape(-1).view(np.uint8))
+
+    def chunks() -> Any:
+        yield header.getvalue()
+        for start in range(0, len(data), _BUFFER_CHUNK_BYTES):
+            yield data[start : start + _BUFFER_CHUNK_BYTES]
+
+    artifact = store.put_stream(chunks(), suffix=".npy")
+    return "npy", artifact, {"shape": list(array.shape), "dtype": array.dtype.str}
+
+
+def _store_arrow(table: Any, store: ArtifactStore) -> Optional[tuple[str, ArtifactMeta, Dict[str, Any]]]:
+    """Write a Table or RecordBatch in the Arrow IPC file format (memory-mappable)."""
+    import pyarrow as pa  # type: ignore
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write(table)
+    artifact = store.put_bytes(memoryview(sink.getvalue()), suffix=".arrow")
+    return "arrow", artifact, {"rows": int(table.num_rows), "columns": int(table.num_columns)}
+
+
+register_object_handler("numpy.ndarray", _store_ndarray)
+register_object_handler("pyarrow.lib.Table", _store_arrow)
+register_object_handler("pyarrow.lib.RecordBatch", _store_arrow)
+
+
+_DEFAULT_STORES: Dict[Path, ArtifactStore] = {}
+_DEFAULT_STORES_LOCK = threading.Lock()
+
+
+def _default_store() -> ArtifactStore:
+    # One store (and index connection) per working directory instead of per call.
+    root = Path("artifacts").resolve()
+    with _DEFAULT_STORES_LOCK:
+        store = _DEFAULT_STORES.get(root)
+        if store is None:
+            store = _DEFAULT_STORES[root] = ArtifactStore(root)
+        return store
+
+
+def _encode(
+    key: str,
+    obj: Any,
+    *,
+    store: ArtifactStore,
+    inline_limit: int,
+    event: str,
+) -> Dict[str, Any]:
+    meta: Dict[str, Any] = {}
+    handler = _handler_for(obj)
+    if handler is not None:
+        try:
+            handled = handler(obj, store)
+        except Exception:
+            handled = None
+        if handled is not None:
+            type_label, artifact, extra = handled
+            meta.update(extra)
+            meta.update({"bytes": artifact.bytes, "hash": artifact.hash})
+            return {
+                "event": event,
+                "key": key,
+                "type": type_label,
+                "artifact_path": artifact.path,
+                "meta": meta,
+            }
+
+    if _exceeds(obj, inline_limit):
+        artifact = store.put_stream(_json_chunks(obj), suffix=".json")
+    else:
+        json_bytes = _json_bytes(obj)
+        if len(json_bytes) <= inline_limit:
+            meta.update({"bytes": len(json_bytes), "value": obj})
+            return {
+                "event": event,
+                "key": key,
+                "type": "inline_json",
+                "artifact_path": None,
+                "meta": meta,
+            }
+        artifact = store.put_bytes(json_bytes, suffix=".json")
+    meta.update({"bytes": artifact.bytes, "hash": artifact.hash})
+    return {
+        "event": event,
+        "key": key,
+        "type": "artifact_json",
+        "artifact_path": artifact.path,
+        "meta": meta,
+    }
+
+
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_EXECUTOR_LOCK = threading.Lock()
+_PENDING: Dict[str, Future] = {}
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="org_logging-objects")
+            atexit.register(wait_for_objects)
+        return _EXECUTOR
+
+
+def wait_for_objects(timeout: Optional[float] = None) -> None:
+    """Block until every background ``log_object`` call has been written and logged."""
+    wait(list(_PENDING.values()), timeout=timeout)
+
+
+def pending_object(artifact_ref: str) -> Optional[Future]:
+    """Future of a still-running background ``log_object`` call (its final payload)."""
+    return _PENDING.get(artifact_ref)
+
+
+def _emit_failure(logger: Any, event: str, key: str, artifact_ref: str, exc: BaseException) -> None:
+    """Log that a background ``log_object`` call failed, so ``artifact_ref`` resolves."""
+    payload = {
+        "event": event,
+        "key": key,
+        "type": "error",
+        "artifact_path": None,
+        "artifact_ref": artifact_ref,
+        "meta": {"error": f"{type(exc).__name__}: {exc}"},
+    }
+    try:
+        if isinstance(logger, logging.Logger):
+            logger.error(payload, exc_info=exc)
+        else:
+            _emit(logger, payload)
+    except Exception:
+        # The target logger itself is what failed; don't lose the error.
+        logging.getLogger(__name__).exception("log_object %s (%s) failed", key, artifact_ref)
+
+
 def log_object(
     logger: Any,
     key: str,
@@ -37,63 +299,44 @@ def log_object(
     artifact_store: Optional[ArtifactStore] = None,
     inline_limit: int = 2048,
     event: str = "object",
+    background: bool = False,
 ) -> Dict[str, Any]:
-    store = artifact_store or ArtifactStore()
-    meta: Dict[str, Any] = {}
-    artifact_path: Optional[str] = None
-    type_label = type(obj).__name__
-
-    try:
-        import pandas as pd  # type: ignore
-
-        if isinstance(obj, pd.DataFrame):
-            parquet_bytes = _dataframe_to_parquet_bytes(obj)
-            if parquet_bytes is not None:
-                artifact = store.put_bytes(parquet_bytes, suffix=".parquet")
-                artifact_path = artifact.path
-                type_label = "parquet"
-                meta.update(
-                    {
-                        "rows": int(obj.shape[0]),
-                        "columns": int(obj.shape[1]),
-                        "bytes": artifact.bytes,
-                        "hash": artifact.hash,
-                    }
-                )
-                payload = {
-                    "event": event,
-                    "key": key,
-                    "type": type_label,
-                    "artifact_path": artifact_path,
-                    "meta": meta,
-                }
-                _emit(logger, payload)
-                return payload
-    except Exception:
-        pass
+    """Log ``obj`` inline as JSON when small, otherwise as an artifact.
 
-    json_bytes = _json_bytes(obj)
-    if len(json_bytes) <= inline_limit:
-        meta.update({"bytes": len(json_bytes), "value": obj})
-        payload = {
-            "event": event,
-            "key": key,
-            "type": "inline_json",
-            "artifact_path": None,
-            "meta": meta,
-        }
+    With ``background=True`` encoding, writing and logging happen on a small
+    thread pool and the call returns a ``"pending"`` payload at once. Its
+    ``artifact_ref`` also appears on the record logged when the artifact is
+    ready (see ``pending_object``/``wait_for_objects``). ``obj`` must not be
+    mutated until then. If encoding or writing fails, a ``"type": "error"``
+    payload with the same ``artifact_ref`` is logged at ERROR instead, and the
+    pending future raises the exception.
+    """
+    store = artifact_store or _default_store()
+    if not background:
+        payload = _encode(key, obj, store=store, inline_limit=inline_limit, event=event)
         _emit(logger, payload)
         return payload
 
-    artifact = store.put_bytes(json_bytes, suffix=".json")
-    artifact_path = artifact.path
-    meta.update({"bytes": artifact.bytes, "hash": artifact.hash})
-    payload = {
+    artifact_ref = uuid.uuid4().hex
+
+    def job() -> Dict[str, Any]:
+        try:
+            payload = _encode(key, obj, store=store, inline_limit=inline_limit, event=event)
+            payload["artifact_ref"] = artifact_ref
+            _emit(logger, payload)
+        except Exception as exc:
+            _emit_failure(logger, event, key, artifact_ref, exc)
+            raise
+        return payload
+
+    future = _executor().submit(job)
+    _PENDING[artifact_ref] = future
+    future.add_done_callback(lambda _: _PENDING.pop(artifact_ref, None))
+    return {
         "event": event,
         "key": key,
-        "type": "artifact_json",
-        "artifact_path": artifact_path,
-        "meta": meta,
+        "type": "pending",
+        "artifact_path": None,
+        "artifact_ref": artifact_ref,
+        "meta": {},
     }
-    _emit(logger, payload)
-    return payload
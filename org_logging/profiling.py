@@ -0,0 +1,250 @@
+"""Sampling profiles of slow ``log_duration`` calls.
+
+A ``SlowCallProfiler`` runs one background thread that, every ``interval``
+seconds, records the Python stack of each thread currently inside a profiled
+call. When a call ends faster than its threshold its samples are discarded;
+when it ends slower, the samples are turned into a profile (top functions plus
+collapsed stacks) and stored as a JSON artifact. Captures are limited to
+``max_per_minute`` by a token bucket, and while the bucket is empty calls are
+not sampled at all, so a slow production service cannot be overloaded by its
+own profiling.
+
+Sampling rather than ``cProfile``: a deterministic profiler would have to trace
+every call (it cannot know in advance which will be slow), which multiplies
+the cost of hot functions. Sampling costs the profiled call only a registration
+and a lookup; the stack walks happen on the sampler thread, and so does turning
+a kept capture into a profile and writing it.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Any, Callable, Optional
+
+from .artifacts import ArtifactMeta, ArtifactStore
+
+PROFILE_FORMAT = "org_logging.sampling_profile/1"
+PROFILE_SUFFIX = ".prof.json"
+
+
+class _Capture:
+    __slots__ = ("thread_id", "frame", "samples")
+
+    def __init__(self, thread_id: int, frame: FrameType) -> None:
+        self.thread_id = thread_id
+        self.frame = frame  # the profiled call's wrapper; samples stop here
+        self.samples: dict[tuple[CodeType, ...], int] = {}
+
+
+def _label(code: CodeType) -> str:
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({code.co_filename}:{code.co_firstlineno})"
+
+
+class SlowCallProfiler:
+    """Capture sampling profiles of calls slower than a threshold.
+
+    Pass one to ``log_duration(profile_slower_than=..., profiler=...)``; with
+    only ``profile_slower_than`` the shared ``default_profiler()`` is used.
+    Profiles go to ``artifact_store`` (by default the same ``./artifacts``
+    store as ``log_object``). ``top`` limits the functions kept in a profile.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_per_minute: float = 6,
+        interval: float = 0.005,
+        artifact_store: Optional[ArtifactStore] = None,
+        max_depth: int = 128,
+        top: int = 50,
+    ) -> None:
+        if max_per_minute <= 0:
+            raise ValueError("max_per_minute must be positive")
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        self.max_per_minute = max_per_minute
+        self.interval = interval
+        self.artifact_store = artifact_store
+        self.max_depth = max_depth
+        self.top = top
+        self._tokens = float(max_per_minute)
+        self._updated = time.monotonic()
+        self._active: dict[int, _Capture] = {}
+        self._kept: list[tuple[_Capture, dict[str, Any], Callable[[Optional[ArtifactMeta]], None]]] = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _refill(self) -> float:
+        now = time.monotonic()
+        tokens = min(
+            float(self.max_per_minute),
+            self._tokens + (now - self._updated) * self.max_per_minute / 60.0,
+        )
+        self._tokens = tokens
+        self._updated = now
+        return tokens
+
+    def start(self, frame: FrameType) -> Optional[_Capture]:
+        """Begin sampling the calling thread below ``frame``; None if over budget."""
+        with self._lock:
+            if self._refill() < 1:
+                return None
+            capture = _Capture(threading.get_ident(), frame)
+            self._active[id(capture)] = capture
+        if self._thread is None or not self._thread.is_alive():
+            self._start_thread()
+        if not self._wakeup.is_set():
+            self._wakeup.set()
+        return capture
+
+    def finish(
+        self,
+        capture: _Capture,
+        *,
+        keep: bool,
+        name: str,
+        elapsed: float,
+        unit: str,
+        on_stored: Callable[[Optional[ArtifactMeta]], None],
+    ) -> bool:
+        """Stop sampling; True if the profile will be stored (``keep`` and budget allows).
+
+        The profile is built and written on the sampler thread, which then
+        calls ``on_stored`` with its artifact, or None if storing failed.
+        """
+        with self._lock:
+            self._active.pop(id(capture), None)
+            capture.frame = None  # type: ignore[assignment]
+            if not keep or not capture.samples or self._refill() < 1:
+                return False
+            self._tokens -= 1
+            self._kept.append((capture, {"name": name, "elapsed": elapsed, "unit": unit}, on_stored))
+        self._wakeup.set()
+        return True
+
+    def flush(self) -> None:
+        """Store the kept profiles still waiting for the sampler thread (runs at exit)."""
+        with self._lock:
+            kept, self._kept = self._kept, []
+        for capture, details, on_stored in kept:
+            try:
+                profile: Optional[ArtifactMeta] = self._store(capture, **details)
+            except Exception:
+                profile = None
+            try:
+                on_stored(profile)
+            except Exception:
+                pass  # the sampler thread must survive a failing logger
+
+    def _store(self, capture: _Capture, *, name: str, elapsed: float, unit: str) -> ArtifactMeta:
+        profile = self._profile(capture, name=name, elapsed=elapsed, unit=unit)
+        store = self.artifact_store
+        if store is None:
+            from .objects import _default_store
+
+            store = _default_store()
+        return store.put_json(profile, suffix=PROFILE_SUFFIX)
+
+    def _profile(self, capture: _Capture, *, name: str, elapsed: float, unit: str) -> dict[str, Any]:
+        own: dict[CodeType, int] = {}
+        total: dict[CodeType, int] = {}
+        stacks: dict[str, int] = {}
+        for stack, count in capture.samples.items():
+            own[stack[-1]] = own.get(stack[-1], 0) + count
+            for code in set(stack):
+                total[code] = total.get(code, 0) + count
+            key = ";".join(_label(code).replace(";", ":") for code in stack)
+            stacks[key] = stacks.get(key, 0) + count
+        ranked = sorted(total, key=lambda code: (-total[code], -own.get(code, 0)))
+        return {
+            "format": PROFILE_FORMAT,
+            "name": name,
+            "elapsed": elapsed,
+            "unit": unit,
+            "interval_ms": self.interval * 1000,
+            "samples": sum(capture.samples.values()),
+            "functions": [
+                {"function": _label(code), "self": own.get(code, 0), "total": total[code]}
+                for code in ranked[: self.top]
+            ],
+            "stacks": stacks,
+        }
+
+    def _start_thread(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            if self._thread is None:
+                atexit.register(self.flush)
+            self._thread = threading.Thread(
+                target=self._run, name="org_logging-profiler", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait()
+            time.sleep(self.interval)
+            with self._lock:
+                active = list(self._active.values())
+                if not active and not self._kept:
+                    self._wakeup.clear()
+                    continue
+            if self._kept:
+                self.flush()
+            if not active:
+                continue
+            frames = sys._current_frames()
+            for capture in active:
+                frame = frames.get(capture.thread_id)
+                stop = capture.frame
+                codes: list[CodeType] = []
+                while frame is not None and frame is not stop and len(codes) < self.max_depth:
+                    codes.append(frame.f_code)
+                    frame = frame.f_back
+                if frame is None or not codes:
+                    continue  # the call returned since the snapshot
+                stack = tuple(reversed(codes))
+                # Captures are only read after finish() removed them under the lock.
+                with self._lock:
+                    if id(capture) in self._active:
+                        capture.samples[stack] = capture.samples.get(stack, 0) + 1
+            del frames
+
+
+_DEFAULT_PROFILER: Optional[SlowCallProfiler] = None
+_DEFAULT_PROFILER_LOCK = threading.Lock()
+
+
+def default_profiler() -> SlowCallProfiler:
+    """Return the process-wide profiler used when none is passed explicitly."""
+    global _DEFAULT_PROFILER
+    with _DEFAULT_PROFILER_LOCK:
+        if _DEFAULT_PROFILER is None:
+            _DEFAULT_PROFILER = SlowCallProfiler()
+        return _DEFAULT_PROFILER
+
+
+def load_profile(path: str | Path) -> dict[str, Any]:
+    """Read a profile artifact written by ``SlowCallProfiler``."""
+    with Path(path).open("r", encoding="utf-8") as handle:
+        profile = json.load(handle)
+    if not isinstance(profile, dict) or profile.get("format") != PROFILE_FORMAT:
+        raise ValueError(f"{path} is not a sampling profile")
+    return profile
+
+
+def profile_summary(path: str | Path, limit: int = 20) -> dict[str, Any]:
+    """The header and ``limit`` top functions of a profile, without its stacks."""
+    profile = load_profile(path)
+    summary = {key: value for key, value in profile.items() if key not in ("functions", "stacks")}
+    summary["functions"] = profile["functions"][:limit]
+    return summary
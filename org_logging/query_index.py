@@ -0,0 +1,434 @@
+"""SQLite query index over a JSONL detail log.
+
+``QueryIndex`` loads a detail log (with its rotated segments) into a SQLite
+database next to it (``<log>.sqlite`` by default) and answers filtered
+queries from there instead of scanning the file. ``timestamp``, ``event``,
+``run_id``, ``logger`` and ``level`` are indexed columns; every other field is
+kept in a JSON ``extra`` column, so entries come back as they were logged and
+SQLite's JSON functions can reach any field.
+
+``update()`` ingests only what was appended since the previous update, using
+the same checkpoint rules as ``IncrementalAnalyzer``: a rotated file is
+finished from the checkpoint, new segments are loaded once, and a truncated or
+rewritten live file is loaded again. ``python -m org_logging.ingest`` runs
+it from the command line.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import sqlite3
+from collections import Counter
+from contextlib import closing
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, Union
+
+from . import analytics
+from .analytics import DurationStats, _parse_lines
+from .incremental import _fingerprint, _last_line_end
+from .rotation import open_segment, rotated_segments, segment_key
+
+_SCHEMA_VERSION = 1
+_COLUMNS = ("timestamp", "level", "logger", "event", "run_id")
+_LIVE = ""  # segment of rows read from the live file
+_BATCH_ROWS = 5000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    seq INTEGER PRIMARY KEY,
+    segment TEXT NOT NULL,
+    timestamp TEXT,
+    level TEXT,
+    logger TEXT,
+    event TEXT,
+    run_id TEXT,
+    extra TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_segment ON entries (segment);
+CREATE INDEX IF NOT EXISTS entries_timestamp ON entries (timestamp);
+CREATE INDEX IF NOT EXISTS entries_event ON entries (event);
+CREATE INDEX IF NOT EXISTS entries_run_id ON entries (run_id);
+CREATE INDEX IF NOT EXISTS entries_logger ON entries (logger);
+CREATE INDEX IF NOT EXISTS entries_level ON entries (level);
+CREATE TABLE IF NOT EXISTS checkpoint (id INTEGER PRIMARY KEY CHECK (id = 0), state TEXT NOT NULL);
+"""
+
+_SELECT = f"SELECT {', '.join(_COLUMNS)}, extra FROM entries"
+_INSERT = (
+    "INSERT INTO entries (segment, timestamp, level, logger, event, run_id, extra) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
+Filter = Union[str, Iterable[str], None]
+Moment = Union[str, datetime, None]
+
+
+def _row(segment: str, entry: Any) -> tuple[Any, ...]:
+    # String values of the indexed fields move to their columns; anything
+    # else (including null) stays in ``extra`` so it reads back unchanged.
+    columns: list[Optional[str]] = [None] * len(_COLUMNS)
+    extra = entry
+    if isinstance(entry, dict):
+        extra = dict(entry)
+        for position, key in enumerate(_COLUMNS):
+            value = extra.get(key)
+            if isinstance(value, str):
+                columns[position] = value
+                del extra[key]
+    return (segment, *columns, json.dumps(extra))
+
+
+def _entry(row: tuple[Any, ...]) -> Any:
+    *columns, extra = row
+    value = json.loads(extra)
+    if not isinstance(value, dict):
+        return value
+    entry = {key: column for key, column in zip(_COLUMNS, columns) if column is not None}
+    entry.update(value)
+    return entry
+
+
+def _read_lines(path: Path, start: int, end: Optional[int]) -> Iterator[str]:
+    """Lines of ``[start, end)`` of ``path``; ``end=None`` reads a (compressed) file to EOF."""
+    if end is None:
+        with open_segment(path, "rb") as raw:
+            if start:
+                raw.seek(start)
+            yield from io.TextIOWrapper(raw, encoding="utf-8", errors="replace")
+        return
+    with path.open("rb") as handle:
+        handle.seek(start)
+        position = start
+        for line in handle:
+            if position >= end:
+                break
+            position += len(line)
+            yield line.decode("utf-8", errors="replace")
+
+
+def _moment(value: Union[str, datetime]) -> str:
+    # Detail timestamps are UTC ISO 8601 strings, which sort chronologically.
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc).isoformat()
+    return value
+
+
+def _where(
+    *,
+    event: Filter = None,
+    run_id: Filter = None,
+    logger: Filter = None,
+    level: Filter = None,
+    since: Moment = None,
+    until: Moment = None,
+) -> tuple[str, list[Any]]:
+    clauses: list[str] = []
+    params: list[Any] = []
+    matches = (("event", event), ("run_id", run_id), ("logger", logger), ("level", level))
+    for column, value in matches:
+        if value is None:
+            continue
+        values = [value] if isinstance(value, str) else list(value)
+        if column == "level":
+            values = [item.upper() for item in values]
+        clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+        params.extend(values)
+    if since is not None:
+        clauses.append("timestamp >= ?")
+        params.append(_moment(since))
+    if until is not None:
+        clauses.append("timestamp < ?")
+        params.append(_moment(until))
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+class QueryIndex:
+    """SQLite index over one detail log and its rotated segments.
+
+    Filters take a value or a list of values for ``event``, ``run_id``,
+    ``logger`` and ``level``, and ``since`` (inclusive) / ``until``
+    (exclusive) as ISO 8601 strings or datetimes (naive ones are UTC). Queries
+    read what was ingested by the last ``update()``; they do not update.
+    """
+
+    def __init__(self, log_path: str | Path, *, db_path: Optional[str | Path] = None) -> None:
+        self.log_path = Path(log_path)
+        self.db_path = (
+            Path(db_path) if db_path else self.log_path.with_name(self.log_path.name + ".sqlite")
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        # One short-lived connection per call keeps the index usable from any
+        # thread; WAL lets readers run while an update is writing.
+        connection = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        if connection.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+            connection.execute("BEGIN IMMEDIATE")
+            if connection.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+                connection.execute("DROP TABLE IF EXISTS entries")
+                connection.execute("DROP TABLE IF EXISTS checkpoint")
+                for statement in _SCHEMA.split(";"):
+                    if statement.strip():
+                        connection.execute(statement)
+                connection.execute(f"PRAGMA user_version={_SCHEMA_VERSION}")
+            connection.execute("COMMIT")
+        return connection
+
+    def _load_state(self, connection: sqlite3.Connection) -> Optional[dict[str, Any]]:
+        row = connection.execute("SELECT state FROM checkpoint WHERE id = 0").fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    def _ingest(
+        self,
+        connection: sqlite3.Connection,
+        path: Path,
+        segment: str,
+        start: int = 0,
+        end: Optional[int] = None,
+    ) -> int:
+        added = 0
+        rows: list[tuple[Any, ...]] = []
+        try:
+            for entry in _parse_lines(_read_lines(path, start, end)):
+                rows.append(_row(segment, entry))
+                if len(rows) >= _BATCH_ROWS:
+                    connection.executemany(_INSERT, rows)
+                    added += len(rows)
+                    rows = []
+        except FileNotFoundError:
+            pass  # pruned between listing and opening
+        connection.executemany(_INSERT, rows)
+        return added + len(rows)
+
+    def _current(self, segment: Path) -> Path:
+        """``segment``, or its compressed copy if compression finished since listing."""
+        if segment.exists():
+            return segment
+        key = segment_key(segment)
+        for candidate in rotated_segments(self.log_path):
+            if segment_key(candidate) == key:
+                return candidate
+        return segment
+
+    def update(self) -> int:
+        """Ingest entries appended since the last update; return how many were added."""
+        segments = rotated_segments(self.log_path)
+        stat = self.log_path.stat() if self.log_path.exists() else None
+        added = 0
+        with closing(self._connect()) as connection:
+            # The write lock is taken before the checkpoint is read, so
+            # concurrent updates (e.g. the UI and a cron job) never both ingest
+            # the same lines.
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                state = self._load_state(connection)
+                pending = list(segments)
+                offset = 0
+                restart = state is None
+                if state is not None:
+                    known = set(state.get("segments", ()))
+                    pending = [segment for segment in segments if segment_key(segment) not in known]
+                    previous_offset = int(state.get("offset", 0))
+                    same_file = stat is not None and (state.get("device"), state.get("inode")) == (
+                        stat.st_dev,
+                        stat.st_ino,
+                    )
+                    if pending and not same_file:
+                        # The live file was rotated: the oldest new segment is
+                        # the file we were following; finish it and relabel its rows.
+                        followed = self._current(pending[0])
+                        if previous_offset == 0:
+                            pass
+                        elif _fingerprint(followed, previous_offset) == state.get("fingerprint"):
+                            key = segment_key(followed)
+                            added += self._ingest(connection, followed, key, previous_offset)
+                            connection.execute(
+                                "UPDATE entries SET segment = ? WHERE segment = ?", (key, _LIVE)
+                            )
+                            pending = pending[1:]
+                        else:
+                            restart = True
+                    elif stat is not None:
+                        offset = self._resume_offset(state, stat)
+                        if previous_offset > 0 and offset == 0:
+                            # Truncated or rewritten: only the live rows are stale.
+                            connection.execute("DELETE FROM entries WHERE segment = ?", (_LIVE,))
+                    else:
+                        connection.execute("DELETE FROM entries WHERE segment = ?", (_LIVE,))
+                if restart:
+                    connection.execute("DELETE FROM entries")
+                    pending = list(segments)
+                    offset = 0
+
+                # Segments pruned by backup_count leave the index too, so queries
+                # see the same entries as iter_detail_entries.
+                present = {segment_key(segment) for segment in segments} | {_LIVE}
+                stored = connection.execute("SELECT DISTINCT segment FROM entries").fetchall()
+                for (segment,) in stored:
+                    if segment not in present:
+                        connection.execute("DELETE FROM entries WHERE segment = ?", (segment,))
+
+                for segment in pending:
+                    added += self._ingest(connection, self._current(segment), segment_key(segment))
+
+                end = 0
+                if stat is not None:
+                    end = _last_line_end(self.log_path, offset, stat.st_size)
+                    if end > offset:
+                        added += self._ingest(connection, self.log_path, _LIVE, offset, end)
+
+                state = {
+                    "device": stat.st_dev if stat else None,
+                    "inode": stat.st_ino if stat else None,
+                    "offset": end,
+                    "fingerprint": _fingerprint(self.log_path, end) if end else None,
+                    "segments": [segment_key(segment) for segment in segments],
+                }
+                connection.execute(
+                    "INSERT OR REPLACE INTO checkpoint (id, state) VALUES (0, ?)",
+                    (json.dumps(state),),
+                )
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        return added
+
+    def _resume_offset(self, state: dict[str, Any], stat: os.stat_result) -> int:
+        offset = int(state.get("offset", 0))
+        if (state.get("device"), state.get("inode")) != (stat.st_dev, stat.st_ino):
+            return 0  # replaced
+        if stat.st_size < offset:
+            return 0  # truncated
+        if offset and _fingerprint(self.log_path, offset) != state.get("fingerprint"):
+            return 0  # rewritten in place
+        return offset
+
+    def reset(self) -> None:
+        """Delete the database so the next update re-reads every segment."""
+        for suffix in ("", "-wal", "-shm"):
+            self.db_path.with_name(self.db_path.name + suffix).unlink(missing_ok=True)
+
+    def iter_entries(
+        self,
+        *,
+        event: Filter = None,
+        run_id: Filter = None,
+        logger: Filter = None,
+        level: Filter = None,
+        since: Moment = None,
+        until: Moment = None,
+    ) -> Iterator[Any]:
+        """Lazily yield matching entries in log order."""
+        where, params = _where(
+            event=event, run_id=run_id, logger=logger, level=level, since=since, until=until
+        )
+        with closing(self._connect()) as connection:
+            cursor = connection.execute(
+                f"{_SELECT}{where} ORDER BY seq", params
+            )
+            for row in cursor:
+                yield _entry(row)
+
+    def entries(
+        self,
+        *,
+        event: Filter = None,
+        run_id: Filter = None,
+        logger: Filter = None,
+        level: Filter = None,
+        since: Moment = None,
+        until: Moment = None,
+        limit: Optional[int] = None,
+    ) -> list[Any]:
+        """Matching entries in log order (the newest ``limit`` if set)."""
+        if not limit:
+            return list(
+                self.iter_entries(
+                    event=event, run_id=run_id, logger=logger, level=level, since=since, until=until
+                )
+            )
+        where, params = _where(
+            event=event, run_id=run_id, logger=logger, level=level, since=since, until=until
+        )
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                f"{_SELECT}{where} ORDER BY seq DESC LIMIT ?",
+                [*params, limit],
+            ).fetchall()
+        return [_entry(row) for row in reversed(rows)]
+
+    def count_events(
+        self,
+        *,
+        run_id: Filter = None,
+        logger: Filter = None,
+        level: Filter = None,
+        since: Moment = None,
+        until: Moment = None,
+    ) -> Counter[str]:
+        """``analytics.count_events`` over the matching entries, counted in SQL."""
+        where, params = _where(run_id=run_id, logger=logger, level=level, since=since, until=until)
+        where += " AND " if where else " WHERE "
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                f"SELECT event, COUNT(*) FROM entries{where}event != '' "
+                "GROUP BY event ORDER BY MIN(seq)",
+                params,
+            ).fetchall()
+        return Counter(dict(rows))
+
+    def duration_stats(
+        self,
+        *,
+        unit: Optional[str] = None,
+        metric: str = "elapsed",
+        run_id: Filter = None,
+        logger: Filter = None,
+        level: Filter = None,
+        since: Moment = None,
+        until: Moment = None,
+    ) -> dict[str, DurationStats]:
+        """``analytics.duration_stats`` over the matching duration events and summaries."""
+        return analytics.duration_stats(
+            self.iter_entries(
+                event=("duration", "duration_summary"),
+                run_id=run_id,
+                logger=logger,
+                level=level,
+                since=since,
+                until=until,
+            ),
+            unit=unit,
+            metric=metric,
+        )
+
+    def return_count_stats(
+        self,
+        *,
+        run_id: Filter = None,
+        logger: Filter = None,
+        level: Filter = None,
+        since: Moment = None,
+        until: Moment = None,
+    ) -> dict[str, DurationStats]:
+        """``analytics.return_count_stats`` over the matching events and summaries."""
+        return analytics.return_count_stats(
+            self.iter_entries(
+                event=("return_count", "return_count_summary"),
+                run_id=run_id,
+                logger=logger,
+                level=level,
+                since=since,
+                until=until,
+            )
+        )
+
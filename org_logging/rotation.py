@@ -0,0 +1,271 @@
+"""Size/time based log rotation with background compression, and segment readers.
+
+A rotated log is a *segment set*: the live file (``detail.jsonl``) plus rotated
+segments next to it named ``detail.jsonl.<YYYYmmdd-HHMMSS-ffffff>``, optionally
+followed by ``.gz`` or ``.zst`` once compressed. Segment names sort in rotation
+order, and the readers here walk the set oldest first as one logical stream.
+"""
+
+from __future__ import annotations
+
+import gzip
+import io
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import shutil
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import IO, Callable, Iterator, Optional
+
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+_SEGMENT_STAMP = re.compile(r"\.\d{8}-\d{6}-\d{6}(\.gz|\.zst)?$")
+
+
+def _zstandard():
+    try:
+        import zstandard  # type: ignore
+    except ImportError as exc:
+        raise ImportError("zstd compression requires the 'zstandard' package") from exc
+    return zstandard
+
+
+def open_segment(path: str | Path, mode: str = "rt") -> IO:
+    """Open a plain, ``.gz`` or ``.zst`` log file for reading (``"rt"`` or ``"rb"``)."""
+    path = Path(path)
+    text = "b" not in mode
+    kwargs = {"encoding": "utf-8", "errors": "replace"} if text else {}
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt" if text else "rb", **kwargs)
+    if path.suffix == ".zst":
+        reader = _zstandard().ZstdDecompressor().stream_reader(path.open("rb"), closefd=True)
+        return io.TextIOWrapper(reader, **kwargs) if text else io.BufferedReader(reader)
+    return path.open("r" if text else "rb", **kwargs)
+
+
+def is_compressed(path: str | Path) -> bool:
+    return Path(path).suffix in (".gz", ".zst")
+
+
+def segment_key(path: str | Path) -> str:
+    """Segment name without its compression suffix (stable across compression)."""
+    name = Path(path).name
+    for suffix in COMPRESSION_SUFFIXES.values():
+        if name.endswith(suffix):
+            return name[: -len(suffix)]
+    return name
+
+
+def rotated_segments(path: str | Path) -> list[Path]:
+    """Return the rotated segments of ``path``, oldest first.
+
+    If a segment exists both plain and compressed (compression just finished),
+    the compressed copy is returned; it is only renamed into place once complete.
+    """
+    path = Path(path)
+    prefix = path.name
+    try:
+        names = os.listdir(path.parent if str(path.parent) else ".")
+    except FileNotFoundError:
+        return []
+    segments: dict[str, Path] = {}
+    for name in names:
+        if not name.startswith(prefix) or not _SEGMENT_STAMP.fullmatch(name[len(prefix) :]):
+            continue
+        key = segment_key(name)
+        if key not in segments or is_compressed(name):
+            segments[key] = path.with_name(name)
+    return [segments[key] for key in sorted(segments)]
+
+
+def log_segments(path: str | Path) -> list[Path]:
+    """Return every existing file of the segment set, oldest first, live file last."""
+    path = Path(path)
+    segments = rotated_segments(path)
+    if path.exists():
+        segments.append(path)
+    return segments
+
+
+def iter_segment_lines(path: str | Path) -> Iterator[str]:
+    """Yield text lines from every segment of ``path`` in order."""
+    for segment in log_segments(path):
+        try:
+            handle = open_segment(segment, "rt")
+        except FileNotFoundError:
+            continue  # pruned between listing and opening
+        with handle:
+            yield from handle
+
+
+class _Compressor:
+    """One daemon thread that runs post-rotation jobs in submission order."""
+
+    def __init__(self) -> None:
+        self._queue: queue.Queue[Callable[[], None]] = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, job: Callable[[], None]) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="org_logging-compress", daemon=True
+                )
+                self._thread.start()
+        self._queue.put(job)
+
+    def join(self) -> None:
+        """Block until every submitted job has finished."""
+        self._queue.join()
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                job()
+            except Exception:  # noqa: BLE001 - never kill the worker over one file
+                # Not logged: the failing handler may be the one receiving it.
+                traceback.print_exc(file=sys.stderr)
+            finally:
+                self._queue.task_done()
+
+
+_COMPRESSOR = _Compressor()
+
+
+def compress_segment(path: str | Path, compression: str = "gzip") -> Path:
+    """Compress ``path`` to ``<path>.gz``/``.zst`` atomically and remove the original."""
+    if compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Unsupported compression: {compression}")
+    source = Path(path)
+    target = source.with_name(source.name + COMPRESSION_SUFFIXES[compression])
+    tmp_path = target.with_name(target.name + ".tmp")
+    with source.open("rb") as src:
+        if compression == "gzip":
+            with gzip.open(tmp_path, "wb") as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+        else:
+            with tmp_path.open("wb") as raw:
+                with _zstandard().ZstdCompressor().stream_writer(raw) as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+    os.replace(tmp_path, target)
+    source.unlink()
+    return target
+
+
+def _segment_path(base: Path, now: float) -> Path:
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.gmtime(now))
+    return base.with_name(f"{base.name}.{stamp}-{int(now % 1 * 1_000_000):06d}")
+
+
+class CompressingRotatingFileHandler(logging.handlers.BaseRotatingHandler):
+    """File handler that rotates by size and/or age and compresses old segments.
+
+    The live file is rotated once it has reached ``max_bytes`` (so a segment can
+    exceed it by one record) or once ``interval`` seconds have passed since the
+    last rotation. Rotation itself is a rename; compressing the segment with
+    ``compression`` (``"gzip"``, ``"zstd"`` or ``None``) and deleting segments
+    beyond the newest ``backup_count`` happen on a background thread, so the
+    logging thread is never blocked on it.
+    """
+
+    def __init__(
+        self,
+        filename: str | Path,
+        *,
+        max_bytes: int = 0,
+        interval: Optional[float] = None,
+        compression: Optional[str] = "gzip",
+        backup_count: int = 0,
+        encoding: Optional[str] = None,
+        delay: bool = False,
+    ) -> None:
+        if max_bytes < 0:
+            raise ValueError("max_bytes must not be negative")
+        if interval is not None and interval <= 0:
+            raise ValueError("interval must be positive")
+        if compression is not None:
+            if compression not in COMPRESSION_SUFFIXES:
+                raise ValueError(f"Unsupported compression: {compression}")
+            if compression == "zstd":
+                _zstandard()
+        super().__init__(str(filename), "a", encoding=encoding, delay=delay)
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.compression = compression
+        self.backup_count = backup_count
+        self._rollover_at = time.time() + interval if interval else None
+        # Finish work a previous process left behind (crash mid-compression).
+        self._schedule_cleanup([])
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self._rollover_at is not None and time.time() >= self._rollover_at:
+            return True
+        if self.max_bytes:
+            if self.stream is None:
+                self.stream = self._open()
+            return self.stream.tell() >= self.max_bytes
+        return False
+
+    def doRollover(self) -> None:
+        if self.stream:
+            self.stream.close()
+            self.stream = None  # type: ignore[assignment]
+        now = time.time()
+        if self._rollover_at is not None:
+            self._rollover_at = now + self.interval  # type: ignore[operator]
+        rotated: list[Path] = []
+        base = Path(self.baseFilename)
+        if base.exists() and base.stat().st_size:
+            target = _segment_path(base, now)
+            # Also avoid names already taken by a compressed segment (with any
+            # compressor, in case the setting changed between runs).
+            while target.exists() or any(
+                target.with_name(target.name + suffix).exists()
+                for suffix in COMPRESSION_SUFFIXES.values()
+            ):
+                now += 1e-6
+                target = _segment_path(base, now)
+            os.rename(base, target)
+            rotated.append(target)
+        if not self.delay:
+            self.stream = self._open()
+        self._schedule_cleanup(rotated)
+
+    def _schedule_cleanup(self, rotated: list[Path]) -> None:
+        compression = self.compression
+        backup_count = self.backup_count
+        base = Path(self.baseFilename)
+
+        def job() -> None:
+            if compression is not None:
+                pending = set(rotated)
+                pending.update(p for p in rotated_segments(base) if not is_compressed(p))
+                for stale in base.parent.glob(f"{base.name}.*.tmp"):
+                    stale.unlink(missing_ok=True)
+                for segment in sorted(pending):
+                    if segment.exists():
+                        compress_segment(segment, compression)
+            if backup_count:
+                for segment in rotated_segments(base)[:-backup_count]:
+                    segment.unlink(missing_ok=True)
+
+        if not rotated:
+            existing = rotated_segments(base)
+            needs_compression = compression is not None and any(
+                not is_compressed(segment) for segment in existing
+            )
+            if not needs_compression and not (backup_count and len(existing) > backup_count):
+                return
+        _COMPRESSOR.submit(job)
+
+    def close(self) -> None:
+        super().close()
+        # Let pending compression finish before the interpreter exits.
+        _COMPRESSOR.join()
@@ -0,0 +1,84 @@
+"""Sampling policies for high-frequency timing events."""
+
+from __future__ import annotations
+
+import itertools
+import random
+import threading
+import time
+from typing import Optional
+
+
+class Sampler:
+    """Decides whether a call is logged and how many calls the event represents.
+
+    ``sample()`` returns ``None`` to skip the call, or the event's sample
+    weight: the number of calls it stands for, which analytics use to
+    estimate true call counts.
+    """
+
+    def sample(self) -> Optional[float]:
+        raise NotImplementedError
+
+
+class ProbabilitySampler(Sampler):
+    """Log each call independently with probability ``rate`` (weight ``1 / rate``)."""
+
+    def __init__(self, rate: float) -> None:
+        if not 0 < rate <= 1:
+            raise ValueError("rate must be in (0, 1]")
+        self.rate = rate
+        self._weight = 1.0 / rate
+        self._random = random.random
+
+    def sample(self) -> Optional[float]:
+        if self._random() < self.rate:
+            return self._weight
+        return None
+
+
+class EveryNSampler(Sampler):
+    """Log one call in every ``n`` (weight ``n``)."""
+
+    def __init__(self, n: int) -> None:
+        if n < 1:
+            raise ValueError("n must be at least 1")
+        self.n = n
+        self._counter = itertools.count()
+
+    def sample(self) -> Optional[float]:
+        # next() on itertools.count is atomic under the GIL.
+        if next(self._counter) % self.n == 0:
+            return float(self.n)
+        return None
+
+
+class RateLimitSampler(Sampler):
+    """Token bucket: at most ``per_second`` events on average, bursts up to ``burst``.
+
+    Each emitted event's weight is the number of calls since the previous
+    emitted event (including itself), so skipped calls are still counted.
+    """
+
+    def __init__(self, per_second: float, burst: Optional[float] = None) -> None:
+        if per_second <= 0:
+            raise ValueError("per_second must be positive")
+        self.per_second = per_second
+        self.burst = burst if burst is not None else max(1.0, per_second)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._skipped = 0
+        self._lock = threading.Lock()
+
+    def sample(self) -> Optional[float]:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.per_second)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                weight = float(self._skipped + 1)
+                self._skipped = 0
+                return weight
+            self._skipped += 1
+            return None
@@ -0,0 +1,177 @@
+"""Mergeable quantile sketch used by the analytics aggregators."""
+
+from __future__ import annotations
+
+import math
+from typing import Any
+
+
+class DDSketch:
+    """Log-bucketed quantile sketch with bounded relative error (DDSketch).
+
+    Every quantile estimate is within ``relative_accuracy`` of the true value.
+    At most ``max_buckets`` buckets are kept per sign; when that is exceeded the
+    lowest-magnitude buckets are folded together, so accuracy is preserved for the
+    high quantiles that latency SLOs care about. Sketches with the same
+    parameters merge losslessly and the result does not depend on merge order.
+    Infinities are counted outside the buckets and rank below/above every
+    finite value; NaN has no rank and is not added.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048) -> None:
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        if max_buckets < 1:
+            raise ValueError("max_buckets must be at least 1")
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.positive: dict[int, float] = {}
+        self.negative: dict[int, float] = {}
+        self.zero_count: float = 0
+        self.inf_count: float = 0
+        self.neg_inf_count: float = 0
+        self.count: float = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._positive_floor: int | None = None
+        self._negative_floor: int | None = None
+
+    def _index(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, index: int) -> float:
+        return 2 * self._gamma**index / (self._gamma + 1)
+
+    def add(self, value: float, weight: float = 1) -> None:
+        if value > 0:
+            if value == math.inf:
+                self.inf_count += weight
+            else:
+                self._add_bucket(True, self._index(value), weight)
+        elif value < 0:
+            if value == -math.inf:
+                self.neg_inf_count += weight
+            else:
+                self._add_bucket(False, self._index(-value), weight)
+        elif value == 0:
+            self.zero_count += weight
+        else:
+            return  # NaN
+        self.count += weight
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def _add_bucket(self, positive: bool, index: int, weight: float) -> None:
+        bins = self.positive if positive else self.negative
+        floor = self._positive_floor if positive else self._negative_floor
+        if floor is not None and index < floor:
+            index = floor
+        bins[index] = bins.get(index, 0) + weight
+        if len(bins) > self.max_buckets:
+            self._collapse(positive)
+
+    def _collapse(self, positive: bool) -> None:
+        bins = self.positive if positive else self.negative
+        keys = sorted(bins)
+        cutoff = keys[len(keys) - self.max_buckets]
+        folded = 0
+        for key in keys:
+            if key >= cutoff:
+                break
+            folded += bins.pop(key)
+        bins[cutoff] += folded
+        if positive:
+            self._positive_floor = cutoff
+        else:
+            self._negative_floor = cutoff
+
+    def merge(self, other: "DDSketch") -> None:
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative_accuracy")
+        for positive, bins in ((True, other.positive), (False, other.negative)):
+            for index, weight in bins.items():
+                self._add_bucket(positive, index, weight)
+        self.zero_count += other.zero_count
+        self.inf_count += other.inf_count
+        self.neg_inf_count += other.neg_inf_count
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        """Return the estimated value at quantile ``q`` (0 <= q <= 1)."""
+        if not 0 <= q <= 1:
+            raise ValueError("quantile must be between 0 and 1")
+        if self.count == 0:
+            return math.nan
+        rank = q * (self.count - 1)
+        seen = self.neg_inf_count
+        if seen > rank:
+            return -math.inf
+        for index in sorted(self.negative, reverse=True):
+            seen += self.negative[index]
+            if seen > rank:
+                return self._clamp(-self._value(index))
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for index in sorted(self.positive):
+            seen += self.positive[index]
+            if seen > rank:
+                return self._clamp(self._value(index))
+        return self.max  # the top bucket, or +inf
+
+    def _clamp(self, value: float) -> float:
+        return min(max(value, self.min), self.max)
+
+    def histogram(self) -> list[tuple[float, float, float]]:
+        """Return ``(lower, upper, count)`` buckets in ascending value order."""
+        buckets: list[tuple[float, float, float]] = []
+        if self.neg_inf_count:
+            buckets.append((-math.inf, -math.inf, self.neg_inf_count))
+        for index in sorted(self.negative, reverse=True):
+            lower, upper = -(self._gamma**index), -(self._gamma ** (index - 1))
+            buckets.append((lower, upper, self.negative[index]))
+        if self.zero_count:
+            buckets.append((0.0, 0.0, self.zero_count))
+        for index in sorted(self.positive):
+            buckets.append((self._gamma ** (index - 1), self._gamma**index, self.positive[index]))
+        if self.inf_count:
+            buckets.append((math.inf, math.inf, self.inf_count))
+        return buckets
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "max_buckets": self.max_buckets,
+            "positive": {str(key): value for key, value in self.positive.items()},
+            "negative": {str(key): value for key, value in self.negative.items()},
+            "zero_count": self.zero_count,
+            "inf_count": self.inf_count,
+            "neg_inf_count": self.neg_inf_count,
+            "count": self.count,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, payload: dict[str, Any]) -> "DDSketch":
+        sketch = cls(
+            relative_accuracy=float(payload["relative_accuracy"]),
+            max_buckets=int(payload["max_buckets"]),
+        )
+        for positive, key in ((True, "positive"), (False, "negative")):
+            for index, weight in payload.get(key, {}).items():
+                sketch._add_bucket(positive, int(index), weight)
+        sketch.zero_count = payload.get("zero_count", 0)
+        sketch.inf_count = payload.get("inf_count", 0)
+        sketch.neg_inf_count = payload.get("neg_inf_count", 0)
+        sketch.count = payload.get("count", 0)
+        if sketch.count:
+            sketch.min = float(payload["min"])
+            sketch.max = float(payload["max"])
+        return sketch
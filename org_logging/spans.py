@@ -0,0 +1,79 @@
+"""Current-span tracking for the timing helpers.
+
+The innermost open ``log_timing`` block or ``log_duration`` call is kept in a
+``ContextVar``, so nesting follows the code that is actually running: each
+thread and each asyncio task sees its own current span, and tasks inherit the
+span that was current when they were created. Threads start without one; run
+the thread's target via ``contextvars.copy_context().run`` (as
+``asyncio.to_thread`` does) to nest its spans under the caller's.
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+import uuid
+from contextvars import ContextVar
+from typing import Optional
+
+
+class Span:
+    """Identity of one timed block: its id, its parent's id and its depth."""
+
+    __slots__ = ("_number", "_prefix", "_parent", "_run_id", "depth")
+
+    def __init__(self, run_id: Optional[str] = None) -> None:
+        # Kept cheap: ids are formatted (and run_ids generated) only when a
+        # span is actually logged, which sampling may skip.
+        parent = _CURRENT_SPAN.get()
+        self._number = next(_SPAN_COUNTER)
+        self._prefix = _SPAN_PREFIX
+        self._parent = parent
+        self._run_id = run_id
+        self.depth = 0 if parent is None else parent.depth + 1
+
+    @property
+    def span_id(self) -> str:
+        return f"{self._prefix}{self._number:x}"
+
+    @property
+    def parent_span_id(self) -> Optional[str]:
+        return None if self._parent is None else self._parent.span_id
+
+    @property
+    def run_id(self) -> str:
+        """The given run_id, else the parent's, else a new uuid (made on first use)."""
+        if self._run_id is None:
+            parent = self._parent
+            self._run_id = parent.run_id if parent is not None else str(uuid.uuid4())
+        return self._run_id
+
+    def __repr__(self) -> str:
+        return (
+            f"Span(span_id={self.span_id!r}, parent_span_id={self.parent_span_id!r}, "
+            f"depth={self.depth})"
+        )
+
+
+_CURRENT_SPAN: ContextVar[Optional[Span]] = ContextVar("org_logging_span", default=None)
+
+# Span ids are a random per-process prefix plus a counter: unique across the
+# processes of a run and much cheaper than a uuid per span.
+_SPAN_PREFIX = ""
+_SPAN_COUNTER = itertools.count()
+
+
+def _reset_span_ids() -> None:
+    global _SPAN_PREFIX, _SPAN_COUNTER
+    _SPAN_PREFIX = os.urandom(6).hex()
+    _SPAN_COUNTER = itertools.count()
+
+
+_reset_span_ids()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_span_ids)
+
+
+def current_span() -> Optional[Span]:
+    """Return the innermost open span in this thread/task, if any."""
+    return _CURRENT_SPAN.get()
@@ -2,13 +2,23 @@
 
 from __future__ import annotations
 
+import functools
+import inspect
 import logging
+import sys
 import time
 import uuid
-from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Callable, Generator, Optional, TypeVar, cast
+from types import FrameType
+from typing import TYPE_CHECKING, Any, AsyncGenerator, Callable, Optional, TypeVar, cast
 
+from .artifacts import ArtifactMeta
+from .profiling import SlowCallProfiler, _Capture, default_profiler
+from .sampling import Sampler
+from .spans import _CURRENT_SPAN, Span
+
+if TYPE_CHECKING:
+    from .metrics import MetricsRegistry
 
 DEFAULT_OVERVIEW_LOGGER = "org_logging.overview"
 
@@ -18,19 +28,43 @@ class TimingResult:
     name: str
     elapsed_ms: float
     run_id: str
+    span_id: Optional[str] = None
 
 
 def _resolve_logger(logger: Optional[logging.Logger]) -> logging.Logger:
     return logger or logging.getLogger(DEFAULT_OVERVIEW_LOGGER)
 
 
-def _resolve_run_id(logger: logging.Logger, run_id: Optional[str]) -> str:
+def _static_run_id(logger: logging.Logger, run_id: Optional[str]) -> Optional[str]:
+    """Return the run_id known up front (argument or adapter context), if any."""
     if run_id:
         return run_id
     extra = getattr(logger, "extra", None)
     if isinstance(extra, dict) and extra.get("run_id"):
         return str(extra["run_id"])
-    return str(uuid.uuid4())
+    return None
+
+
+def _resolve_run_id(logger: logging.Logger, run_id: Optional[str]) -> str:
+    return _static_run_id(logger, run_id) or str(uuid.uuid4())
+
+
+@functools.lru_cache(maxsize=None)
+def _normalize_unit(unit: str) -> tuple[str, float]:
+    """Return ``(label, milliseconds per unit)`` for a duration unit."""
+    normalized = unit.lower()
+    if normalized in {"ms", "millisecond", "milliseconds"}:
+        return "ms", 1.0
+    if normalized in {"s", "sec", "second", "seconds"}:
+        return "s", 1000.0
+    if normalized in {"m", "min", "minute", "minutes"}:
+        return "m", 60000.0
+    raise ValueError(f"Unsupported duration unit: {unit}")
+
+
+def _cpu_clock() -> tuple[float, float, float]:
+    """Start reading for ``cpu_time=True``: wall, thread CPU and process CPU seconds."""
+    return time.perf_counter(), time.thread_time(), time.process_time()
 
 
 def _emit_duration(
@@ -40,20 +74,46 @@ def _emit_duration(
     elapsed: float,
     run_id: str,
     unit: str,
+    sample_weight: Optional[float] = None,
+    span: Optional[Span] = None,
+    profile: Optional[ArtifactMeta] = None,
+    cpu: Optional[tuple[float, float]] = None,
 ) -> None:
-    logger.info(
-        "%s took %.2f%s",
-        name,
-        elapsed,
-        unit,
-        extra={
-            "event": "duration",
-            "duration_name": name,
-            "elapsed": elapsed,
-            "unit": unit,
-            "run_id": run_id,
-        },
-    )
+    extra: dict[str, object] = {
+        "event": "duration",
+        "duration_name": name,
+        "elapsed": elapsed,
+        "unit": unit,
+    }
+    if sample_weight is not None:
+        extra["sample_weight"] = sample_weight
+    if cpu is not None:
+        extra["thread_time"], extra["process_time"] = cpu
+        # Share of the wall time this thread spent on a CPU: near 1 for
+        # computation, near 0 when blocked on I/O, locks or the GIL.
+        extra["cpu_ratio"] = cpu[0] / elapsed if elapsed > 0 else None
+    if span is not None:
+        extra["span_id"] = span.span_id
+        extra["parent_span_id"] = span.parent_span_id
+        extra["depth"] = span.depth
+    if profile is not None:
+        extra["profile_path"] = profile.path
+        extra["profile_hash"] = profile.hash
+    extra["run_id"] = run_id
+    logger.info("%s took %.2f%s", name, elapsed, unit, extra=extra)
+
+
+def _sample_weight(
+    sampler: Optional[Sampler],
+    elapsed: float,
+    always_log_slower_than: Optional[float],
+) -> Optional[float]:
+    """Return the event weight, or None when the sampler drops this call."""
+    if sampler is None:
+        return 1.0
+    if always_log_slower_than is not None and elapsed >= always_log_slower_than:
+        return 1.0
+    return sampler.sample()
 
 
 def _emit_return_count(
@@ -74,63 +134,233 @@ def _emit_return_count(
     )
 
 
-def _emit_return_count(
-    *,
-    logger: logging.Logger,
-    name: str,
-    count: int,
-    run_id: str,
-) -> None:
-    logger.info(
-        "return_count",
-        extra={
-            "event": "return_count",
-            "return_count_name": name,
-            "count": count,
-            "run_id": run_id,
-        },
+class _DurationRecorder:
+    """Everything a timed call needs, resolved once rather than per call."""
+
+    __slots__ = (
+        "name",
+        "logger",
+        "run_id",
+        "unit",
+        "per_unit",
+        "sampler",
+        "always_log_slower_than",
+        "registry",
+        "profile_slower_than",
+        "profiler",
+        "cpu_time",
+        "clock",
+        "_is_enabled_for",
     )
-                
-@contextmanager
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        logger: Optional[logging.Logger],
+        run_id: Optional[str],
+        unit: str,
+        sampler: Optional[Sampler],
+        always_log_slower_than: Optional[float],
+        registry: Optional["MetricsRegistry"],
+        profile_slower_than: Optional[float] = None,
+        profiler: Optional[SlowCallProfiler] = None,
+        cpu_time: bool = False,
+    ) -> None:
+        if profile_slower_than is not None and registry is not None:
+            raise ValueError("profile_slower_than cannot be combined with a registry")
+        if cpu_time and registry is not None:
+            raise ValueError("cpu_time cannot be combined with a registry")
+        self.name = name
+        self.logger = _resolve_logger(logger)
+        self.run_id = _static_run_id(self.logger, run_id)
+        self.unit, self.per_unit = _normalize_unit(unit)
+        self.sampler = sampler
+        self.always_log_slower_than = always_log_slower_than
+        self.registry = registry
+        self.profile_slower_than = profile_slower_than
+        self.profiler = (profiler or default_profiler()) if profile_slower_than is not None else None
+        self.cpu_time = cpu_time
+        # The start reading passed back to record(): a plain perf_counter()
+        # unless CPU times were asked for.
+        self.clock: Callable[[], object] = _cpu_clock if cpu_time else time.perf_counter
+        self._is_enabled_for = self.logger.isEnabledFor
+
+    def enabled(self) -> bool:
+        # A registry aggregates regardless of level; its summaries are
+        # level-checked when they are flushed.
+        return self.registry is not None or self._is_enabled_for(logging.INFO)
+
+    def open_span(self) -> Optional[Span]:
+        # Aggregated calls emit no event, so they get no span either.
+        return Span(self.run_id) if self.registry is None else None
+
+    def start_profile(self, frame: FrameType) -> Optional[_Capture]:
+        return self.profiler.start(frame) if self.profiler is not None else None
+
+    def _finish_profile(
+        self,
+        capture: _Capture,
+        elapsed: float,
+        on_stored: Callable[[Optional[ArtifactMeta]], None],
+    ) -> bool:
+        """True if the call's profile is kept; ``on_stored`` then logs its event."""
+        profiler, threshold = self.profiler, self.profile_slower_than
+        if profiler is None or threshold is None:
+            return False
+        try:
+            return profiler.finish(
+                capture,
+                keep=elapsed >= threshold,
+                name=self.name,
+                elapsed=elapsed,
+                unit=self.unit,
+                on_stored=on_stored,
+            )
+        except Exception:
+            return False  # never fail the profiled call over its profile
+
+    def record(
+        self,
+        start: Any,
+        span: Optional[Span] = None,
+        run_id: Optional[str] = None,
+        capture: Optional[_Capture] = None,
+    ) -> None:
+        """Log a call that began at ``start``, a reading of ``self.clock``."""
+        end = time.perf_counter()
+        cpu: Optional[tuple[float, float]] = None
+        if self.cpu_time:
+            start, thread_start, process_start = start
+            scale = 1000 / self.per_unit
+            cpu = (
+                (time.thread_time() - thread_start) * scale,
+                (time.process_time() - process_start) * scale,
+            )
+        elapsed = (end - start) * 1000
+        if self.per_unit != 1.0:
+            elapsed /= self.per_unit
+        if capture is not None:
+
+            def on_stored(profile: Optional[ArtifactMeta]) -> None:
+                # A profiled call is always logged, once its profile is stored.
+                self._emit(elapsed, 1.0, span, run_id, cpu, profile)
+
+            if self._finish_profile(capture, elapsed, on_stored):
+                return
+        weight = _sample_weight(self.sampler, elapsed, self.always_log_slower_than)
+        if weight is None:
+            return
+        if self.registry is not None:
+            self.registry.record_duration(self.name, elapsed, self.unit, weight)
+            return
+        self._emit(elapsed, weight, span, run_id, cpu, None)
+
+    def _emit(
+        self,
+        elapsed: float,
+        weight: float,
+        span: Optional[Span],
+        run_id: Optional[str],
+        cpu: Optional[tuple[float, float]],
+        profile: Optional[ArtifactMeta],
+    ) -> None:
+        _emit_duration(
+            logger=self.logger,
+            name=self.name,
+            elapsed=elapsed,
+            run_id=span.run_id if span is not None else run_id or self.run_id or str(uuid.uuid4()),
+            unit=self.unit,
+            sample_weight=weight if self.sampler is not None else None,
+            span=span,
+            profile=profile,
+            cpu=cpu,
+        )
+
+
+class _TimingBlock:
+    """Context manager behind ``log_timing``; usable with ``with`` and ``async with``."""
+
+    def __init__(self, recorder: _DurationRecorder) -> None:
+        self._recorder = recorder
+
+    def __enter__(self) -> TimingResult:
+        recorder = self._recorder
+        enabled = recorder.enabled()
+        span = self._span = recorder.open_span() if enabled else None
+        if span is not None:
+            self._run_id = span.run_id
+            self._token = _CURRENT_SPAN.set(span)
+        else:
+            self._run_id = recorder.run_id or str(uuid.uuid4())
+        self._start = recorder.clock() if enabled else None
+        return TimingResult(
+            name=recorder.name,
+            elapsed_ms=0.0,
+            run_id=self._run_id,
+            span_id=span.span_id if span is not None else None,
+        )
+
+    def __exit__(self, *exc_info: object) -> None:
+        if self._span is not None:
+            _CURRENT_SPAN.reset(self._token)
+        if self._start is not None:
+            self._recorder.record(self._start, self._span, self._run_id)
+
+    async def __aenter__(self) -> TimingResult:
+        return self.__enter__()
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        self.__exit__(*exc_info)
+
+
 def log_timing(
     name: str,
     *,
     run_id: Optional[str] = None,
     logger: Optional[logging.Logger] = None,
     unit: str = "ms",
-) -> Generator[TimingResult, None, None]:
-    """Measure elapsed time for a block and log to the overview feed."""
-    resolved_logger = _resolve_logger(logger)
-    resolved_run_id = _resolve_run_id(resolved_logger, run_id)
-    start = time.perf_counter()
-    try:
-        yield TimingResult(name=name, elapsed_ms=0.0, run_id=resolved_run_id)
-    finally:
-        elapsed_ms = (time.perf_counter() - start) * 1000
-        elapsed, resolved_unit = _convert_duration(elapsed_ms, unit)
-        _emit_duration(
-            logger=resolved_logger,
-            name=name,
-            elapsed=elapsed,
-            run_id=resolved_run_id,
-            unit=resolved_unit,
+    sampler: Optional[Sampler] = None,
+    always_log_slower_than: Optional[float] = None,
+    registry: Optional["MetricsRegistry"] = None,
+    cpu_time: bool = False,
+) -> _TimingBlock:
+    """Measure elapsed time for a block and log to the overview feed.
+
+    Works as ``with log_timing(...)`` and as ``async with log_timing(...)``;
+    in a coroutine the measured time includes everything awaited in the block.
+    Logged blocks are spans: the event carries ``span_id``, the
+    ``parent_span_id`` of the enclosing block or ``log_duration`` call in the
+    same thread/task (see ``spans``) and its ``depth``.
+    With a ``sampler`` only sampled blocks are logged, each carrying a
+    ``sample_weight``; blocks taking at least ``always_log_slower_than``
+    (in ``unit``) are always logged with weight 1. With a ``registry`` the
+    measurement is aggregated in memory and reported in periodic
+    ``duration_summary`` events instead of one event per block.
+
+    With ``cpu_time=True`` the event also carries the block's ``thread_time``
+    and ``process_time`` (CPU time of the calling thread and of the whole
+    process, in ``unit``) and ``cpu_ratio``, thread CPU time over wall time.
+    In a coroutine the thread is the event loop's, so its CPU time includes
+    other tasks that ran while the block awaited.
+    """
+    return _TimingBlock(
+        _DurationRecorder(
+            name,
+            logger=logger,
+            run_id=run_id,
+            unit=unit,
+            sampler=sampler,
+            always_log_slower_than=always_log_slower_than,
+            registry=registry,
+            cpu_time=cpu_time,
         )
+    )
 
 
 F = TypeVar("F", bound=Callable[..., object])
 
 
-def _convert_duration(elapsed_ms: float, unit: str) -> tuple[float, str]:
-    normalized = unit.lower()
-    if normalized in {"ms", "millisecond", "milliseconds"}:
-        return elapsed_ms, "ms"
-    if normalized in {"s", "sec", "second", "seconds"}:
-        return elapsed_ms / 1000, "s"
-    if normalized in {"m", "min", "minute", "minutes"}:
-        return elapsed_ms / 60000, "m"
-    raise ValueError(f"Unsupported duration unit: {unit}")
-
-
 def log_duration(
     func: Optional[F] = None,
     *,
@@ -138,34 +368,130 @@ def log_duration(
     run_id: Optional[str] = None,
     logger: Optional[logging.Logger] = None,
     unit: str = "ms",
+    sampler: Optional[Sampler] = None,
+    always_log_slower_than: Optional[float] = None,
+    registry: Optional["MetricsRegistry"] = None,
+    profile_slower_than: Optional[float] = None,
+    profiler: Optional[SlowCallProfiler] = None,
+    cpu_time: bool = False,
 ) -> Callable[[F], F] | F:
-    """Decorator for logging function runtime to the overview feed."""
+    """Decorator for logging function runtime to the overview feed.
+
+    The logger, run_id and unit are resolved when the function is decorated,
+    and calls made while the logger has INFO disabled are not timed at all.
+    Coroutine functions are timed until the awaited result is ready, and async
+    generators from the first iteration until they are exhausted or closed.
+    Each timed call is a span, as in ``log_timing``. ``sampler``,
+    ``always_log_slower_than``, ``registry`` and ``cpu_time`` behave as in
+    ``log_timing``.
+
+    With ``profile_slower_than`` (in ``unit``) calls of a plain function are
+    sampled by ``profiler`` (default: ``default_profiler()``, at most 6 per
+    minute) and the profile of a call that ends slower than that is stored as
+    an artifact; its event carries ``profile_path``/``profile_hash`` and is
+    always logged.
+    """
 
     def decorator(target: F) -> F:
-        resolved_name = name or target.__qualname__
+        if profile_slower_than is not None and (
+            inspect.iscoroutinefunction(target) or inspect.isasyncgenfunction(target)
+        ):
+            raise ValueError("profile_slower_than supports plain functions only")
+        recorder = _DurationRecorder(
+            name or target.__qualname__,
+            logger=logger,
+            run_id=run_id,
+            unit=unit,
+            sampler=sampler,
+            always_log_slower_than=always_log_slower_than,
+            registry=registry,
+            profile_slower_than=profile_slower_than,
+            profiler=profiler,
+            cpu_time=cpu_time,
+        )
+        enabled = recorder.enabled
+        open_span = recorder.open_span
+        record = recorder.record
+        clock = recorder.clock
+        set_span = _CURRENT_SPAN.set
+        reset_span = _CURRENT_SPAN.reset
+
+        if inspect.iscoroutinefunction(target):
+
+            async def wrapper(*args: object, **kwargs: object) -> object:
+                if not enabled():
+                    return await target(*args, **kwargs)
+                span = open_span()
+                token = set_span(span) if span is not None else None
+                start = clock()
+                try:
+                    return await target(*args, **kwargs)
+                finally:
+                    record(start, span)
+                    if token is not None:
+                        reset_span(token)
+
+        elif inspect.isasyncgenfunction(target):
+
+            async def wrapper(*args: object, **kwargs: object) -> AsyncGenerator[object, None]:
+                if not enabled():
+                    async for item in target(*args, **kwargs):
+                        yield item
+                    return
+                span = open_span()
+                start = clock()
+                generator = target(*args, **kwargs)
+                try:
+                    while True:
+                        # Each step may run in a different task's context, so
+                        # the span is made current per step rather than once.
+                        token = set_span(span) if span is not None else None
+                        try:
+                            item = await generator.__anext__()
+                        except StopAsyncIteration:
+                            break
+                        finally:
+                            if token is not None:
+                                reset_span(token)
+                        yield item
+                finally:
+                    await generator.aclose()
+                    record(start, span)
+
+        elif recorder.profiler is not None:
+            start_profile = recorder.start_profile
+            get_frame = sys._getframe
+
+            def wrapper(*args: object, **kwargs: object) -> object:
+                if not enabled():
+                    return target(*args, **kwargs)
+                span = open_span()
+                token = set_span(span) if span is not None else None
+                capture = start_profile(get_frame())
+                start = clock()
+                try:
+                    return target(*args, **kwargs)
+                finally:
+                    record(start, span, None, capture)
+                    if token is not None:
+                        reset_span(token)
+
+        else:
+
+            def wrapper(*args: object, **kwargs: object) -> object:
+                if not enabled():
+                    return target(*args, **kwargs)
+                span = open_span()
+                token = set_span(span) if span is not None else None
+                start = clock()
+                try:
+                    return target(*args, **kwargs)
+                finally:
+                    record(start, span)
+                    if token is not None:
+                        reset_span(token)
 
-        def wrapper(*args: object, **kwargs: object) -> object:
-            resolved_logger = _resolve_logger(logger)
-            resolved_run_id = _resolve_run_id(resolved_logger, run_id)
-            start = time.perf_counter()
-            try:
-                return target(*args, **kwargs)
-            finally:
-                elapsed_ms = (time.perf_counter() - start) * 1000
-                elapsed, resolved_unit = _convert_duration(elapsed_ms, unit)
-                _emit_duration(
-                    logger=resolved_logger,
-                    name=resolved_name,
-                    elapsed=elapsed,
-                    run_id=resolved_run_id,
-                    unit=resolved_unit,
-                )
-
-        wrapper = cast(F, wrapper)
-        wrapper.__name__ = getattr(target, "__name__", resolved_name)
-        wrapper.__doc__ = target.__doc__
-        wrapper.__qualname__ = getattr(target, "__qualname__", resolved_name)
-        return wrapper
+        return cast(F, functools.wraps(target)(wrapper))
 
     if func is not None:
         return decorator(func)
@@ -173,7 +499,13 @@ def log_duration(
     return decorator
 
 
-
+def _count_items(result: object) -> int:
+    if result is None:
+        return 0
+    try:
+        return len(result)  # type: ignore[arg-type]
+    except TypeError:
+        return 1
 
 
 def log_return_count(
@@ -182,36 +514,63 @@ def log_return_count(
     name: Optional[str] = None,
     run_id: Optional[str] = None,
     logger: Optional[logging.Logger] = None,
+    registry: Optional["MetricsRegistry"] = None,
 ) -> Callable[[F], F] | F:
-    """Decorator for logging how many items a function returns."""
+    """Decorator for logging how many items a function returns.
+
+    For coroutine functions the awaited result is counted; for async
+    generators, the number of items yielded once the generator is exhausted.
+    With a ``registry`` counts are aggregated in memory and reported in
+    periodic ``return_count_summary`` events.
+    """
 
     def decorator(target: F) -> F:
         resolved_name = name or target.__qualname__
+        resolved_logger = _resolve_logger(logger)
+        static_run_id = _static_run_id(resolved_logger, run_id)
+        is_enabled_for = resolved_logger.isEnabledFor
 
-        def wrapper(*args: object, **kwargs: object) -> object:
-            resolved_logger = _resolve_logger(logger)
-            resolved_run_id = _resolve_run_id(resolved_logger, run_id)
-            result = target(*args, **kwargs)
-            if result is None:
-                count = 0
-            else:
-                try:
-                    count = len(result)  # type: ignore[arg-type]
-                except TypeError:
-                    count = 1
+        def enabled() -> bool:
+            return registry is not None or is_enabled_for(logging.INFO)
+
+        def record(count: int) -> None:
+            if registry is not None:
+                registry.record_return_count(resolved_name, count)
+                return
             _emit_return_count(
                 logger=resolved_logger,
                 name=resolved_name,
                 count=count,
-                run_id=resolved_run_id,
+                run_id=static_run_id or str(uuid.uuid4()),
             )
-            return result
 
-        wrapper = cast(F, wrapper)
-        wrapper.__name__ = getattr(target, "__name__", resolved_name)
-        wrapper.__doc__ = target.__doc__
-        wrapper.__qualname__ = getattr(target, "__qualname__", resolved_name)
-        return wrapper
+        if inspect.iscoroutinefunction(target):
+
+            async def wrapper(*args: object, **kwargs: object) -> object:
+                result = await target(*args, **kwargs)
+                if enabled():
+                    record(_count_items(result))
+                return result
+
+        elif inspect.isasyncgenfunction(target):
+
+            async def wrapper(*args: object, **kwargs: object) -> AsyncGenerator[object, None]:
+                count = 0
+                async for item in target(*args, **kwargs):
+                    count += 1
+                    yield item
+                if enabled():
+                    record(count)
+
+        else:
+
+            def wrapper(*args: object, **kwargs: object) -> object:
+                result = target(*args, **kwargs)
+                if enabled():
+                    record(_count_items(result))
+                return result
+
+        return cast(F, functools.wraps(target)(wrapper))
 
     if func is not None:
         return decorator(func)
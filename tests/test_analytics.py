@@ -0,0 +1,47 @@
+import math
+
+from org_logging.analytics import duration_stats
+from org_logging.sketch import DDSketch
+
+
+def _durations(*values: float) -> list[dict]:
+    return [
+        {"event": "duration", "duration_name": "step", "elapsed": value, "unit": "ms"}
+        for value in values
+    ]
+
+
+def test_infinite_durations_rank_at_the_extremes():
+    stats = duration_stats(_durations(1.0, 2.0, 3.0, math.inf))["step"]
+    assert stats.count == 4
+    assert stats.min == 1.0
+    assert stats.max == math.inf
+    assert stats.avg == math.inf
+    assert duration_stats(_durations(1.0, math.inf, math.inf))["step"].p50 == math.inf
+
+    stats = duration_stats(_durations(-math.inf, 1.0, 2.0))["step"]
+    assert stats.min == -math.inf
+    assert stats.max == 2.0
+
+
+def test_nan_durations_do_not_land_in_the_zero_bucket():
+    stats = duration_stats(_durations(1.0, math.nan, 3.0))["step"]
+    assert stats.count == 3
+    assert (stats.min, stats.max) == (1.0, 3.0)
+    assert math.isnan(stats.avg)
+    assert stats.p50 > 0
+
+    stats = duration_stats(_durations(math.nan))["step"]
+    assert math.isnan(stats.min) and math.isnan(stats.max)
+    assert math.isnan(stats.p50)
+
+
+def test_sketch_round_trips_infinity_counts():
+    sketch = DDSketch()
+    for value in (-math.inf, 1.0, math.inf, math.inf, math.nan):
+        sketch.add(value)
+    restored = DDSketch.from_dict(sketch.to_dict())
+    assert restored.count == 4
+    assert restored.quantile(0) == -math.inf
+    assert restored.quantile(1) == math.inf
+    assert restored.histogram()[-1] == (math.inf, math.inf, 2)
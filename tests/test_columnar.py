@@ -0,0 +1,35 @@
+import json
+import math
+
+import pytest
+
+from org_logging.analytics import duration_stats, load_detail_entries
+
+np = pytest.importorskip("numpy")
+
+from org_logging.columnar import columnar_duration_stats  # noqa: E402
+
+
+def test_weighted_stats_match_duration_stats(tmp_path):
+    path = tmp_path / "detail.jsonl"
+    rng = np.random.default_rng(7)
+    values = rng.exponential(20.0, 2000)
+    weights = rng.integers(1, 50, 2000)
+    with path.open("w", encoding="utf-8") as handle:
+        for value, weight in zip(values.tolist(), weights.tolist()):
+            entry = {"event": "duration", "duration_name": "step", "elapsed": value, "unit": "ms"}
+            if weight > 1:
+                entry["sample_weight"] = weight
+            handle.write(json.dumps(entry) + "\n")
+
+    columnar = columnar_duration_stats(path)["step"]
+    baseline = duration_stats(load_detail_entries(path))["step"]
+    assert columnar.count == baseline.count == 2000
+    assert columnar.estimated_count == baseline.estimated_count
+    assert math.isclose(columnar.avg, baseline.avg)
+    assert math.isclose(columnar.stddev, baseline.stddev)
+
+    expanded = np.repeat(values, weights)
+    for q, value in ((0.5, columnar.p50), (0.95, columnar.p95), (0.99, columnar.p99)):
+        assert math.isclose(value, np.quantile(expanded, q))
+        assert math.isclose(value, baseline.aggregate.sketch.quantile(q), rel_tol=0.03)
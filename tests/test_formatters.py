@@ -0,0 +1,51 @@
+import datetime
+import enum
+import json
+import math
+import uuid
+from dataclasses import dataclass
+
+import pytest
+
+from org_logging.formatters import resolve_json_backend
+
+
+class Color(enum.Enum):
+    RED = "red"
+
+
+class Level(enum.IntEnum):
+    HIGH = 3
+
+
+@dataclass
+class Point:
+    x: int
+    y: int
+
+
+_VALUES = {
+    "datetime": datetime.datetime(2024, 5, 1, 12, 30, 15, 250000),
+    "date": datetime.date(2024, 5, 1),
+    "set": {3},
+    "bytes": b"raw",
+    "dataclass": Point(1, 2),
+    "enum": Color.RED,
+    "int_enum": Level.HIGH,
+    "uuid": uuid.UUID(int=1),
+    "big_int": 2**80,
+    "infinity": math.inf,
+    "nested": {"when": [datetime.time(1, 2, 3)], "ok": [1, "two", None, True, 2.5]},
+}
+
+
+@pytest.mark.parametrize("backend", ["orjson", "msgspec"])
+@pytest.mark.parametrize("key", sorted(_VALUES))
+def test_fast_backends_match_stdlib(backend, key):
+    try:
+        _, dumps = resolve_json_backend(backend)
+    except ImportError:
+        pytest.skip(f"{backend} is not installed")
+    _, stdlib_dumps = resolve_json_backend("json")
+    payload = {"message": "value", key: _VALUES[key]}
+    assert json.loads(dumps(payload)) == json.loads(stdlib_dumps(payload))
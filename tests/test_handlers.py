@@ -0,0 +1,70 @@
+import logging
+
+from org_logging.handlers import BatchingQueueHandler
+from org_logging.rotation import CompressingRotatingFileHandler, log_segments
+
+
+def _write_records(handler: logging.Handler, count: int) -> None:
+    logger = logging.getLogger(f"test.handlers.{id(handler)}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+    try:
+        for index in range(count):
+            logger.info("record %d %s", index, "x" * 40)
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+
+
+def _lines(path) -> list[str]:
+    lines: list[str] = []
+    for segment in log_segments(path):
+        with segment.open("r", encoding="utf-8") as handle:
+            lines.extend(handle.read().splitlines())
+    return lines
+
+
+def test_async_mode_rotates_like_sync_mode(tmp_path):
+    sync_path = tmp_path / "sync" / "detail.log"
+    async_path = tmp_path / "async" / "detail.log"
+    sync_path.parent.mkdir()
+    async_path.parent.mkdir()
+
+    _write_records(
+        CompressingRotatingFileHandler(sync_path, max_bytes=2000, compression=None), 500
+    )
+    _write_records(
+        BatchingQueueHandler(
+            [CompressingRotatingFileHandler(async_path, max_bytes=2000, compression=None)]
+        ),
+        500,
+    )
+
+    sync_segments = log_segments(sync_path)
+    async_segments = log_segments(async_path)
+    assert len(sync_segments) > 10
+    assert len(async_segments) == len(sync_segments)
+    assert all(segment.stat().st_size < 2100 for segment in async_segments)
+    assert _lines(async_path) == _lines(sync_path)
+
+
+def test_rollover_does_not_reuse_a_compressed_segment_name(tmp_path, monkeypatch):
+    from org_logging import rotation
+
+    monkeypatch.setattr(rotation.time, "time", lambda: 1000.5)
+    path = tmp_path / "detail.log"
+    taken = rotation._segment_path(path, 1000.5)
+    compressed = taken.with_name(taken.name + rotation.COMPRESSION_SUFFIXES["zstd"])
+    compressed.write_bytes(b"older segment")
+
+    handler = CompressingRotatingFileHandler(path, max_bytes=1 << 20, compression=None)
+    handler.stream.write("record\n")
+    handler.doRollover()
+    handler.close()
+
+    assert compressed.read_bytes() == b"older segment"
+    assert not taken.exists()
+    older, newer = sorted(rotation.rotated_segments(path), key=lambda segment: segment.name)
+    assert older == compressed
+    assert newer.read_text() == "record\n"
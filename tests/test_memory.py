@@ -0,0 +1,52 @@
+import logging
+import threading
+
+from org_logging.memory import log_memory
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.records: list[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+
+def _logger(name: str) -> tuple[logging.Logger, _ListHandler]:
+    handler = _ListHandler()
+    logger = logging.getLogger(f"test.memory.{name}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.handlers = [handler]
+    return logger, handler
+
+
+def test_one_memory_logger_can_be_nested():
+    logger, handler = _logger("nested")
+    memory = log_memory(name="load", logger=logger, trace=True)
+    with memory as outer:
+        with memory as inner:
+            assert inner is not outer
+    assert len(handler.records) == 2
+    assert all("traced_peak" in record.__dict__ for record in handler.records)
+
+
+def test_one_memory_logger_is_shared_across_threads():
+    logger, handler = _logger("threads")
+    memory = log_memory(name="load", logger=logger)
+    barrier = threading.Barrier(4)
+
+    def work() -> None:
+        barrier.wait()
+        for _ in range(25):
+            with memory:
+                pass
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(handler.records) == 100
+    assert len({id(record) for record in handler.records}) == 100
@@ -0,0 +1,69 @@
+import json
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+_REPO_ROOT = Path(__file__).resolve().parents[1]
+
+_SCRIPT = textwrap.dedent(
+    """
+    import logging
+    import multiprocessing
+    import sys
+
+    from org_logging import configure_logging
+
+    TASKS = 8
+    RECORDS = 200
+
+
+    def init_worker():
+        configure_logging(app_name="test", log_dir=sys.argv[2], multiprocess=True)
+
+
+    def work(task):
+        logger = logging.getLogger("test.worker")
+        for index in range(RECORDS):
+            logger.debug("worker record", extra={"task": task, "index": index})
+        return task
+
+
+    if __name__ == "__main__":
+        method, log_dir = sys.argv[1], sys.argv[2]
+        configure_logging(app_name="test", log_dir=log_dir, multiprocess=True)
+        context = multiprocessing.get_context(method)
+        initializer = init_worker if method == "spawn" else None
+        pool = context.Pool(4, initializer=initializer)
+        pool.map(work, range(TASKS))
+        pool.close()
+        pool.join()
+        logging.shutdown()
+    """
+)
+
+
+@pytest.mark.parametrize("method", ["fork", "spawn"])
+def test_workers_deliver_every_record(tmp_path, method):
+    if method not in __import__("multiprocessing").get_all_start_methods():
+        pytest.skip(f"{method} is not available on this platform")
+    script = tmp_path / "run_pool.py"
+    script.write_text(_SCRIPT, encoding="utf-8")
+    log_dir = tmp_path / "logs"
+    subprocess.run(
+        [sys.executable, str(script), method, str(log_dir)],
+        check=True,
+        cwd=_REPO_ROOT,
+        env={"PYTHONPATH": str(_REPO_ROOT), "PATH": ""},
+        timeout=120,
+    )
+
+    delivered = set()
+    with (log_dir / "detail.jsonl").open(encoding="utf-8") as handle:
+        for line in handle:
+            entry = json.loads(line)
+            if entry.get("message") == "worker record":
+                delivered.add((entry["task"], entry["index"]))
+    assert len(delivered) == 8 * 200
@@ -0,0 +1,26 @@
+import hashlib
+import json
+
+from org_logging.artifacts import ArtifactStore
+from org_logging.objects import log_object
+
+
+def test_oversized_objects_are_streamed_as_plain_json(tmp_path):
+    store = ArtifactStore(tmp_path / "artifacts")
+    rows = [{"id": index, "tags": ["a", None, True], "score": index / 3} for index in range(5000)]
+    payloads = []
+    for obj in (rows, {str(index): row for index, row in enumerate(rows)}):
+        payload = log_object(payloads.append, "rows", obj, artifact_store=store, inline_limit=64)
+        expected = json.dumps(obj).encode("utf-8")
+        assert payload["type"] == "artifact_json"
+        assert payload["meta"]["bytes"] == len(expected)
+        assert payload["meta"]["hash"] == hashlib.sha256(expected).hexdigest()
+        with open(payload["artifact_path"], "rb") as handle:
+            assert handle.read() == expected
+
+
+def test_small_objects_stay_inline(tmp_path):
+    store = ArtifactStore(tmp_path / "artifacts")
+    payload = log_object(lambda _: None, "small", {"a": [1, 2]}, artifact_store=store)
+    assert payload["type"] == "inline_json"
+    assert payload["meta"]["value"] == {"a": [1, 2]}
@@ -1,12 +1,37 @@
 from __future__ import annotations
 
 import json
+import math
 import os
-from dataclasses import dataclass
+import queue
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, fields
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
-from flask import Flask, jsonify, render_template, request
+from flask import Flask, Response, jsonify, render_template, request
+
+_REPO_ROOT = str(Path(__file__).resolve().parents[1])
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+from org_logging.artifact_readers import describe_artifact, load_array, load_arrow  # noqa: E402
+from org_logging.artifacts import INDEX_FILENAME, ArtifactIndex  # noqa: E402
+from org_logging.analytics import (  # noqa: E402
+    DurationStats,
+    duration_stats,
+    iter_detail_entries,
+)
+from org_logging.detail_index import DetailIndex, SegmentIndex  # noqa: E402
+from org_logging.incremental import _last_line_end  # noqa: E402
+from org_logging.profiling import profile_summary  # noqa: E402
+from org_logging.query_index import QueryIndex  # noqa: E402
+from org_logging.rotation import is_compressed, open_segment, rotated_segments  # noqa: E402
 
 
 @dataclass
@@ -14,7 +39,11 @@ class LogConfig:
     overview_path: Path
     detail_path: Path | None
     artifact_path: Path | None
+    artifact_root: Path | None
     max_entries: int
+    max_bytes: int
+    follow_interval: float
+    index_update_interval: float
 
 
 def _default_log_dir() -> Path:
@@ -35,13 +64,21 @@ def load_config() -> LogConfig:
         overview_path = log_dir / overview_filename
     detail_path_value = os.getenv("DETAIL_LOG_PATH")
     artifact_path_value = os.getenv("ARTIFACT_METADATA_PATH")
+    artifact_root_value = os.getenv("ARTIFACT_ROOT")
     max_entries = int(os.getenv("LOG_MAX_ENTRIES", "200"))
+    max_bytes = int(os.getenv("LOG_MAX_BYTES", str(1024 * 1024)))
+    follow_interval = float(os.getenv("LOG_FOLLOW_INTERVAL", "0.5"))
+    index_update_interval = float(os.getenv("LOG_INDEX_UPDATE_INTERVAL", "5"))
 
     return LogConfig(
         overview_path=overview_path,
         detail_path=Path(detail_path_value).expanduser() if detail_path_value else None,
         artifact_path=Path(artifact_path_value).expanduser() if artifact_path_value else None,
+        artifact_root=Path(artifact_root_value).expanduser() if artifact_root_value else None,
         max_entries=max_entries,
+        max_bytes=max_bytes,
+        follow_interval=follow_interval,
+        index_update_interval=index_update_interval,
     )
 
 
@@ -59,7 +96,76 @@ def index() -> str:
     )
 
 
-def _read_overview_from_offset(path: Path, offset: int, max_entries: int) -> dict[str, Any]:
+def _read_tail_lines(
+    path: Path,
+    max_entries: int,
+    block_size: int = 65536,
+    end: int | None = None,
+) -> tuple[list[str], int]:
+    """Return the last ``max_entries`` lines before ``end`` (default EOF) and that offset.
+
+    Only as many blocks as are needed to cover ``max_entries`` newlines are read,
+    so the cost depends on N rather than on the file size.
+    """
+    with path.open("rb") as handle:
+        handle.seek(0, os.SEEK_END)
+        size = handle.tell() if end is None else min(end, handle.tell())
+        position = size
+        blocks: list[bytes] = []
+        newlines = 0
+        # One extra newline is needed to know where the oldest wanted line starts.
+        while position > 0 and (not max_entries or newlines <= max_entries):
+            read_from = max(0, position - block_size)
+            handle.seek(read_from)
+            block = handle.read(position - read_from)
+            blocks.append(block)
+            newlines += block.count(b"\n")
+            position = read_from
+
+    data = b"".join(reversed(blocks))
+    if position > 0:
+        # Drop the partial line that straddles the first block boundary.
+        data = data[data.find(b"\n") + 1 :]
+    lines = data.decode("utf-8", errors="replace").splitlines()
+    if max_entries and len(lines) > max_entries:
+        lines = lines[-max_entries:]
+    return lines, size
+
+
+def _read_segment_tail(
+    path: Path, max_entries: int, end: int | None = None
+) -> tuple[list[str], int]:
+    """Like ``_read_tail_lines`` on the live file, topped up from rotated segments.
+
+    The returned offset always refers to the live file. Compressed segments are
+    streamed keeping only the newest lines needed.
+    """
+    lines, size = _read_tail_lines(path, max_entries, end=end) if path.exists() else ([], 0)
+    if not max_entries:
+        return lines, size
+    for segment in reversed(rotated_segments(path)):
+        needed = max_entries - len(lines)
+        if needed <= 0:
+            break
+        try:
+            if is_compressed(segment):
+                with open_segment(segment) as handle:
+                    older = [line.rstrip("\r\n") for line in deque(handle, maxlen=needed)]
+            else:
+                older, _ = _read_tail_lines(segment, needed)
+        except FileNotFoundError:
+            continue  # compressed or pruned while listing
+        lines = older + lines
+    return lines, size
+
+
+def _has_log(path: Path) -> bool:
+    return path.exists() or bool(rotated_segments(path))
+
+
+def _read_overview_from_offset(
+    path: Path, offset: int, max_entries: int, max_bytes: int
+) -> dict[str, Any]:
     if not path.exists():
         return {"lines": [], "offset": 0, "error": f"Overview log not found: {path}"}
 
@@ -67,11 +173,17 @@ def _read_overview_from_offset(path: Path, offset: int, max_entries: int) -> dic
     if offset < 0 or offset > size:
         offset = 0
 
-    with path.open("r", encoding="utf-8", errors="replace") as handle:
+    if max_bytes and size - offset > max_bytes:
+        # The client is too far behind; only the newest lines would be kept
+        # anyway, so jump to the tail instead of reading the whole gap.
+        return _read_overview_tail(path, max_entries)
+
+    with path.open("rb") as handle:
         handle.seek(offset)
-        lines = handle.read().splitlines()
+        data = handle.read(size - offset)
         new_offset = handle.tell()
 
+    lines = data.decode("utf-8", errors="replace").splitlines()
     if max_entries and len(lines) > max_entries:
         lines = lines[-max_entries:]
 
@@ -79,16 +191,10 @@ def _read_overview_from_offset(path: Path, offset: int, max_entries: int) -> dic
 
 
 def _read_overview_tail(path: Path, max_entries: int) -> dict[str, Any]:
-    if not path.exists():
+    if not _has_log(path):
         return {"lines": [], "offset": 0, "error": f"Overview log not found: {path}"}
 
-    with path.open("r", encoding="utf-8", errors="replace") as handle:
-        lines = handle.read().splitlines()
-        offset = handle.tell()
-
-    if max_entries and len(lines) > max_entries:
-        lines = lines[-max_entries:]
-
+    lines, offset = _read_segment_tail(path, max_entries)
     return {"lines": lines, "offset": offset, "error": None}
 
 
@@ -104,37 +210,326 @@ def overview() -> Any:
     if offset is None:
         payload = _read_overview_tail(config.overview_path, config.max_entries)
     else:
-        payload = _read_overview_from_offset(config.overview_path, offset, config.max_entries)
+        payload = _read_overview_from_offset(
+            config.overview_path, offset, config.max_entries, config.max_bytes
+        )
 
     return jsonify(payload)
 
 
-def _read_jsonl(path: Path, max_entries: int, entry_id: str | None) -> list[dict[str, Any]]:
-    if not path.exists():
-        return []
+class LogFollower:
+    """Single background tail of one log file, shared by every stream client.
+
+    One thread per path polls the file every ``interval`` seconds and fans new
+    complete lines out to subscriber queues. Rotation (new inode) and
+    truncation restart reading from the beginning of the current file. The
+    thread exits once the last subscriber leaves.
+    """
+
+    def __init__(self, path: Path, interval: float, max_bytes: int) -> None:
+        self.path = path
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self._subscribers: set[queue.Queue] = set()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._identity: tuple[int, int] | None = None
+        self._offset = 0
+
+    def subscribe(self, max_entries: int, backlog: int = 1000) -> tuple[queue.Queue, list[str]]:
+        """Register a client; returns its queue and the current tail snapshot."""
+        subscriber: queue.Queue = queue.Queue(maxsize=backlog)
+        with self._lock:
+            self._poll_locked()
+            lines: list[str] = []
+            if self._identity is not None:
+                lines, _ = _read_segment_tail(self.path, max_entries, end=self._offset)
+            self._subscribers.add(subscriber)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name=f"follow:{self.path.name}", daemon=True
+                )
+                self._thread.start()
+        return subscriber, lines
+
+    def unsubscribe(self, subscriber: queue.Queue) -> None:
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def is_subscribed(self, subscriber: queue.Queue) -> bool:
+        with self._lock:
+            return subscriber in self._subscribers
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._subscribers:
+                    self._thread = None
+                    return
+                self._poll_locked()
+
+    def _poll_locked(self) -> None:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return
+        identity = (stat.st_dev, stat.st_ino)
+        if self._identity is None and not self._subscribers:
+            # First client: start following from the current end of the file.
+            self._identity = identity
+            self._offset = _last_line_end(self.path, 0, stat.st_size)
+            return
+        if identity != self._identity or stat.st_size < self._offset:
+            self._identity = identity
+            self._offset = 0
+        if stat.st_size <= self._offset:
+            return
+
+        start = self._offset
+        if self.max_bytes and stat.st_size - start > self.max_bytes:
+            start = stat.st_size - self.max_bytes
+        with self.path.open("rb") as handle:
+            handle.seek(start)
+            data = handle.read(stat.st_size - start)
+        if start != self._offset:
+            data = data[data.find(b"\n") + 1 :]
+            start = stat.st_size - len(data)
+        cut = data.rfind(b"\n") + 1
+        if cut == 0:
+            return
+        self._offset = start + cut
+        lines = data[:cut].decode("utf-8", errors="replace").splitlines()
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber.put_nowait(lines)
+            except queue.Full:
+                # Too slow to keep up; drop it so the client reconnects and
+                # resynchronizes from a fresh snapshot.
+                self._subscribers.discard(subscriber)
+
+
+_FOLLOWERS: dict[Path, LogFollower] = {}
+_FOLLOWERS_LOCK = threading.Lock()
+
+
+def _follower(path: Path, interval: float, max_bytes: int) -> LogFollower:
+    resolved = path.resolve()
+    with _FOLLOWERS_LOCK:
+        follower = _FOLLOWERS.get(resolved)
+        if follower is None:
+            follower = _FOLLOWERS[resolved] = LogFollower(resolved, interval, max_bytes)
+        return follower
+
+
+def _sse(event: str, payload: dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+@app.route("/api/overview/stream")
+def overview_stream() -> Response:
+    config = load_config()
+    follower = _follower(config.overview_path, config.follow_interval, config.max_bytes)
+    heartbeat = 15.0
 
-    with path.open("r", encoding="utf-8", errors="replace") as handle:
-        lines = handle.read().splitlines()
+    def generate() -> Any:
+        subscriber, lines = follower.subscribe(config.max_entries)
+        try:
+            error = None
+            if not _has_log(config.overview_path):
+                error = f"Overview log not found: {config.overview_path}"
+            yield _sse("snapshot", {"lines": lines, "error": error})
+            while True:
+                try:
+                    batch = subscriber.get(timeout=heartbeat)
+                except queue.Empty:
+                    if not follower.is_subscribed(subscriber):
+                        return
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _sse("lines", {"lines": batch, "error": None})
+        finally:
+            follower.unsubscribe(subscriber)
+
+    return Response(
+        generate(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+_DETAIL_INDEXES: dict[Path, DetailIndex] = {}
+
+
+def _detail_index(path: Path) -> DetailIndex:
+    resolved = path.resolve()
+    index = _DETAIL_INDEXES.get(resolved)
+    if index is None:
+        index = _DETAIL_INDEXES[resolved] = DetailIndex(resolved, keys=("id",))
+    return index
+
+
+_QUERY_INDEXES: dict[Path, QueryIndex] = {}
+_FILTER_KEYS = ("event", "run_id", "logger", "level", "since", "until")
+
+
+def _query_index(path: Path) -> QueryIndex | None:
+    """The SQLite index of ``path`` (``python -m org_logging.ingest``), if built."""
+    resolved = path.resolve()
+    index = _QUERY_INDEXES.get(resolved)
+    if index is None:
+        index = QueryIndex(resolved)
+        if not index.db_path.exists():
+            return None
+        _QUERY_INDEXES[resolved] = index
+    return index
+
+
+def _request_filters() -> dict[str, str]:
+    return {key: request.args[key] for key in _FILTER_KEYS if request.args.get(key)}
+
+
+def _matches(entry: Any, filters: dict[str, str]) -> bool:
+    """Python version of the index's filters, for logs without an index."""
+    if not isinstance(entry, dict):
+        return False
+    for key in ("event", "run_id", "logger"):
+        if key in filters and entry.get(key) != filters[key]:
+            return False
+    if "level" in filters and entry.get("level") != filters["level"].upper():
+        return False
+    timestamp = entry.get("timestamp")
+    if "since" in filters and not (isinstance(timestamp, str) and timestamp >= filters["since"]):
+        return False
+    if "until" in filters and not (isinstance(timestamp, str) and timestamp < filters["until"]):
+        return False
+    return True
+
+
+_INDEX_UPDATES: dict[Path, float] = {}
+_INDEX_UPDATE_LOCKS: dict[Path, threading.Lock] = {}
+
+
+def _indexed(path: Path, min_interval: float) -> QueryIndex | None:
+    """The query index of ``path``, or None to fall back to scanning.
+
+    The index is brought up to date at most once every ``min_interval``
+    seconds per path, and by one request at a time: others read what is
+    already ingested rather than wait for the write lock.
+    """
+    index = _query_index(path) if _has_log(path) else None
+    if index is None:
+        return None
+    resolved = path.resolve()
+    if time.monotonic() - _INDEX_UPDATES.get(resolved, -math.inf) < min_interval:
+        return index
+    lock = _INDEX_UPDATE_LOCKS.setdefault(resolved, threading.Lock())
+    if not lock.acquire(blocking=False):
+        return index
+    try:
+        index.update()
+    except (OSError, sqlite3.Error):
+        return None
+    finally:
+        _INDEX_UPDATES[resolved] = time.monotonic()
+        lock.release()
+    return index
 
-    if max_entries and len(lines) > max_entries:
-        lines = lines[-max_entries:]
 
+def _filtered_entries(
+    path: Path, max_entries: int, filters: dict[str, str], index_update_interval: float
+) -> tuple[list[dict[str, Any]], str]:
+    """Newest ``max_entries`` matching entries and where they came from.
+
+    Without an index only the tail read for the unfiltered view is searched.
+    """
+    index = _indexed(path, index_update_interval)
+    if index is not None:
+        try:
+            return index.entries(limit=max_entries, **filters), "index"
+        except sqlite3.Error:
+            pass
+    if not _has_log(path):
+        return [], "tail"
+    lines, _ = _read_segment_tail(path, max_entries)
+    return [entry for entry in _parse_jsonl_lines(lines) if _matches(entry, filters)], "tail"
+
+
+_SEGMENT_INDEXES: dict[Path, SegmentIndex] = {}
+
+
+def _segment_index(path: Path) -> SegmentIndex:
+    resolved = path.resolve()
+    index = _SEGMENT_INDEXES.get(resolved)
+    if index is None:
+        index = _SEGMENT_INDEXES[resolved] = SegmentIndex(resolved)
+    return index
+
+
+def _parse_jsonl_lines(lines: list[str]) -> list[dict[str, Any]]:
     entries: list[dict[str, Any]] = []
     for line in lines:
         try:
-            item = json.loads(line)
+            entries.append(json.loads(line))
         except json.JSONDecodeError:
-            item = {"raw": line}
+            entries.append({"raw": line})
+    return entries
 
-        if entry_id:
-            if isinstance(item, dict) and str(item.get("id")) == entry_id:
-                entries.append(item)
-            else:
-                continue
-        else:
-            entries.append(item)
 
-    return entries
+def _scan_segments_for_id(
+    path: Path, entry_id: str, limit: int | None
+) -> list[dict[str, Any]]:
+    """Newest ``limit`` (all if None) entries with ``id == entry_id`` from rotated segments."""
+    found: list[dict[str, Any]] = []
+    needle = entry_id.encode("utf-8")
+    for segment in reversed(rotated_segments(path)):
+        matches: list[dict[str, Any]] = []
+        try:
+            with open_segment(segment, "rb") as handle:
+                for line in handle:
+                    if needle not in line:
+                        continue
+                    item = _parse_jsonl_lines([line.decode("utf-8", errors="replace").strip()])[0]
+                    if isinstance(item, dict) and str(item.get("id")) == entry_id:
+                        matches.append(item)
+        except FileNotFoundError:
+            continue
+        found = matches + found
+        if limit and len(found) >= limit:
+            return found[-limit:]
+    return found
+
+
+def _read_jsonl(path: Path, max_entries: int, entry_id: str | None) -> list[dict[str, Any]]:
+    if not _has_log(path):
+        return []
+
+    if entry_id:
+        entries: list[dict[str, Any]] = []
+        if path.exists():
+            try:
+                entries = _detail_index(path).lookup("id", entry_id, limit=max_entries)
+            except OSError:
+                # Sidecar index not writable here; fall back to scanning the tail.
+                lines, _ = _read_tail_lines(path, max_entries)
+                entries = [
+                    item
+                    for item in _parse_jsonl_lines(lines)
+                    if isinstance(item, dict) and str(item.get("id")) == entry_id
+                ]
+        if not max_entries or len(entries) < max_entries:
+            # Older matches live in rotated segments, which have their own
+            # index of the ids each one holds; only those segments are read.
+            remaining = max_entries - len(entries) if max_entries else None
+            try:
+                older = _segment_index(path).lookup("id", entry_id, limit=remaining)
+            except OSError:
+                older = _scan_segments_for_id(path, entry_id, remaining)
+            entries = older + entries
+        return entries
+
+    lines, _ = _read_segment_tail(path, max_entries)
+    return _parse_jsonl_lines(lines)
 
 
 def _read_json(path: Path) -> dict[str, Any] | None:
@@ -147,6 +542,77 @@ def _read_json(path: Path) -> dict[str, Any] | None:
         return {"raw": path.read_text(encoding="utf-8", errors="replace")}
 
 
+_ARTIFACT_INDEXES: dict[Path, ArtifactIndex] = {}
+_ARTIFACT_HASH = re.compile(r"[0-9a-f]{8,64}")
+_BLOB_FILENAME = re.compile(r"([0-9a-f]{64})[^/]*")
+
+
+def _artifact_index(root: Path | None) -> ArtifactIndex | None:
+    if root is None:
+        return None
+    path = (root / INDEX_FILENAME).resolve()
+    index = _ARTIFACT_INDEXES.get(path)
+    if index is None:
+        if not path.exists():
+            return None
+        index = _ARTIFACT_INDEXES[path] = ArtifactIndex(path, readonly=True)
+    return index
+
+
+def _artifact_from_index(value: str, root: Path | None) -> dict[str, Any] | None:
+    """Index metadata for a blob hash (or abbreviation) or a blob path in the store."""
+    digest = value if _ARTIFACT_HASH.fullmatch(value) else None
+    if digest is None:
+        path = Path(value).expanduser()
+        match = _BLOB_FILENAME.fullmatch(path.name)
+        if match is None:
+            return None
+        digest = match.group(1)
+        if root is None and len(path.parents) > 2:
+            root = path.parents[2]  # <root>/ab/cd/<hash>
+    index = _artifact_index(root)
+    if index is None:
+        return None
+    records = index.lookup(digest)
+    return {"source": "index", "artifacts": [record.to_dict() for record in records]}
+
+
+def _entry_artifact_hashes(entries: list[dict[str, Any]]) -> list[str]:
+    hashes: list[str] = []
+    for entry in entries:
+        meta = entry.get("meta") if isinstance(entry, dict) else None
+        digest = meta.get("hash") if isinstance(meta, dict) else None
+        if isinstance(digest, str) and digest not in hashes:
+            hashes.append(digest)
+    return hashes
+
+
+def _entry_profiles(
+    entries: list[dict[str, Any]], root: Path | None, limit: int = 20
+) -> dict[str, Any]:
+    """Top functions of the profiles linked from ``entries`` (``profile_path``).
+
+    A path that does not resolve here (e.g. relative to another working
+    directory) is looked up by ``profile_hash`` in the artifact index.
+    """
+    profiles: dict[str, Any] = {}
+    index = _artifact_index(root)
+    for entry in entries:
+        path = entry.get("profile_path") if isinstance(entry, dict) else None
+        if not isinstance(path, str) or path in profiles:
+            continue
+        resolved = Path(path).expanduser()
+        if not resolved.exists() and index is not None and entry.get("profile_hash"):
+            records = index.lookup(str(entry["profile_hash"]))
+            if records:
+                resolved = Path(records[0].path)
+        try:
+            profiles[path] = profile_summary(resolved, limit)
+        except (OSError, ValueError) as exc:
+            profiles[path] = {"error": str(exc)}
+    return profiles
+
+
 @app.route("/api/detail")
 def detail() -> Any:
     config = load_config()
@@ -159,25 +625,131 @@ def detail() -> Any:
         Path(artifact_path_value).expanduser() if artifact_path_value else config.artifact_path
     )
 
+    filters = _request_filters()
     detail_entries: list[dict[str, Any]] = []
+    detail_source = ""
     artifact_metadata: dict[str, Any] | None = None
 
-    if detail_path:
+    if detail_path and filters and not entry_id:
+        detail_entries, detail_source = _filtered_entries(
+            detail_path, config.max_entries, filters, config.index_update_interval
+        )
+    elif detail_path:
         detail_entries = _read_jsonl(detail_path, config.max_entries, entry_id)
 
-    if artifact_path:
+    if artifact_path_value:
+        artifact_metadata = _artifact_from_index(artifact_path_value, config.artifact_root)
+    if artifact_metadata is None and artifact_path:
         artifact_metadata = _read_json(artifact_path)
+    if artifact_metadata is None and not artifact_path_value:
+        # No explicit artifact: describe the ones referenced by the entries shown.
+        index = _artifact_index(config.artifact_root)
+        hashes = _entry_artifact_hashes(detail_entries) if index else []
+        if index and hashes:
+            artifact_metadata = {
+                "source": "index",
+                "artifacts": [
+                    record.to_dict() for digest in hashes for record in index.lookup(digest)
+                ],
+            }
 
     return jsonify(
         {
             "detail_entries": detail_entries,
+            "detail_source": detail_source,
             "artifact_metadata": artifact_metadata,
+            "profiles": _entry_profiles(detail_entries, config.artifact_root),
             "detail_path": str(detail_path) if detail_path else "",
             "artifact_path": str(artifact_path) if artifact_path else "",
         }
     )
 
 
+def _stats_dict(stats: DurationStats) -> dict[str, Any]:
+    values: dict[str, Any] = {}
+    for field in fields(stats):
+        if field.name == "aggregate":
+            continue
+        value = getattr(stats, field.name)
+        # NaN/inf are not valid JSON.
+        values[field.name] = None if isinstance(value, float) and not math.isfinite(value) else value
+    return values
+
+
+@app.route("/api/stats")
+def stats() -> Any:
+    """Event counts and duration stats of the detail log, from its index if it has one."""
+    config = load_config()
+    detail_path_value = request.args.get("detail_path")
+    detail_path = Path(detail_path_value).expanduser() if detail_path_value else config.detail_path
+    if detail_path is None:
+        return jsonify({"error": "no detail log configured"}), 400
+    filters = _request_filters()
+    filters.pop("event", None)
+    unit = request.args.get("unit") or None
+    metric = request.args.get("metric") or "elapsed"
+
+    index = _indexed(detail_path, config.index_update_interval)
+    if index is not None:
+        events = index.count_events(**filters)
+        durations = index.duration_stats(unit=unit, metric=metric, **filters)
+        source = "index"
+    else:
+        # No index: one streaming pass over every segment, counting events
+        # as duration_stats consumes the matching entries.
+        events: Counter[str] = Counter()
+
+        def matching() -> Iterator[dict[str, Any]]:
+            if not _has_log(detail_path):
+                return
+            for entry in iter_detail_entries(detail_path):
+                if _matches(entry, filters):
+                    event = entry.get("event")
+                    if event:
+                        events[str(event)] += 1
+                    yield entry
+
+        durations = duration_stats(matching(), unit=unit, metric=metric)
+        source = "scan"
+    return jsonify(
+        {
+            "source": source,
+            "events": dict(events),
+            "durations": {name: _stats_dict(value) for name, value in durations.items()},
+        }
+    )
+
+
+def _artifact_preview(path: Path, info: dict[str, Any], rows: int) -> Any:
+    if info["format"] == "npy":
+        array = load_array(path)
+        return array.tolist() if array.ndim == 0 else array[:rows].tolist()
+    if info["format"] == "arrow":
+        return load_arrow(path).slice(0, rows).to_pylist()
+    return None
+
+
+@app.route("/api/artifact")
+def artifact() -> Any:
+    """Shape/dtype or schema of an array artifact plus its first ``rows`` rows."""
+    value = request.args.get("path")
+    if not value:
+        return jsonify({"error": "path is required"}), 400
+    try:
+        rows = max(0, int(request.args.get("rows", "10")))
+    except ValueError:
+        rows = 10
+    path = Path(value).expanduser()
+    if not path.exists():
+        return jsonify({"error": f"Artifact not found: {path}"}), 404
+    try:
+        info = describe_artifact(path)
+        info["preview"] = _artifact_preview(path, info, rows)
+    except (ImportError, ValueError, OSError) as exc:
+        return jsonify({"error": str(exc)})
+    return jsonify(info)
+
+
 @app.route("/api/config")
 def config() -> Any:
     config = load_config()
@@ -186,6 +758,7 @@ def config() -> Any:
             "overview_path": str(config.overview_path),
             "detail_path": str(config.detail_path) if config.detail_path else "",
             "artifact_path": str(config.artifact_path) if config.artifact_path else "",
+            "artifact_root": str(config.artifact_root) if config.artifact_root else "",
             "max_entries": config.max_entries,
         }
     )